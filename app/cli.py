@@ -0,0 +1,500 @@
+import argparse
+import json
+import multiprocessing
+import sys
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import (
+    BULK_INGEST_WORKERS,
+    DIALOGUE_VOICES,
+    LLM_COST_PER_1K_COMPLETION_TOKENS,
+    LLM_COST_PER_1K_PROMPT_TOKENS,
+    OUTPUT_DIR,
+    TTS_COST_PER_1K_CHARS,
+)
+from services.section_parser import DEFAULT_SUMMARY_SECTIONS, SECTION_HEADINGS
+from utils.file_manager import FileManager
+
+PODCAST_MODES = ("none", "monologue", "dialogue")
+
+# Opções que mudam apenas a forma de execução, não o resultado: ficam fora
+# da chave do checkpoint
+_RUNTIME_OPTIONS = ("low_memory", "profile")
+
+
+def process_pdf(
+    pdf_path: str,
+    options: Dict[str, Any],
+    reuse_summary: bool = False,
+    source_name: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Extrai, resume e gera o podcast de um PDF. Executado nas threads ou
+    processos do pool, por isso recebe e devolve apenas tipos simples.
+
+    Args:
+        pdf_path: Caminho do PDF
+        options: Opções de `Summarizer.summarize` e do podcast (`podcast`,
+            `voice_id`, `voices`), `low_memory` (None decide pelo número de
+            páginas) e `profile` ({"memory": bool, "cpu": bool})
+        reuse_summary: Usa o último resumo armazenado (o podcast falhou na
+            execução anterior)
+        source_name: Nome com que o resumo e o podcast são armazenados
+            (padrão: nome do arquivo; ver `source_name`)
+
+    Returns:
+        Registro com o status, tempos por etapa e consumo
+    """
+    from utils.metrics import Instrumentation
+
+    path = Path(pdf_path)
+    name = source_name or path.name
+    profile = options.get("profile") or {}
+    with Instrumentation.profile("batch", **profile, pdf=name) as session:
+        record = _process_pdf(path, name, options, reuse_summary)
+
+    if any(profile.values()):
+        report = session.dump()
+        record["profile"] = {
+            key: report[key] for key in ("status", "peak_mb", "files") if key in report
+        }
+    return record
+
+
+def source_name(path: Path, content_hash: str) -> str:
+    """
+    Nome único com que os resultados de um PDF são armazenados: PDFs com o
+    mesmo nome em diretórios diferentes não compartilham resumos.
+    """
+    return f"{path.stem}_{content_hash[:12]}{path.suffix}"
+
+
+def _process_pdf(
+    path: Path, name: str, options: Dict[str, Any], reuse_summary: bool
+) -> Dict[str, Any]:
+    """Implementação de `process_pdf`."""
+    from services.pdf_processor import PDFProcessor
+    from services.podcast_generator import get_podcast_generator
+    from services.summarizer import get_summarizer
+
+    record: Dict[str, Any] = {"status": "failed", "timings": {}, "source_file": name}
+    usage = {"prompt_tokens": 0, "completion_tokens": 0, "tts_chars": 0}
+    record["usage"] = usage
+    summarizer = get_summarizer()
+    options = {**options, "source_file": name}
+
+    try:
+        low_memory = options.get("low_memory")
+        if low_memory is None:
+            low_memory = PDFProcessor.is_large(path)
+        record["low_memory"] = low_memory
+
+        stored = summarizer.load_summary(Path(name)) if reuse_summary else None
+        if stored and "summary" in stored:
+            summary = stored
+        elif low_memory:
+            # Extração e limpeza acontecem página a página, durante o resumo
+            record["pages"] = PDFProcessor.page_count(path)
+            start_time = time.perf_counter()
+            summary = summarizer.summarize_low_memory(path, options)
+            record["timings"]["summarize"] = round(time.perf_counter() - start_time, 3)
+        else:
+            start_time = time.perf_counter()
+            chunks = PDFProcessor.extract_text(path)
+            record["timings"]["extract"] = round(time.perf_counter() - start_time, 3)
+            record["pages"] = len(chunks)
+            if not chunks:
+                raise ValueError("Não foi possível extrair texto do PDF")
+
+            start_time = time.perf_counter()
+            summary = summarizer.summarize(path, chunks, options)
+            record["timings"]["summarize"] = round(time.perf_counter() - start_time, 3)
+        if "error" in summary:
+            raise RuntimeError(summary["error"])
+        if summary is not stored:
+            _add_usage(usage, summary["metadata"].get("token_usage"))
+        record["status"] = "summarized"
+
+        mode = options["podcast"]
+        if mode != "none":
+            generator = get_podcast_generator()
+            start_time = time.perf_counter()
+            if mode == "dialogue":
+                podcast = generator.generate_dialogue(
+                    summary["summary"],
+                    options["voices"],
+                    name,
+                    low_memory=low_memory,
+                )
+            else:
+                podcast = generator.generate_podcast(
+                    summary["summary"],
+                    options["voice_id"],
+                    name,
+                    low_memory=low_memory,
+                )
+            record["timings"]["podcast"] = round(time.perf_counter() - start_time, 3)
+            if "error" in podcast:
+                raise RuntimeError(podcast["error"])
+
+            _add_usage(usage, podcast["metadata"].get("token_usage"))
+            script = podcast.get("script")
+            usage["tts_chars"] = (
+                sum(len(turn["text"]) for turn in script)
+                if script
+                else podcast["metadata"]["text_length"]
+            )
+            record["podcast_id"] = podcast.get("id")
+            record["audio_path"] = podcast["audio_path"]
+        record["status"] = "done"
+    except Exception as e:
+        record["error"] = str(e)
+
+    return record
+
+
+def _add_usage(usage: Dict[str, int], token_usage: Optional[Dict[str, int]]) -> None:
+    for key in ("prompt_tokens", "completion_tokens"):
+        usage[key] += (token_usage or {}).get(key, 0)
+
+
+def collect_pdfs(sources: Iterable[str], file_list: Optional[str] = None) -> List[Path]:
+    """
+    Lista os PDFs a processar, sem repetições e em ordem estável.
+
+    Args:
+        sources: Arquivos PDF ou diretórios (percorridos recursivamente)
+        file_list: Arquivo com um caminho de PDF por linha
+
+    Returns:
+        Caminhos dos PDFs
+    """
+    entries = list(sources)
+    if file_list:
+        lines = Path(file_list).read_text(encoding="utf-8").splitlines()
+        entries += [line.strip() for line in lines if line.strip()]
+
+    pdfs: Dict[Path, None] = {}
+    for entry in entries:
+        path = Path(entry)
+        if path.is_dir():
+            found = (p for p in path.rglob("*") if p.suffix.lower() == ".pdf")
+            pdfs.update(dict.fromkeys(sorted(found)))
+        elif path.suffix.lower() == ".pdf" and path.is_file():
+            pdfs[path] = None
+        else:
+            message = f"Ignorando '{entry}': não é um PDF nem um diretório"
+            print(message, file=sys.stderr)
+    return list(pdfs)
+
+
+class Checkpoint:
+    """
+    Registro em JSON Lines dos PDFs já processados, para retomar uma
+    execução interrompida. Cada PDF é identificado pelo hash do conteúdo e
+    pelas opções da execução; o último registro de cada um prevalece.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._records: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Linha incompleta de uma execução interrompida
+                    continue
+                self._records[record["key"]] = record
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Último registro do PDF, se houver."""
+        return self._records.get(key)
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """Acrescenta o registro ao arquivo imediatamente."""
+        self._records[record["key"]] = record
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class BatchRunner:
+    """
+    Processa uma lista de PDFs em um pool de threads ou de processos,
+    registrando o progresso em um checkpoint e reportando vazão e custo.
+    """
+
+    def __init__(
+        self,
+        options: Dict[str, Any],
+        workers: int = BULK_INGEST_WORKERS,
+        executor: str = "thread",
+        checkpoint: Optional[Checkpoint] = None,
+    ):
+        self.options = options
+        self.workers = max(1, workers)
+        self.executor = executor
+        self.checkpoint = checkpoint
+        self._options_key = json.dumps(
+            {k: v for k, v in options.items() if k not in _RUNTIME_OPTIONS},
+            sort_keys=True,
+        )
+
+    def run(self, pdfs: List[Path]) -> Dict[str, Any]:
+        """
+        Processa os PDFs, pulando os já concluídos no checkpoint.
+
+        Returns:
+            Relatório com os registros de cada PDF e os totais
+        """
+        start_time = time.time()
+        records: List[Dict[str, Any]] = []
+        pending = []
+        for pdf in pdfs:
+            content_hash = FileManager.compute_hash(pdf)
+            key = f"{content_hash}:{self._options_key}"
+            previous = self.checkpoint.get(key) if self.checkpoint else None
+            if previous and previous["status"] == "done":
+                records.append({**previous, "status": "skipped"})
+                continue
+            reuse_summary = bool(previous and previous["status"] == "summarized")
+            pending.append((pdf, key, reuse_summary, source_name(pdf, content_hash)))
+
+        progress = _Progress(len(pending), len(records))
+        if pending:
+            try:
+                records += self._run_pool(pending, progress)
+            except KeyboardInterrupt:
+                print("\nInterrompido; o checkpoint permite retomar.", file=sys.stderr)
+
+        return self._report(records, time.time() - start_time)
+
+    def _run_pool(self, pending: list, progress: "_Progress") -> List[Dict[str, Any]]:
+        if self.executor == "process":
+            pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            pool = ThreadPoolExecutor(max_workers=self.workers)
+
+        records = []
+        futures: Dict[Future, tuple] = {}
+        items = iter(pending)
+        try:
+            # Submete aos poucos para que uma interrupção não deixe a fila cheia
+            for _ in range(self.workers * 2):
+                self._submit(pool, futures, items)
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pdf, key, *_ = futures.pop(future)
+                    try:
+                        record = future.result()
+                    except Exception as e:
+                        record = {"status": "failed", "error": str(e), "usage": {}}
+                    record.update({"file": str(pdf), "key": key})
+                    if self.checkpoint:
+                        self.checkpoint.add(record)
+                    records.append(record)
+                    progress.update(record)
+                    self._submit(pool, futures, items)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+        return records
+
+    def _submit(self, pool: Any, futures: Dict[Future, tuple], items: Iterable) -> None:
+        item = next(items, None)
+        if item is not None:
+            pdf, _, reuse_summary, name = item
+            future = pool.submit(
+                process_pdf, str(pdf), self.options, reuse_summary, name
+            )
+            futures[future] = item
+
+    def _report(self, records: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+        processed = [r for r in records if r["status"] != "skipped"]
+        totals = {"prompt_tokens": 0, "completion_tokens": 0, "tts_chars": 0}
+        for record in processed:
+            for key in totals:
+                totals[key] += record.get("usage", {}).get(key, 0)
+
+        prompt_cost = totals["prompt_tokens"] / 1000 * LLM_COST_PER_1K_PROMPT_TOKENS
+        completion_cost = (
+            totals["completion_tokens"] / 1000 * LLM_COST_PER_1K_COMPLETION_TOKENS
+        )
+        cost = {
+            "llm_usd": round(prompt_cost + completion_cost, 4),
+            "tts_usd": round(totals["tts_chars"] / 1000 * TTS_COST_PER_1K_CHARS, 4),
+        }
+        cost["total_usd"] = round(cost["llm_usd"] + cost["tts_usd"], 4)
+
+        def count(status: str) -> int:
+            return sum(1 for r in records if r["status"] == status)
+
+        done = count("done")
+        return {
+            "summary": {
+                "total_files": len(records),
+                "done": done,
+                "skipped": count("skipped"),
+                "summarized_only": count("summarized"),
+                "failed": count("failed"),
+                "elapsed_seconds": round(elapsed, 2),
+                "files_per_minute": round(done / elapsed * 60, 2) if elapsed else 0,
+                "pages": sum(r.get("pages", 0) for r in processed),
+                "usage": totals,
+                "estimated_cost": cost,
+            },
+            "files": records,
+        }
+
+
+class _Progress:
+    """Linha de progresso (stderr) com vazão e tempo restante estimado."""
+
+    def __init__(self, total: int, skipped: int):
+        self.total = total
+        self.completed = 0
+        self.tokens = 0
+        self.start_time = time.time()
+        self._lock = threading.Lock()
+        if skipped:
+            print(f"{skipped} PDFs já concluídos no checkpoint", file=sys.stderr)
+
+    def update(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self.completed += 1
+            usage = record.get("usage", {})
+            self.tokens += usage.get("prompt_tokens", 0)
+            self.tokens += usage.get("completion_tokens", 0)
+            elapsed = time.time() - self.start_time
+            rate = self.completed / elapsed if elapsed else 0
+            eta = (self.total - self.completed) / rate if rate else 0
+            width = len(str(self.total))
+            print(
+                f"[{self.completed:>{width}}/{self.total}] "
+                f"{record['status']:<10} {Path(record['file']).name} "
+                f"| {rate * 60:.1f} PDFs/min, {self.tokens} tokens, "
+                f"restam ~{eta / 60:.1f} min"
+                + (f" | {record['error']}" if record.get("error") else ""),
+                file=sys.stderr,
+                flush=True,
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Gera resumos e podcasts de PDFs em lote, sem passar pela API"
+    )
+    parser.add_argument("sources", nargs="*", help="PDFs ou diretórios com PDFs")
+    parser.add_argument("--file-list", help="Arquivo com um caminho de PDF por linha")
+    parser.add_argument("--method", choices=["stuff", "map_reduce"], default="stuff")
+    # Mesmos padrões da API
+    parser.add_argument(
+        "--remove-references", action=argparse.BooleanOptionalAction, default=True
+    )
+    parser.add_argument(
+        "--strip-boilerplate", action=argparse.BooleanOptionalAction, default=True
+    )
+    parser.add_argument(
+        "--sections",
+        default="",
+        help='Seções enviadas ao LLM, separadas por vírgula, ou "auto"',
+    )
+    parser.add_argument("--podcast", choices=PODCAST_MODES, default="monologue")
+    parser.add_argument("--voice-id", default="21m00Tcm4TlvDq8ikWAM")
+    parser.add_argument(
+        "--voices",
+        default=",".join(DIALOGUE_VOICES),
+        help="Vozes dos dois apresentadores no modo dialogue",
+    )
+    parser.add_argument(
+        "--low-memory",
+        choices=["auto", "on", "off"],
+        default="auto",
+        help="Modo de memória limitada; auto: PDFs com mais de "
+        "LOW_MEMORY_PAGE_THRESHOLD páginas",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=["memory", "cpu", "all"],
+        help="Perfila cada PDF por etapa (relatórios em output/profiles); "
+        "um PDF por vez em cada processo",
+    )
+    parser.add_argument("--workers", type=int, default=BULK_INGEST_WORKERS)
+    parser.add_argument(
+        "--executor",
+        choices=["thread", "process"],
+        default="thread",
+        help="Pool de threads (padrão; LLM e TTS esperam pela rede) ou de processos",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=OUTPUT_DIR / "batch_checkpoint.jsonl",
+        help="Arquivo de checkpoint usado para retomar execuções",
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignora o checkpoint existente"
+    )
+    parser.add_argument("--report", type=Path, help="Salva o relatório em JSON")
+    args = parser.parse_args(argv)
+
+    pdfs = collect_pdfs(args.sources, args.file_list)
+    if not pdfs:
+        parser.error("Nenhum PDF encontrado")
+
+    if args.sections.strip() == "auto":
+        sections = list(DEFAULT_SUMMARY_SECTIONS)
+    else:
+        sections = [s.strip() for s in args.sections.split(",") if s.strip()]
+    known = ("front_matter", *SECTION_HEADINGS)
+    unknown = [s for s in sections if s not in known]
+    if unknown:
+        parser.error(f"Seções desconhecidas: {', '.join(unknown)}")
+
+    if args.restart and args.checkpoint.exists():
+        args.checkpoint.unlink()
+
+    options = {
+        "method": args.method,
+        "remove_references": args.remove_references,
+        "strip_boilerplate": args.strip_boilerplate,
+        "sections": sections,
+        "podcast": args.podcast,
+        "voice_id": args.voice_id,
+        "voices": [v.strip() for v in args.voices.split(",") if v.strip()],
+        "low_memory": {"auto": None, "on": True, "off": False}[args.low_memory],
+        "profile": {
+            "memory": args.profile in ("memory", "all"),
+            "cpu": args.profile in ("cpu", "all"),
+        },
+    }
+    runner = BatchRunner(
+        options,
+        workers=args.workers,
+        executor=args.executor,
+        checkpoint=Checkpoint(args.checkpoint),
+    )
+    report = runner.run(pdfs)
+
+    if args.report:
+        FileManager.write_json_atomic(args.report, report)
+    print(json.dumps(report["summary"], ensure_ascii=False, indent=2))
+    return 1 if report["summary"]["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
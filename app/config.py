@@ -2,27 +2,192 @@ import os
 from pathlib import Path
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 
 load_dotenv()
 
+
+def _parse_mapping(value: str, cast: type) -> dict:
+    """Converte "chave:valor,chave2:valor2" em dicionário."""
+    items = (item.rsplit(":", 1) for item in value.split(",") if ":" in item)
+    return {key.strip(): cast(val) for key, val in items}
+
+
 # Diretórios da aplicação
 BASE_DIR = Path(__file__).resolve().parent.parent
-PDF_DIR = BASE_DIR / "pdfs"
-SUMMARY_DIR = BASE_DIR / "output" / "summaries"
-PODCAST_DIR = BASE_DIR / "output" / "podcasts"
+PDF_DIR = Path(os.getenv("PDF_DIR", BASE_DIR / "pdfs"))
+OUTPUT_DIR = Path(os.getenv("OUTPUT_DIR", BASE_DIR / "output"))
+SUMMARY_DIR = OUTPUT_DIR / "summaries"
+PODCAST_DIR = OUTPUT_DIR / "podcasts"
+PODCAST_VARIANTS_DIR = OUTPUT_DIR / "podcast_variants"
+MAP_CACHE_DIR = OUTPUT_DIR / "map_cache"
+SEGMENT_CACHE_DIR = OUTPUT_DIR / "segment_cache"
+PROFILE_DIR = OUTPUT_DIR / "profiles"
+RESULT_STORE_PATH = Path(os.getenv("RESULT_STORE_PATH", OUTPUT_DIR / "results.db"))
 
 # Criar diretórios necessários
 PDF_DIR.mkdir(exist_ok=True, parents=True)
 SUMMARY_DIR.mkdir(exist_ok=True, parents=True)
 PODCAST_DIR.mkdir(exist_ok=True, parents=True)
+PODCAST_VARIANTS_DIR.mkdir(exist_ok=True, parents=True)
+MAP_CACHE_DIR.mkdir(exist_ok=True, parents=True)
+SEGMENT_CACHE_DIR.mkdir(exist_ok=True, parents=True)
+PROFILE_DIR.mkdir(exist_ok=True, parents=True)
 
 # Configuração da OpenAI
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 
-# Configuração de LLM
-llm = ChatOpenAI(
-    model=OPENAI_MODEL,
-    openai_api_key=OPENAI_API_KEY,
+# Configuração da ingestão em lote
+BULK_INGEST_WORKERS = int(os.getenv("BULK_INGEST_WORKERS", os.cpu_count() or 4))
+BULK_MAX_FILE_BYTES = int(os.getenv("BULK_MAX_FILE_BYTES", 200 * 1024 * 1024))
+# Limites de cada ZIP: arquivos e bytes descompactados no total
+BULK_MAX_ZIP_MEMBERS = int(os.getenv("BULK_MAX_ZIP_MEMBERS", 10000))
+BULK_MAX_TOTAL_BYTES = int(os.getenv("BULK_MAX_TOTAL_BYTES", 2 * 1024 * 1024 * 1024))
+# Único diretório do servidor (e subdiretórios) aceito em /ingest/directory;
+# vazio desativa o endpoint (a ingestão continua disponível pela linha de comando)
+INGEST_ROOT_DIR = (
+    Path(os.environ["INGEST_ROOT_DIR"]) if os.getenv("INGEST_ROOT_DIR") else None
+)
+
+# Detecção de artigos quase duplicados (MinHash + LSH)
+# Índice em SQLite; um `dedup_index.json` do formato antigo é importado no
+# primeiro uso
+DEDUP_INDEX_PATH = OUTPUT_DIR / "dedup_index.db"
+# Processos que calculam as assinaturas em segundo plano
+DEDUP_INDEX_WORKERS = int(os.getenv("DEDUP_INDEX_WORKERS", 1))
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", 128))
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", 32))
+DEDUP_SHINGLE_SIZE = int(os.getenv("DEDUP_SHINGLE_SIZE", 5))
+DEDUP_SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", 0.85))
+# Similaridade mínima para reaproveitar o resumo de um quase duplicado
+DEDUP_REUSE_THRESHOLD = float(os.getenv("DEDUP_REUSE_THRESHOLD", 0.95))
+
+# Retenção: limpeza periódica de pdfs/ e output/ (0 desativa cada limite)
+RETENTION_ENABLED = os.getenv("RETENTION_ENABLED", "false").lower() in ("1", "true")
+RETENTION_INTERVAL_SECONDS = float(os.getenv("RETENTION_INTERVAL_SECONDS", 600))
+RETENTION_MAX_AGE_DAYS = float(os.getenv("RETENTION_MAX_AGE_DAYS", 0))
+RETENTION_MAX_TOTAL_BYTES = int(os.getenv("RETENTION_MAX_TOTAL_BYTES", 0))
+# Arquivos usados há menos tempo que isso nunca são removidos
+RETENTION_MIN_IDLE_SECONDS = float(os.getenv("RETENTION_MIN_IDLE_SECONDS", 3600))
+# Máximo de arquivos removidos por passada (limpeza incremental)
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", 500))
+# Mantém PDFs com resumo e o último podcast de cada PDF registrados no banco
+# de resultados, enquanto o registro for mais recente que
+# RETENTION_REFERENCED_TTL_DAYS
+RETENTION_KEEP_REFERENCED = os.getenv("RETENTION_KEEP_REFERENCED", "true").lower() in (
+    "1",
+    "true",
+)
+RETENTION_REFERENCED_TTL_DAYS = float(os.getenv("RETENTION_REFERENCED_TTL_DAYS", 7))
+
+# Coordenação entre workers/contêineres que compartilham o mesmo volume:
+# "sqlite" (mesmo host), "redis" (vários hosts) ou "local" (desativada).
+# Padrão: "sqlite" com vários workers e "local" com um só; vários contêineres
+# de um worker no mesmo volume devem configurá-la explicitamente
+COORDINATION_BACKEND = os.getenv(
+    "COORDINATION_BACKEND",
+    "sqlite" if int(os.getenv("UVICORN_WORKERS", 1)) > 1 else "local",
+)
+COORDINATION_DB_PATH = Path(
+    os.getenv("COORDINATION_DB_PATH", OUTPUT_DIR / "coordination.db")
+)
+COORDINATION_REDIS_URL = os.getenv("COORDINATION_REDIS_URL", "redis://localhost:6379/0")
+# Prazo de cada reivindicação, renovado pelo dono a cada terço do prazo
+# enquanto executa: um worker que morre perde a tarefa após esse tempo
+COORDINATION_CLAIM_TTL_SECONDS = float(os.getenv("COORDINATION_CLAIM_TTL_SECONDS", 30))
+COORDINATION_RESULT_TTL_SECONDS = float(
+    os.getenv("COORDINATION_RESULT_TTL_SECONDS", 60)
+)
+COORDINATION_POLL_SECONDS = float(os.getenv("COORDINATION_POLL_SECONDS", 0.2))
+
+# Escalonamento justo entre clientes (identificados pelo cabeçalho X-API-Key)
+# Chaves de API com cota própria, além das que têm peso ou cota configurados:
+# "chave1,chave2". As demais chaves compartilham o cliente "anonymous"
+SCHEDULER_API_KEYS = [
+    key.strip() for key in os.getenv("SCHEDULER_API_KEYS", "").split(",") if key.strip()
+]
+SCHEDULER_CONCURRENCY = int(os.getenv("SCHEDULER_CONCURRENCY", 8))
+# Vagas que trabalhos "batch" nunca ocupam, reservadas aos "interactive"
+SCHEDULER_INTERACTIVE_RESERVED = int(os.getenv("SCHEDULER_INTERACTIVE_RESERVED", 2))
+# Cota de tokens por minuto de cada cliente (0 = sem limite)
+SCHEDULER_TOKENS_PER_MINUTE = int(os.getenv("SCHEDULER_TOKENS_PER_MINUTE", 0))
+# Exceções por chave de API: "chave1:200000,chave2:50000"
+SCHEDULER_TENANT_TOKENS_PER_MINUTE = _parse_mapping(
+    os.getenv("SCHEDULER_TENANT_TOKENS_PER_MINUTE", ""), int
+)
+# Pesos por chave de API (padrão 1): "chave1:3,chave2:0.5"
+SCHEDULER_TENANT_WEIGHTS = _parse_mapping(
+    os.getenv("SCHEDULER_TENANT_WEIGHTS", ""), float
+)
+SCHEDULER_MAX_QUEUE_PER_TENANT = int(os.getenv("SCHEDULER_MAX_QUEUE_PER_TENANT", 100))
+# Estimativa de tokens de uma sumarização, acertada com o consumo real
+SCHEDULER_SUMMARIZE_COST_TOKENS = int(
+    os.getenv("SCHEDULER_SUMMARIZE_COST_TOKENS", 8000)
+)
+
+# Podcast em diálogo: vozes dos dois apresentadores (padrão: Rachel e Adam),
+# trechos sintetizados em paralelo e pausa entre as falas
+DIALOGUE_VOICES = tuple(
+    voice.strip()
+    for voice in os.getenv(
+        "DIALOGUE_VOICES", "21m00Tcm4TlvDq8ikWAM,pNInz6obpgDQGcFmaJgB"
+    ).split(",")
 )
+DIALOGUE_TTS_CONCURRENCY = int(os.getenv("DIALOGUE_TTS_CONCURRENCY", 4))
+DIALOGUE_PAUSE_MS = float(os.getenv("DIALOGUE_PAUSE_MS", 400))
+
+# Pós-processamento do áudio com ffmpeg (normalização de loudness, variantes
+# de menor taxa de bits e HLS); ignorado se o ffmpeg não estiver instalado
+AUDIO_POSTPROCESS_ENABLED = os.getenv("AUDIO_POSTPROCESS_ENABLED", "true").lower() in (
+    "1",
+    "true",
+)
+FFMPEG_PATH = os.getenv("FFMPEG_PATH", "ffmpeg")
+AUDIO_POSTPROCESS_WORKERS = int(os.getenv("AUDIO_POSTPROCESS_WORKERS", 2))
+AUDIO_LOUDNESS_TARGET_LUFS = float(os.getenv("AUDIO_LOUDNESS_TARGET_LUFS", -16))
+AUDIO_LOW_BITRATE_KBPS = int(os.getenv("AUDIO_LOW_BITRATE_KBPS", 48))
+AUDIO_OPUS_BITRATE_KBPS = int(os.getenv("AUDIO_OPUS_BITRATE_KBPS", 32))
+AUDIO_HLS_ENABLED = os.getenv("AUDIO_HLS_ENABLED", "true").lower() in ("1", "true")
+AUDIO_HLS_SEGMENT_SECONDS = int(os.getenv("AUDIO_HLS_SEGMENT_SECONDS", 6))
+
+# Modo de memória limitada: páginas lidas uma a uma, resumos parciais mantidos
+# em disco e áudio gravado direto no arquivo. Ativado automaticamente para PDFs
+# com mais páginas que o limite (0 desativa a ativação automática)
+LOW_MEMORY_PAGE_THRESHOLD = int(os.getenv("LOW_MEMORY_PAGE_THRESHOLD", 300))
+# Páginas enviadas ao LLM por chamada do map no modo de memória limitada
+LOW_MEMORY_MAP_BATCH_SIZE = int(os.getenv("LOW_MEMORY_MAP_BATCH_SIZE", 8))
+
+# Perfilamento por requisição (tracemalloc e cProfile): funções listadas por etapa
+PROFILE_TOP_FUNCTIONS = int(os.getenv("PROFILE_TOP_FUNCTIONS", 10))
+
+# Custos estimados (USD) no relatório da CLI em lote (padrão: gpt-4o-mini)
+LLM_COST_PER_1K_PROMPT_TOKENS = float(
+    os.getenv("LLM_COST_PER_1K_PROMPT_TOKENS", 0.00015)
+)
+LLM_COST_PER_1K_COMPLETION_TOKENS = float(
+    os.getenv("LLM_COST_PER_1K_COMPLETION_TOKENS", 0.0006)
+)
+TTS_COST_PER_1K_CHARS = float(os.getenv("TTS_COST_PER_1K_CHARS", 0))
+
+# Configuração da ElevenLabs
+ELEVEN_LABS_API_KEY = os.getenv("ELEVEN_LABS_API_KEY")
+ELEVEN_LABS_BASE_URL = os.getenv("ELEVEN_LABS_BASE_URL", "https://api.elevenlabs.io/v1")
+
+# Seleção de backends: "openai" ou "fake" para LLM, "elevenlabs" ou "fake" para TTS
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+TTS_BACKEND = os.getenv("TTS_BACKEND", "elevenlabs")
+
+# Backends falsos (determinísticos, sem rede) para testes de carga
+FAKE_SEED = int(os.getenv("FAKE_SEED", 42))
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", 200))
+FAKE_LLM_LATENCY_JITTER_MS = float(os.getenv("FAKE_LLM_LATENCY_JITTER_MS", 50))
+# Distribuições: constant, uniform, normal, lognormal
+FAKE_LLM_LATENCY_DISTRIBUTION = os.getenv("FAKE_LLM_LATENCY_DISTRIBUTION", "normal")
+FAKE_LLM_TOKENS_PER_SECOND = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", 0))
+FAKE_LLM_OUTPUT_TOKENS = int(os.getenv("FAKE_LLM_OUTPUT_TOKENS", 120))
+FAKE_LLM_FAILURE_RATE = float(os.getenv("FAKE_LLM_FAILURE_RATE", 0))
+FAKE_TTS_LATENCY_MS = float(os.getenv("FAKE_TTS_LATENCY_MS", 300))
+FAKE_TTS_LATENCY_JITTER_MS = float(os.getenv("FAKE_TTS_LATENCY_JITTER_MS", 100))
+FAKE_TTS_LATENCY_DISTRIBUTION = os.getenv("FAKE_TTS_LATENCY_DISTRIBUTION", "normal")
+FAKE_TTS_CHARS_PER_SECOND = float(os.getenv("FAKE_TTS_CHARS_PER_SECOND", 0))
+FAKE_TTS_FAILURE_RATE = float(os.getenv("FAKE_TTS_FAILURE_RATE", 0))
@@ -1,12 +1,63 @@
+import tempfile
+from contextlib import asynccontextmanager
+from functools import partial
 from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
 
-from config import PDF_DIR
-from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from config import (
+    DIALOGUE_PAUSE_MS,
+    DIALOGUE_VOICES,
+    INGEST_ROOT_DIR,
+    PDF_DIR,
+    RETENTION_ENABLED,
+    SCHEDULER_SUMMARIZE_COST_TOKENS,
+)
+from fastapi import (
+    BackgroundTasks,
+    FastAPI,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Response,
+    UploadFile,
+)
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse
+from services.audio_processor import HLS_MEDIA_TYPES, VARIANTS, get_audio_processor
+from services.bulk_ingestor import BulkIngestor, ZipTooLargeError, summarize_ingested
+from services.dedup_index import index_failure, index_pdf, near_duplicates
 from services.pdf_processor import PDFProcessor
-from services.summarizer import Summarizer
+from services.scheduler import PRIORITIES, QueueFullError, get_scheduler, tenant_id
+from services.section_parser import DEFAULT_SUMMARY_SECTIONS, SECTION_HEADINGS
+from services.podcast_generator import get_podcast_generator
+from services.result_store import get_result_store
+from services.retention import get_retention_service
+from services.summarizer import (
+    get_summarizer,
+    run_summarization,
+    summarize_flight,
+    summary_key,
+)
+from utils.file_manager import FileManager
+from utils.metrics import Instrumentation
+from utils.text_processor import TextProcessor
+
+KNOWN_SECTIONS = ("front_matter", *SECTION_HEADINGS)
+
+SUMMARY_METHODS = ("stuff", "map_reduce")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Inicia e encerra os serviços em segundo plano."""
+    if RETENTION_ENABLED:
+        get_retention_service().start()
+    yield
+    if RETENTION_ENABLED:
+        get_retention_service().stop()
 
-summarizer = Summarizer()
 
 app = FastAPI(
     title="Paper-to-Podcast API",
@@ -14,6 +65,7 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -34,19 +86,27 @@ async def upload_pdf(file: UploadFile = File(...)):
         )
 
     try:
-        contents = await file.read()
-        temp_path = PDF_DIR / file.filename
+        with Instrumentation.stage("upload"):
+            contents = await file.read()
+
+            # Diretório temporário exclusivo: uploads simultâneos com o mesmo
+            # nome (inclusive em outros workers) não se sobrescrevem
+            with tempfile.TemporaryDirectory(dir=PDF_DIR, prefix=".upload_") as tmp:
+                temp_path = Path(tmp) / Path(file.filename).name
+                with open(temp_path, "wb") as f:
+                    f.write(contents)
 
-        with open(temp_path, "wb") as f:
-            f.write(contents)
+                saved_path = PDFProcessor.save_pdf(str(temp_path))
 
-        saved_path = PDFProcessor.save_pdf(str(temp_path))
-        Path(temp_path).unlink(missing_ok=True)  # Remove arquivo temporário
+        # Indexar o texto em segundo plano para detectar versões quase
+        # idênticas já enviadas (ver GET /pdfs/{pdf_name}/duplicates)
+        index_pdf(saved_path)
 
         return {
             "filename": saved_path.name,
             "path": str(saved_path),
             "message": f"PDF '{file.filename}' enviado com sucesso",
+            "near_duplicates_url": f"/pdfs/{saved_path.name}/duplicates",
         }
     except Exception as e:
         raise HTTPException(
@@ -54,6 +114,100 @@ async def upload_pdf(file: UploadFile = File(...)):
         )
 
 
+@app.post("/upload/bulk")
+async def upload_bulk(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    summarize_method: str = Form(""),
+    x_api_key: Optional[str] = Header(None),
+):
+    """
+    Upload de um arquivo ZIP contendo vários PDFs
+
+    - summarize_method: se informado ('stuff' ou 'map_reduce'), agenda a
+      sumarização dos PDFs ingeridos em segundo plano, com prioridade
+      'batch' no escalonador
+    """
+    if not file.filename.lower().endswith(".zip"):
+        raise HTTPException(
+            status_code=400, detail="Apenas arquivos ZIP são permitidos"
+        )
+    if summarize_method:
+        _check_method(summarize_method)
+
+    try:
+        with Instrumentation.in_flight("bulk_ingest"):
+            report = await run_in_threadpool(BulkIngestor().ingest_zip, file.file)
+    except ZipTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Erro ao processar arquivo: {str(e)}"
+        )
+
+    if summarize_method:
+        background_tasks.add_task(
+            summarize_ingested, report, summarize_method, tenant_id(x_api_key)
+        )
+        report["summary"]["summarization_queued"] = report["summary"]["ingested"]
+
+    return report
+
+
+@app.post("/ingest/directory")
+async def ingest_directory(
+    background_tasks: BackgroundTasks,
+    path: str = Form(...),
+    summarize_method: str = Form(""),
+    x_api_key: Optional[str] = Header(None),
+):
+    """
+    Ingere todos os PDFs de um diretório do servidor, dentro de
+    INGEST_ROOT_DIR (desativado se não configurado)
+
+    - path: caminho do diretório, relativo a INGEST_ROOT_DIR ou absoluto
+    - summarize_method: se informado ('stuff' ou 'map_reduce'), agenda a
+      sumarização dos PDFs ingeridos em segundo plano, com prioridade
+      'batch' no escalonador
+    """
+    if INGEST_ROOT_DIR is None:
+        raise HTTPException(
+            status_code=403,
+            detail="Ingestão de diretórios desativada: configure INGEST_ROOT_DIR",
+        )
+    if summarize_method:
+        _check_method(summarize_method)
+
+    root = INGEST_ROOT_DIR.resolve()
+    directory = (root / path).resolve()
+    if not directory.is_relative_to(root):
+        raise HTTPException(
+            status_code=403, detail=f"Diretório '{path}' fora de INGEST_ROOT_DIR"
+        )
+    if not directory.is_dir():
+        raise HTTPException(
+            status_code=400, detail=f"Diretório '{path}' não encontrado"
+        )
+
+    try:
+        with Instrumentation.in_flight("bulk_ingest"):
+            report = await run_in_threadpool(
+                BulkIngestor().ingest_directory, directory, root
+            )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Erro ao processar diretório: {str(e)}"
+        )
+
+    if summarize_method:
+        background_tasks.add_task(
+            summarize_ingested, report, summarize_method, tenant_id(x_api_key)
+        )
+        report["summary"]["summarization_queued"] = report["summary"]["ingested"]
+
+    return report
+
+
 @app.get("/pdfs")
 def list_pdfs():
     """Lista todos os PDFs disponíveis no servidor"""
@@ -75,16 +229,131 @@ def list_pdfs():
         raise HTTPException(status_code=500, detail=f"Erro ao listar PDFs: {str(e)}")
 
 
+@app.get("/pdfs/{pdf_name}/duplicates")
+async def get_near_duplicates(pdf_name: str):
+    """
+    Lista os PDFs quase idênticos a um PDF enviado
+
+    - status: 'pending' enquanto o PDF ainda é indexado em segundo plano,
+      'failed' (com `error`) se a indexação falhou
+    """
+    if not (PDF_DIR / Path(pdf_name).name).is_file():
+        raise HTTPException(status_code=404, detail=f"PDF '{pdf_name}' não encontrado")
+
+    matches = await run_in_threadpool(near_duplicates, Path(pdf_name).name)
+    response = {
+        "filename": pdf_name,
+        "status": "indexed",
+        "near_duplicates": matches or [],
+    }
+    if matches is None:
+        error = await run_in_threadpool(index_failure, Path(pdf_name).name)
+        response["status"] = "pending" if error is None else "failed"
+        if error is not None:
+            response["error"] = error
+    return response
+
+
+def _parse_sections(sections: str) -> Tuple[str, ...]:
+    """Converte o parâmetro `sections` na lista de seções a manter."""
+    if not sections.strip():
+        return ()
+    if sections.strip() == "auto":
+        return DEFAULT_SUMMARY_SECTIONS
+
+    selected = tuple(s.strip() for s in sections.split(",") if s.strip())
+    unknown = [s for s in selected if s not in KNOWN_SECTIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Seções desconhecidas: {', '.join(unknown)}. "
+            f"Use: {', '.join(KNOWN_SECTIONS)}",
+        )
+    return selected
+
+
+def _parse_profile(profile: str) -> Dict[str, bool]:
+    """Converte o parâmetro `profile` nas medições a fazer."""
+    selected = {p.strip() for p in profile.split(",") if p.strip()}
+    if "all" in selected:
+        selected = {"memory", "cpu"}
+    unknown = selected - {"memory", "cpu"}
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Perfilamento desconhecido: {', '.join(sorted(unknown))}. "
+            "Use: memory, cpu, all",
+        )
+    return {"memory": "memory" in selected, "cpu": "cpu" in selected}
+
+
+def _check_method(method: str) -> None:
+    """Valida o método de sumarização informado."""
+    if method not in SUMMARY_METHODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Método desconhecido: {method}. Use: {', '.join(SUMMARY_METHODS)}",
+        )
+
+
+def _check_priority(priority: str) -> None:
+    """Valida a classe de prioridade informada."""
+    if priority not in PRIORITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Prioridade desconhecida: {priority}. Use: {', '.join(PRIORITIES)}",
+        )
+
+
+def _tokens_used(result: Dict[str, Any]) -> int:
+    """Tokens consumidos de fato por uma sumarização."""
+    usage = result.get("metadata", {}).get("token_usage") or {}
+    return usage.get("total_tokens", 0)
+
+
 @app.post("/summarize/{pdf_name}")
 async def summarize_pdf(
-    pdf_name: str, method: str = Form("stuff"), remove_references: bool = Form(True)
+    pdf_name: str,
+    method: str = Form("stuff"),
+    remove_references: bool = Form(True),
+    strip_boilerplate: bool = Form(True),
+    sections: str = Form(""),
+    reuse_duplicates: bool = Form(True),
+    trace: bool = Form(False),
+    low_memory: Optional[bool] = Form(None),
+    profile: str = Form(""),
+    priority: str = Form("interactive"),
+    x_api_key: Optional[str] = Header(None),
 ):
     """
     Sumariza um PDF específico
 
     - method: 'stuff' ou 'map_reduce'
     - remove_references: se True, remove a seção de referências antes da sumarização
+    - strip_boilerplate: se True, remove cabeçalhos, rodapés, números de página,
+      DOIs e linhas de licença repetidos entre as páginas
+    - sections: seções a enviar ao LLM, separadas por vírgula (ex.:
+      'abstract,methods,results'), 'auto' para as seções principais
+      ou vazio para o texto completo
+    - reuse_duplicates: se True, reaproveita o resumo de outro PDF com o mesmo
+      texto, gerado com as mesmas opções e o mesmo modelo
+      já resumido em vez de chamar o LLM
+    - trace: se True, inclui na resposta a árvore de tempos de cada etapa
+    - low_memory: se True, lê as páginas uma a uma e mantém os resumos
+      parciais em disco; por padrão, ativado para PDFs com mais de
+      LOW_MEMORY_PAGE_THRESHOLD páginas
+    - profile: 'memory' (pico de memória), 'cpu' (funções mais custosas) ou
+      'all', por etapa; o relatório vem na resposta e é salvo em
+      output/profiles
+    - priority: 'interactive' (padrão) ou 'batch', que usa apenas a
+      capacidade ociosa
+    - X-API-Key (cabeçalho): identifica o cliente para filas e cotas
     """
+    _check_method(method)
+    selected_sections = _parse_sections(sections)
+    profile_options = _parse_profile(profile)
+    _check_priority(priority)
+
     try:
         # Procurar PDF pelo nome
         pdf_files = PDFProcessor.get_all_pdfs()
@@ -100,30 +369,325 @@ async def summarize_pdf(
                 status_code=404, detail=f"PDF '{pdf_name}' não encontrado"
             )
 
-        # Extrair texto do PDF
-        chunks = PDFProcessor.extract_text(pdf_path)
-
-        # Remover referências se solicitado
-        if remove_references:
-            chunks, refs_removed = PDFProcessor.remove_references(chunks)
+        # Pedidos simultâneos com as mesmas opções aguardam a mesma execução
+        options = {
+            "method": method,
+            "remove_references": remove_references,
+            "strip_boilerplate": strip_boilerplate,
+            "sections": selected_sections,
+            "reuse_duplicates": reuse_duplicates,
+            "trace": trace,
+            "low_memory": low_memory,
+            "profile": profile_options,
+        }
+        key = summary_key(pdf_path, options)
 
-        # Escolher método de sumarização
-        if method == "stuff":
-            result = summarizer.stuff(pdf_path, chunks=chunks)
+        # Quem apenas aguarda outra execução não ocupa vaga no escalonador.
+        # Se a execução terminar antes, o pedido passa pelo escalonador:
+        # só `do` inicia uma nova execução, e sempre dentro de uma vaga
+        joined = await run_in_threadpool(summarize_flight.join, key)
+        if joined is not None:
+            result, shared = joined
+            ticket = None
         else:
-            result = summarizer.map_reduce(pdf_path, chunks=chunks)
+            async with get_scheduler().async_slot(
+                tenant_id(x_api_key), priority, SCHEDULER_SUMMARIZE_COST_TOKENS
+            ) as ticket:
+                result, shared = await run_in_threadpool(
+                    summarize_flight.do, key, run_summarization, pdf_path, options
+                )
+                ticket.actual_cost = 0 if shared else _tokens_used(result)
 
-        # Adicionar informação sobre remoção de referências aos metadados
-        if remove_references:
-            result["metadata"]["references_removed"] = refs_removed
+        if "metadata" in result:
+            if shared:
+                result["metadata"]["coalesced"] = True
+            if ticket is not None:
+                result["metadata"]["queue_wait_seconds"] = round(ticket.wait_seconds, 3)
 
         return result
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Erro durante sumarização: {str(e)}"
         )
 
 
+def _podcast_tokens_used(result: Dict[str, Any]) -> int:
+    """
+    Custo de fato de um podcast, na unidade da estimativa: tokens do roteiro
+    (diálogo) e caracteres enviados ao TTS convertidos em tokens.
+    """
+    metadata = result.get("metadata", {})
+    if metadata.get("coalesced"):
+        return 0
+    usage = metadata.get("token_usage") or {}
+    tts_tokens = (metadata.get("tts_chars", 0) + 3) // 4
+    return usage.get("total_tokens", 0) + tts_tokens
+
+
+def _run_podcast(
+    generate: Callable[[], Dict[str, Any]],
+    profile: Dict[str, bool],
+    pdf_name: str,
+    mode: str,
+) -> Dict[str, Any]:
+    """Gera o podcast, perfilando as etapas se solicitado (fora do event loop)."""
+    with Instrumentation.profile(
+        "podcast", **profile, pdf=pdf_name, mode=mode
+    ) as session:
+        result = generate()
+    if any(profile.values()) and "error" not in result:
+        result["profile"] = session.dump()
+    return result
+
+
+@app.post("/podcast/{pdf_name}")
+async def generate_podcast(
+    pdf_name: str,
+    voice_id: str = Form("21m00Tcm4TlvDq8ikWAM"),
+    mode: str = Form("monologue"),
+    voices: str = Form(""),
+    pause_ms: float = Form(DIALOGUE_PAUSE_MS),
+    low_memory: bool = Form(False),
+    profile: str = Form(""),
+    priority: str = Form("interactive"),
+    x_api_key: Optional[str] = Header(None),
+):
+    """
+    Gera um podcast a partir do resumo de um PDF
+
+    - voice_id: ID da voz a ser usada (padrão é "Rachel")
+    - mode: 'monologue' (padrão, uma voz) ou 'dialogue' (dois apresentadores)
+    - voices: no modo 'dialogue', IDs das duas vozes separados por vírgula
+      (padrão: DIALOGUE_VOICES)
+    - pause_ms: no modo 'dialogue', pausa entre as falas em milissegundos
+    - low_memory: se True, grava o áudio no arquivo à medida que é gerado,
+      sem mantê-lo inteiro em memória
+    - profile: 'memory', 'cpu' ou 'all' (ver /summarize)
+    - priority: 'interactive' (padrão) ou 'batch'
+    - X-API-Key (cabeçalho): identifica o cliente para filas e cotas
+    """
+    _check_priority(priority)
+    profile_options = _parse_profile(profile)
+    if mode not in ("monologue", "dialogue"):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Modo desconhecido: {mode}. Use: monologue, dialogue",
+        )
+    dialogue_voices = (
+        tuple(v.strip() for v in voices.split(",") if v.strip()) or DIALOGUE_VOICES
+    )
+    if mode == "dialogue" and len(dialogue_voices) != 2:
+        raise HTTPException(
+            status_code=400, detail="Informe exatamente duas vozes em 'voices'"
+        )
+
+    stored = await run_in_threadpool(get_summarizer().load_summary, Path(pdf_name))
+    if not stored or "summary" not in stored:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Resumo de '{pdf_name}' não encontrado. Gere-o em /summarize",
+        )
+
+    summary = stored["summary"]
+    generator = get_podcast_generator()
+    cost = TextProcessor.estimate_tokens(summary)
+    if mode == "dialogue":
+        # O roteiro do diálogo também passa pelo LLM
+        cost *= 2
+        generate = partial(
+            generator.generate_dialogue,
+            summary,
+            dialogue_voices,
+            pdf_name,
+            pause_ms,
+            low_memory,
+        )
+    else:
+        generate = partial(
+            generator.generate_podcast, summary, voice_id, pdf_name, low_memory
+        )
+
+    try:
+        async with get_scheduler().async_slot(
+            tenant_id(x_api_key), priority, cost
+        ) as ticket:
+            with Instrumentation.in_flight("podcast"):
+                result = await run_in_threadpool(
+                    _run_podcast, generate, profile_options, pdf_name, mode
+                )
+            # Como na sumarização, a cota é acertada pelo consumo real
+            if "error" not in result:
+                ticket.actual_cost = _podcast_tokens_used(result)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Erro na geração do podcast: {str(e)}"
+        )
+
+    if "error" in result:
+        raise HTTPException(status_code=502, detail=result["error"])
+
+    return result
+
+
+def _page(limit: int, offset: int) -> Tuple[int, int]:
+    """Limita a paginação das listagens (1 a 1000 registros, offset >= 0)."""
+    return max(1, min(limit, 1000)), max(0, offset)
+
+
+@app.get("/summaries")
+def list_summaries(
+    source_file: Optional[str] = None,
+    model: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = 100,
+    offset: int = 0,
+):
+    """
+    Lista os resumos armazenados (sem o texto), do mais recente ao mais antigo
+
+    - source_file, model: filtros exatos
+    - since, until: intervalo de datas ("AAAA-MM-DD" ou "AAAA-MM-DD HH:MM:SS")
+    """
+    return {
+        "summaries": get_result_store().list_summaries(
+            source_file, model, since, until, *_page(limit, offset)
+        )
+    }
+
+
+@app.get("/summaries/{pdf_name}")
+def get_summary(pdf_name: str):
+    """Retorna o resumo mais recente de um PDF"""
+    summary = get_result_store().get_summary(pdf_name)
+    if summary is None:
+        raise HTTPException(
+            status_code=404, detail=f"Resumo de '{pdf_name}' não encontrado"
+        )
+    return summary
+
+
+@app.get("/history/{pdf_name}")
+def get_history(pdf_name: str):
+    """Histórico de resumos e podcasts gerados para um PDF"""
+    return get_result_store().history(pdf_name)
+
+
+@app.get("/podcasts")
+def list_podcasts(
+    source_file: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = 100,
+    offset: int = 0,
+):
+    """Lista os podcasts gerados, do mais recente ao mais antigo"""
+    return {
+        "podcasts": get_result_store().list_podcasts(
+            source_file, since, until, *_page(limit, offset)
+        )
+    }
+
+
+def _podcast_audio_path(podcast_id: int) -> Path:
+    """Caminho do áudio original de um podcast registrado."""
+    data = get_result_store().get_podcast(podcast_id)
+    if data is None or not Path(data["audio_path"]).exists():
+        raise HTTPException(
+            status_code=404, detail=f"Podcast {podcast_id} não encontrado"
+        )
+    return Path(data["audio_path"])
+
+
+@app.get("/podcasts/{podcast_id}/audio")
+def podcast_audio(
+    podcast_id: int,
+    variant: str = "auto",
+    accept: Optional[str] = Header(None),
+    save_data: Optional[str] = Header(None),
+    ect: Optional[str] = Header(None),
+    downlink: Optional[float] = Header(None),
+):
+    """
+    Áudio de um podcast
+
+    - variant: 'auto' (padrão: escolhe pelos client hints), 'original',
+      'standard' (MP3 normalizado), 'low' (MP3 mono de baixa taxa) ou 'opus'
+    - Save-Data, ECT, Downlink (cabeçalhos): em conexões lentas, 'auto'
+      serve Opus (se `Accept` incluir audio/ogg) ou o MP3 de baixa taxa
+    """
+    if variant not in ("auto", "original", *VARIANTS):
+        raise HTTPException(status_code=400, detail=f"Variante desconhecida: {variant}")
+
+    audio_path = _podcast_audio_path(podcast_id)
+    hints = {"accept": accept, "save_data": save_data, "ect": ect, "downlink": downlink}
+    served, path, media_type = get_audio_processor().resolve(audio_path, variant, hints)
+    FileManager.mark_accessed(path)
+
+    return FileResponse(
+        path,
+        media_type=media_type,
+        headers={
+            "X-Audio-Variant": served,
+            "Vary": "Accept, Save-Data, ECT, Downlink",
+            "Accept-CH": "Save-Data, ECT, Downlink",
+        },
+    )
+
+
+@app.get("/podcasts/{podcast_id}/hls/{filename}")
+def podcast_hls(podcast_id: int, filename: str):
+    """Playlist (index.m3u8) e segmentos HLS de um podcast"""
+    suffix = Path(filename).suffix
+    if Path(filename).name != filename or suffix not in HLS_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Arquivo HLS inválido")
+
+    audio_path = _podcast_audio_path(podcast_id)
+    path = get_audio_processor().variant_dir(audio_path) / "hls" / filename
+    if not path.exists():
+        raise HTTPException(
+            status_code=404, detail="HLS indisponível para este podcast"
+        )
+
+    FileManager.mark_accessed(path)
+    return FileResponse(path, media_type=HLS_MEDIA_TYPES[suffix])
+
+
+@app.get("/retention")
+def retention_status():
+    """Políticas de retenção, última limpeza e espaço liberado no total"""
+    return get_retention_service().status()
+
+
+@app.post("/retention/run")
+async def run_retention(dry_run: bool = Form(False)):
+    """
+    Executa uma passada de limpeza imediatamente
+
+    - dry_run: se True, apenas lista o que seria removido
+    """
+    return await run_in_threadpool(get_retention_service().run_once, dry_run)
+
+
+@app.get("/scheduler")
+def scheduler_status():
+    """Ocupação, filas por prioridade e por cliente e cotas do escalonador"""
+    return get_scheduler().status()
+
+
+@app.get("/metrics")
+def metrics():
+    """Expõe as métricas da aplicação no formato Prometheus"""
+    content, content_type = Instrumentation.export()
+    return Response(content=content, media_type=content_type)
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -1,2 +1,3 @@
+from prompts.dialogue import dialogue_template
 from prompts.map_reduce import combine_prompt_template, map_prompt_template
 from prompts.stuff import stuff_template
@@ -0,0 +1,11 @@
+dialogue_template = """
+        Você é roteirista de um podcast de divulgação científica apresentado por duas pessoas.
+        Transforme o resumo abaixo em um diálogo natural entre os apresentadores A e B: A conduz a conversa e apresenta o artigo; B faz perguntas, comenta e destaca implicações.
+        Cubra o objetivo, a contribuição principal, a metodologia, os resultados-chave e as conclusões, sem adicionar informações externas.
+        Escreva apenas as falas, uma por linha, cada uma começando com "A:" ou "B:".
+
+        RESUMO:
+        {text}
+
+        DIÁLOGO:
+        """
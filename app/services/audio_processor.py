@@ -0,0 +1,332 @@
+import json
+import math
+import multiprocessing
+import os
+import re
+import shutil
+import subprocess
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from config import (
+    AUDIO_HLS_ENABLED,
+    AUDIO_HLS_SEGMENT_SECONDS,
+    AUDIO_LOUDNESS_TARGET_LUFS,
+    AUDIO_LOW_BITRATE_KBPS,
+    AUDIO_OPUS_BITRATE_KBPS,
+    AUDIO_POSTPROCESS_ENABLED,
+    AUDIO_POSTPROCESS_WORKERS,
+    FFMPEG_PATH,
+    PODCAST_VARIANTS_DIR,
+)
+from utils.audio import mp3_file_duration
+
+# Variantes geradas: nome -> (arquivo, tipo MIME, argumentos do codificador)
+VARIANTS = {
+    "standard": (
+        "standard.mp3",
+        "audio/mpeg",
+        ["-c:a", "libmp3lame", "-b:a", "128k"],
+    ),
+    "low": (
+        "low.mp3",
+        "audio/mpeg",
+        ["-c:a", "libmp3lame", "-b:a", f"{AUDIO_LOW_BITRATE_KBPS}k", "-ac", "1"],
+    ),
+    "opus": (
+        "opus.ogg",
+        "audio/ogg",
+        ["-c:a", "libopus", "-b:a", f"{AUDIO_OPUS_BITRATE_KBPS}k", "-ac", "1"],
+    ),
+}
+
+HLS_MEDIA_TYPES = {".m3u8": "application/vnd.apple.mpegurl", ".ts": "video/mp2t"}
+
+# Conexões em que a variante de menor taxa de bits é servida
+_SLOW_CONNECTIONS = ("slow-2g", "2g", "3g")
+
+
+def process_audio(
+    audio_path: str, output_dir: str, settings: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Normaliza o loudness do áudio e gera as variantes e o HLS.
+    Executado nos processos do pool; cada arquivo é gravado com nome
+    temporário e renomeado ao final, de modo que leitores nunca vejam
+    uma variante parcial.
+
+    Args:
+        audio_path: MP3 original
+        output_dir: Diretório das variantes deste áudio
+        settings: ffmpeg, alvo de loudness e opções do HLS
+
+    Returns:
+        Loudness medido, variantes geradas (arquivo, bytes, duração) e HLS
+    """
+    ffmpeg = settings["ffmpeg"]
+    target = settings["target_lufs"]
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+
+    loudness = _measure_loudness(ffmpeg, audio_path, target)
+    audio_filter = _loudnorm_filter(target, loudness)
+
+    variants = {}
+    for name, (filename, _, codec_args) in VARIANTS.items():
+        temp = output / f".{os.getpid()}_{filename}"
+        _run_ffmpeg(ffmpeg, audio_path, ["-af", audio_filter, *codec_args], temp)
+        os.replace(temp, output / filename)
+        variants[name] = {
+            "file": filename,
+            "bytes": (output / filename).stat().st_size,
+        }
+    variants["standard"]["duration_seconds"] = mp3_file_duration(
+        output / VARIANTS["standard"][0]
+    )
+
+    hls = None
+    if settings["hls"]:
+        temp_dir = output / f".{os.getpid()}_hls"
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        temp_dir.mkdir()
+        hls_args = [
+            "-af",
+            audio_filter,
+            "-c:a",
+            "aac",
+            "-b:a",
+            "64k",
+            "-f",
+            "hls",
+            "-hls_time",
+            str(settings["hls_segment_seconds"]),
+            "-hls_playlist_type",
+            "vod",
+            "-hls_segment_filename",
+            str(temp_dir / "segment_%05d.ts"),
+        ]
+        _run_ffmpeg(ffmpeg, audio_path, hls_args, temp_dir / "index.m3u8")
+        shutil.rmtree(output / "hls", ignore_errors=True)
+        os.replace(temp_dir, output / "hls")
+        hls = {
+            "playlist": "hls/index.m3u8",
+            "segments": len(list((output / "hls").glob("*.ts"))),
+        }
+
+    return {
+        "status": "ready",
+        "loudness": {
+            "target_lufs": target,
+            "input_lufs": _finite(loudness["input_i"]),
+            "input_true_peak": _finite(loudness["input_tp"]),
+        },
+        "variants": variants,
+        "hls": hls,
+    }
+
+
+def _finite(value: str) -> Optional[float]:
+    """Valor medido pelo loudnorm, ou None para "-inf" (silêncio)."""
+    number = float(value)
+    return number if math.isfinite(number) else None
+
+
+def _run_ffmpeg(ffmpeg: str, source: str, args: list, destination: Path) -> str:
+    command = [ffmpeg, "-hide_banner", "-nostdin", "-y", "-i", str(source)]
+    completed = subprocess.run(
+        [*command, *args, str(destination)],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"ffmpeg falhou: {completed.stderr.strip()[-500:]}")
+    return completed.stderr
+
+
+def _measure_loudness(ffmpeg: str, source: str, target: float) -> Dict[str, str]:
+    """Primeira passada do filtro loudnorm: mede o loudness do original."""
+    completed = subprocess.run(
+        [
+            ffmpeg,
+            "-hide_banner",
+            "-nostdin",
+            "-i",
+            str(source),
+            "-af",
+            f"loudnorm=I={target}:TP=-1.5:LRA=11:print_format=json",
+            "-f",
+            "null",
+            "-",
+        ],
+        capture_output=True,
+        text=True,
+    )
+    match = re.search(r"\{[^{}]*\"input_i\"[^{}]*\}", completed.stderr)
+    if completed.returncode != 0 or match is None:
+        raise RuntimeError(f"ffmpeg falhou: {completed.stderr.strip()[-500:]}")
+    return json.loads(match.group(0))
+
+
+def _loudnorm_filter(target: float, measured: Dict[str, str]) -> str:
+    """Segunda passada do loudnorm: correção linear a partir da medição."""
+    if not math.isfinite(float(measured["input_i"])):
+        # Áudio silencioso: não há o que normalizar
+        return "anull"
+    return (
+        f"loudnorm=I={target}:TP=-1.5:LRA=11"
+        f":measured_I={measured['input_i']}:measured_TP={measured['input_tp']}"
+        f":measured_LRA={measured['input_lra']}"
+        f":measured_thresh={measured['input_thresh']}"
+        f":offset={measured['target_offset']}:linear=true"
+    )
+
+
+class AudioPostProcessor:
+    """
+    Pós-processa os podcasts gerados com o ffmpeg em um pool de processos:
+    normaliza o loudness, gera variantes de menor taxa de bits (MP3 mono e
+    Opus) e segmentos HLS, e escolhe a variante servida a cada cliente.
+    Sem ffmpeg instalado, os podcasts são servidos como gerados.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path = PODCAST_VARIANTS_DIR,
+        ffmpeg: str = FFMPEG_PATH,
+        workers: int = AUDIO_POSTPROCESS_WORKERS,
+        enabled: bool = AUDIO_POSTPROCESS_ENABLED,
+    ):
+        self.output_dir = output_dir
+        self.ffmpeg = shutil.which(ffmpeg) if enabled else None
+        self.workers = max(1, workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        """Indica se o ffmpeg foi encontrado e o pós-processamento está ativo."""
+        return self.ffmpeg is not None
+
+    def submit(
+        self, audio_path: Path, on_done: Callable[[Dict[str, Any]], None]
+    ) -> Optional[Future]:
+        """
+        Agenda o pós-processamento de um áudio.
+
+        Args:
+            audio_path: MP3 gerado
+            on_done: Recebe o resultado (ou {"status": "error", ...}) ao final
+
+        Returns:
+            Future da tarefa, ou None se o pós-processamento estiver indisponível
+        """
+        if not self.available:
+            return None
+
+        future = self._executor().submit(
+            process_audio,
+            str(audio_path),
+            str(self.variant_dir(audio_path)),
+            self._settings(),
+        )
+
+        def done(completed: Future) -> None:
+            try:
+                outcome = completed.result()
+            except Exception as e:
+                print(f"Erro no pós-processamento de '{audio_path}': {e}")
+                outcome = {"status": "error", "error": str(e)}
+            on_done(outcome)
+
+        future.add_done_callback(done)
+        return future
+
+    def variant_dir(self, audio_path: Path) -> Path:
+        """Diretório das variantes de um áudio."""
+        return self.output_dir / Path(audio_path).stem
+
+    def resolve(
+        self, audio_path: Path, variant: str, hints: Dict[str, Any]
+    ) -> Tuple[str, Path, str]:
+        """
+        Escolhe o arquivo a servir.
+
+        Args:
+            audio_path: MP3 original
+            variant: "auto", "original" ou um nome de VARIANTS
+            hints: Cabeçalhos do cliente (accept, save_data, ect, downlink)
+
+        Returns:
+            Tupla (variante, caminho, tipo MIME); variantes ainda não geradas
+            caem para o original
+        """
+        directory = self.variant_dir(audio_path)
+        ready = [
+            name
+            for name, (filename, _, _) in VARIANTS.items()
+            if (directory / filename).exists()
+        ]
+        if variant == "auto":
+            variant = self.choose_variant(ready, **hints)
+
+        if variant not in ready:
+            return "original", Path(audio_path), "audio/mpeg"
+        filename, media_type, _ = VARIANTS[variant]
+        return variant, directory / filename, media_type
+
+    @staticmethod
+    def choose_variant(
+        ready: Iterable[str],
+        accept: Optional[str] = None,
+        save_data: Optional[str] = None,
+        ect: Optional[str] = None,
+        downlink: Optional[float] = None,
+    ) -> str:
+        """
+        Variante adequada aos client hints: em conexões lentas ou com
+        `Save-Data: on`, Opus (se o cliente o aceitar) ou MP3 de baixa taxa
+        de bits; nos demais casos, o MP3 normalizado.
+        """
+        ready = set(ready)
+        slow = (
+            (save_data or "").lower() == "on"
+            or (ect or "").lower() in _SLOW_CONNECTIONS
+            or (downlink is not None and downlink < 1.0)
+        )
+        if slow:
+            accepts_opus = any(
+                media in (accept or "") for media in ("audio/ogg", "audio/opus")
+            )
+            if accepts_opus and "opus" in ready:
+                return "opus"
+            if "low" in ready:
+                return "low"
+        return "standard" if "standard" in ready else "original"
+
+    def _settings(self) -> Dict[str, Any]:
+        return {
+            "ffmpeg": self.ffmpeg,
+            "target_lufs": AUDIO_LOUDNESS_TARGET_LUFS,
+            "hls": AUDIO_HLS_ENABLED,
+            "hls_segment_seconds": AUDIO_HLS_SEGMENT_SECONDS,
+        }
+
+    def _executor(self) -> ProcessPoolExecutor:
+        """Pool de processos, criado no primeiro uso."""
+        with self._lock:
+            if self._pool is None:
+                # "spawn" evita herdar locks das threads do servidor
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+
+@lru_cache(maxsize=1)
+def get_audio_processor() -> AudioPostProcessor:
+    """Instância compartilhada do AudioPostProcessor."""
+    return AudioPostProcessor()
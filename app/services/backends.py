@@ -0,0 +1,160 @@
+from typing import Iterator, Optional
+
+from config import (
+    ELEVEN_LABS_API_KEY,
+    ELEVEN_LABS_BASE_URL,
+    FAKE_LLM_FAILURE_RATE,
+    FAKE_LLM_LATENCY_DISTRIBUTION,
+    FAKE_LLM_LATENCY_JITTER_MS,
+    FAKE_LLM_LATENCY_MS,
+    FAKE_LLM_OUTPUT_TOKENS,
+    FAKE_LLM_TOKENS_PER_SECOND,
+    FAKE_SEED,
+    FAKE_TTS_CHARS_PER_SECOND,
+    FAKE_TTS_FAILURE_RATE,
+    FAKE_TTS_LATENCY_DISTRIBUTION,
+    FAKE_TTS_LATENCY_JITTER_MS,
+    FAKE_TTS_LATENCY_MS,
+    LLM_BACKEND,
+    OPENAI_API_KEY,
+    OPENAI_MODEL,
+    TTS_BACKEND,
+)
+
+
+class ElevenLabsBackend:
+    """
+    Backend de TTS que usa a API da ElevenLabs.
+    """
+
+    name = "elevenlabs"
+
+    def __init__(
+        self, api_key: Optional[str] = None, base_url: str = ELEVEN_LABS_BASE_URL
+    ):
+        self.api_key = api_key or ELEVEN_LABS_API_KEY
+        self.base_url = base_url.rstrip("/")
+
+        if not self.api_key:
+            raise ValueError("ElevenLabs API key is required")
+
+    def synthesize(self, text: str, voice_id: str) -> bytes:
+        """Gera o áudio (MP3) correspondente ao texto."""
+        import requests
+
+        url = f"{self.base_url}/text-to-speech/{voice_id}/stream"
+
+        response = requests.post(url, json=self._payload(text), headers=self._headers())
+        response.raise_for_status()
+        return response.content
+
+    def stream(
+        self, text: str, voice_id: str, chunk_size: int = 64 * 1024
+    ) -> Iterator[bytes]:
+        """Gera o áudio em blocos, à medida que a resposta chega."""
+        import requests
+
+        url = f"{self.base_url}/text-to-speech/{voice_id}/stream"
+        with requests.post(
+            url,
+            json=self._payload(text),
+            headers=self._headers(),
+            stream=True,
+        ) as response:
+            response.raise_for_status()
+            yield from response.iter_content(chunk_size=chunk_size)
+
+    def _headers(self) -> dict:
+        return {
+            "Accept": "audio/mpeg",
+            "Content-Type": "application/json",
+            "xi-api-key": self.api_key,
+        }
+
+    @staticmethod
+    def _payload(text: str) -> dict:
+        return {
+            "text": text,
+            "model_id": "eleven_multilingual_v2",
+            "voice_settings": {
+                "stability": 0.5,
+                "similarity_boost": 0.75,
+                "style": 0.0,
+                "use_speaker_boost": True,
+            },
+        }
+
+    def list_voices(self) -> list:
+        """Retorna lista de vozes disponíveis na ElevenLabs API."""
+        import requests
+
+        url = f"{self.base_url}/voices"
+        headers = {"xi-api-key": self.api_key}
+
+        response = requests.get(url, headers=headers)
+        response.raise_for_status()
+        return response.json()["voices"]
+
+
+def create_llm(backend: str = LLM_BACKEND):
+    """
+    Cria o cliente de LLM de acordo com o backend configurado.
+
+    Args:
+        backend: "openai" ou "fake"
+
+    Returns:
+        Modelo de chat compatível com LangChain
+    """
+    if backend == "fake":
+        from services.fake_backends import FakeChatModel
+
+        return FakeChatModel(
+            seed=FAKE_SEED,
+            latency_ms=FAKE_LLM_LATENCY_MS,
+            latency_jitter_ms=FAKE_LLM_LATENCY_JITTER_MS,
+            latency_distribution=FAKE_LLM_LATENCY_DISTRIBUTION,
+            tokens_per_second=FAKE_LLM_TOKENS_PER_SECOND,
+            output_tokens=FAKE_LLM_OUTPUT_TOKENS,
+            failure_rate=FAKE_LLM_FAILURE_RATE,
+        )
+
+    if backend == "openai":
+        from langchain_openai import ChatOpenAI
+
+        return ChatOpenAI(
+            model=OPENAI_MODEL,
+            openai_api_key=OPENAI_API_KEY,
+        )
+
+    raise ValueError(f"Backend de LLM desconhecido: {backend}")
+
+
+def create_tts_backend(backend: str = TTS_BACKEND, api_key: Optional[str] = None):
+    """
+    Cria o backend de TTS de acordo com a configuração.
+
+    Args:
+        backend: "elevenlabs" ou "fake"
+        api_key: Chave da ElevenLabs (opcional, sobrescreve a configuração)
+
+    Returns:
+        Objeto com os métodos `synthesize(text, voice_id)`,
+        `stream(text, voice_id)` e `list_voices()`
+    """
+    if backend == "fake":
+        from services.fake_backends import FakeTTSBackend
+
+        return FakeTTSBackend(
+            seed=FAKE_SEED,
+            latency_ms=FAKE_TTS_LATENCY_MS,
+            latency_jitter_ms=FAKE_TTS_LATENCY_JITTER_MS,
+            latency_distribution=FAKE_TTS_LATENCY_DISTRIBUTION,
+            chars_per_second=FAKE_TTS_CHARS_PER_SECOND,
+            failure_rate=FAKE_TTS_FAILURE_RATE,
+        )
+
+    if backend == "elevenlabs":
+        return ElevenLabsBackend(api_key=api_key)
+
+    raise ValueError(f"Backend de TTS desconhecido: {backend}")
@@ -0,0 +1,382 @@
+import argparse
+import json
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+
+from config import (
+    BULK_INGEST_WORKERS,
+    BULK_MAX_FILE_BYTES,
+    BULK_MAX_TOTAL_BYTES,
+    BULK_MAX_ZIP_MEMBERS,
+    PDF_DIR,
+    SCHEDULER_SUMMARIZE_COST_TOKENS,
+)
+from utils.file_manager import FileManager
+from utils.metrics import Instrumentation
+
+from services.dedup_index import index_pdf
+from services.pdf_processor import PDFProcessor
+from services.scheduler import ANONYMOUS_TENANT, get_scheduler
+
+PDF_MAGIC = b"%PDF-"
+
+
+class ZipTooLargeError(ValueError):
+    """ZIP com mais arquivos ou bytes descompactados que o permitido."""
+
+
+class BulkIngestor:
+    """
+    Ingestão em lote de PDFs a partir de arquivos ZIP ou diretórios locais.
+    Valida, deduplica (por hash SHA-256) e registra os PDFs em paralelo.
+    """
+
+    # Cache de hashes dos PDFs já armazenados: caminho -> (mtime, tamanho, hash).
+    # PDFs removidos saem do cache a cada lote
+    _hash_cache: Dict[Path, Tuple[float, int, str]] = {}
+    _hash_cache_lock = threading.Lock()
+
+    def __init__(self, max_workers: int = BULK_INGEST_WORKERS):
+        self.max_workers = max(1, max_workers)
+        self._lock = threading.Lock()
+        # Hash -> nome do PDF armazenado (resolvido quando a cópia termina)
+        self._known_hashes: Dict[str, Future] = {}
+
+    def ingest_zip(self, zip_source: Union[str, Path, BinaryIO]) -> Dict[str, Any]:
+        """
+        Ingere todos os PDFs contidos em um arquivo ZIP.
+        Cada membro é copiado em blocos para uma área temporária, sem carregar
+        o arquivo inteiro em memória. O total descompactado é contado durante
+        a cópia, sem confiar nos tamanhos declarados no ZIP.
+
+        Args:
+            zip_source: Caminho ou objeto de arquivo (com seek) do ZIP
+
+        Returns:
+            Relatório com o resultado por arquivo e estatísticas de vazão
+
+        Raises:
+            ZipTooLargeError: Mais de BULK_MAX_ZIP_MEMBERS arquivos ou de
+                BULK_MAX_TOTAL_BYTES descompactados
+        """
+        start_time = time.time()
+
+        with tempfile.TemporaryDirectory(dir=PDF_DIR, prefix=".bulk_") as staging:
+            staging_dir = Path(staging)
+            items = []
+            early_results = []
+
+            extracted = 0
+            with zipfile.ZipFile(zip_source) as archive:
+                members = archive.infolist()
+                if len(members) > BULK_MAX_ZIP_MEMBERS:
+                    raise ZipTooLargeError(
+                        f"O ZIP tem mais de {BULK_MAX_ZIP_MEMBERS} arquivos"
+                    )
+                for index, info in enumerate(members):
+                    name = Path(info.filename).name
+                    if info.is_dir() or not self._is_candidate(info.filename):
+                        continue
+
+                    if info.file_size > BULK_MAX_FILE_BYTES:
+                        early_results.append(
+                            self._outcome(
+                                info.filename,
+                                "invalid",
+                                error="Arquivo excede o tamanho máximo permitido",
+                            )
+                        )
+                        continue
+
+                    # Prefixo numérico evita colisões entre pastas do ZIP
+                    staged_path = staging_dir / f"{index}" / name
+                    staged_path.parent.mkdir()
+                    with archive.open(info) as src, open(staged_path, "wb") as dst:
+                        extracted = self._copy_limited(src, dst, extracted)
+
+                    items.append((info.filename, staged_path))
+
+            results = early_results + self._process_items(items)
+
+        return self._build_report(results, start_time)
+
+    @staticmethod
+    def _copy_limited(src: BinaryIO, dst: BinaryIO, extracted: int) -> int:
+        """
+        Copia um membro do ZIP em blocos, somando-o ao total já extraído.
+
+        Returns:
+            Novo total de bytes extraídos
+        """
+        while block := src.read(1024 * 1024):
+            extracted += len(block)
+            if extracted > BULK_MAX_TOTAL_BYTES:
+                raise ZipTooLargeError(
+                    "O conteúdo descompactado do ZIP excede "
+                    f"{BULK_MAX_TOTAL_BYTES} bytes"
+                )
+            dst.write(block)
+        return extracted
+
+    def ingest_directory(
+        self, directory: Union[str, Path], root: Optional[Path] = None
+    ) -> Dict[str, Any]:
+        """
+        Ingere todos os PDFs de um diretório local (recursivamente).
+
+        Args:
+            directory: Diretório com os PDFs
+            root: Se informado, arquivos fora dele (ex.: links simbólicos
+                para outros diretórios) são ignorados
+
+        Returns:
+            Relatório com o resultado por arquivo e estatísticas de vazão
+        """
+        start_time = time.time()
+        directory = Path(directory)
+
+        if not directory.is_dir():
+            raise ValueError(f"Diretório '{directory}' não encontrado")
+
+        items = [
+            (str(path.relative_to(directory)), path)
+            for path in sorted(directory.rglob("*"))
+            if path.is_file()
+            and self._is_candidate(path.name)
+            and (root is None or path.resolve().is_relative_to(root.resolve()))
+        ]
+
+        return self._build_report(self._process_items(items), start_time)
+
+    def _process_items(self, items: List[Tuple[str, Path]]) -> List[Dict[str, Any]]:
+        """Valida, deduplica e registra os arquivos em paralelo."""
+        if not items:
+            return []
+
+        self._load_known_hashes()
+
+        with Instrumentation.stage("bulk_ingest", files=len(items)):
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                return list(executor.map(lambda item: self._process_item(*item), items))
+
+    def _process_item(self, source: str, path: Path) -> Dict[str, Any]:
+        """Processa um único arquivo candidato."""
+        try:
+            size = path.stat().st_size
+            if size > BULK_MAX_FILE_BYTES:
+                return self._outcome(
+                    source,
+                    "invalid",
+                    size_bytes=size,
+                    error="Arquivo excede o tamanho máximo permitido",
+                )
+
+            error = self._validate_pdf(path)
+            if error:
+                return self._outcome(source, "invalid", size_bytes=size, error=error)
+
+            file_hash = FileManager.compute_hash(path)
+
+            # O hash é reservado sob o lock para que duas cópias idênticas no
+            # mesmo lote não sejam registradas; a cópia do arquivo é feita
+            # fora dele, em paralelo com as demais
+            with self._lock:
+                registered = self._known_hashes.get(file_hash)
+                if registered is None:
+                    claim = self._known_hashes[file_hash] = Future()
+
+            if registered is not None:
+                return self._outcome(
+                    source,
+                    "duplicate",
+                    size_bytes=size,
+                    sha256=file_hash,
+                    duplicate_of=registered.result(),
+                )
+
+            try:
+                saved_path = PDFProcessor.save_pdf(str(path))
+            except BaseException as e:
+                with self._lock:
+                    del self._known_hashes[file_hash]
+                claim.set_exception(e)
+                raise
+            claim.set_result(saved_path.name)
+
+            # Cópias exatas já foram descartadas; versões quase idênticas
+            # (preprint x versão final, reenvios...) são detectadas em
+            # segundo plano
+            index_pdf(saved_path)
+
+            return self._outcome(
+                source,
+                "ingested",
+                size_bytes=size,
+                sha256=file_hash,
+                filename=saved_path.name,
+                path=str(saved_path),
+            )
+        except Exception as e:
+            return self._outcome(source, "error", error=str(e))
+
+    def _load_known_hashes(self) -> None:
+        """Calcula (ou reaproveita do cache) os hashes dos PDFs já armazenados."""
+        pdfs = PDFProcessor.get_all_pdfs()
+
+        def stored_hash(pdf: Path) -> Tuple[str, str]:
+            stat = pdf.stat()
+            with self._hash_cache_lock:
+                cached = self._hash_cache.get(pdf)
+            hit = bool(cached) and cached[:2] == (stat.st_mtime, stat.st_size)
+            Instrumentation.record_cache("pdf_hash", hit)
+            if hit:
+                return cached[2], pdf.name
+
+            file_hash = FileManager.compute_hash(pdf)
+            with self._hash_cache_lock:
+                self._hash_cache[pdf] = (stat.st_mtime, stat.st_size, file_hash)
+            return file_hash, pdf.name
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for file_hash, name in executor.map(stored_hash, pdfs):
+                if file_hash not in self._known_hashes:
+                    registered = self._known_hashes[file_hash] = Future()
+                    registered.set_result(name)
+
+        # O cache fica limitado aos PDFs armazenados no momento
+        stored = set(pdfs)
+        with self._hash_cache_lock:
+            for path in [path for path in self._hash_cache if path not in stored]:
+                del self._hash_cache[path]
+
+    @staticmethod
+    def _is_candidate(name: str) -> bool:
+        """Filtra arquivos que não são PDFs ou são metadados de sistema."""
+        path = Path(name)
+        return (
+            path.suffix.lower() == ".pdf"
+            and "__MACOSX" not in path.parts
+            and not path.name.startswith(".")
+        )
+
+    @staticmethod
+    def _validate_pdf(path: Path) -> Optional[str]:
+        """
+        Verifica se o arquivo é um PDF legível.
+        Retorna a mensagem de erro ou None se o arquivo for válido.
+        """
+        with open(path, "rb") as f:
+            if f.read(len(PDF_MAGIC)) != PDF_MAGIC:
+                return "Arquivo não possui cabeçalho PDF válido"
+
+        try:
+            from pypdf import PdfReader
+
+            if len(PdfReader(str(path)).pages) == 0:
+                return "PDF não possui páginas"
+        except Exception as e:
+            return f"PDF corrompido: {e}"
+
+        return None
+
+    @staticmethod
+    def _outcome(source: str, status: str, **details: Any) -> Dict[str, Any]:
+        """Monta o resultado de um arquivo."""
+        return {"source": source, "status": status, **details}
+
+    @staticmethod
+    def _build_report(
+        results: List[Dict[str, Any]], start_time: float
+    ) -> Dict[str, Any]:
+        """Agrega os resultados e calcula as estatísticas de vazão."""
+        elapsed = max(time.time() - start_time, 1e-6)
+        ingested = [r for r in results if r["status"] == "ingested"]
+        total_bytes = sum(r.get("size_bytes", 0) for r in results)
+
+        return {
+            "files": results,
+            "summary": {
+                "total": len(results),
+                "ingested": len(ingested),
+                "duplicates": sum(r["status"] == "duplicate" for r in results),
+                "invalid": sum(r["status"] == "invalid" for r in results),
+                "errors": sum(r["status"] == "error" for r in results),
+                "bytes_processed": total_bytes,
+                "elapsed_seconds": round(elapsed, 2),
+                "files_per_second": round(len(results) / elapsed, 2),
+                "mb_per_second": round(total_bytes / (1024 * 1024) / elapsed, 2),
+            },
+        }
+
+
+def summarize_ingested(
+    report: Dict[str, Any], method: str = "stuff", tenant: str = ANONYMOUS_TENANT
+) -> None:
+    """
+    Sumariza os PDFs registrados em um relatório de ingestão, com as mesmas
+    opções padrão e o mesmo agrupamento de pedidos da API.
+    Usado como tarefa em segundo plano após a ingestão; cada PDF passa pelo
+    escalonador com prioridade "batch", sem atrasar as requisições interativas.
+    """
+    from services.summarizer import (
+        DEFAULT_SUMMARY_OPTIONS,
+        run_summarization,
+        summarize_flight,
+        summary_key,
+    )
+
+    options = {**DEFAULT_SUMMARY_OPTIONS, "method": method}
+    scheduler = get_scheduler()
+    for item in report["files"]:
+        if item["status"] != "ingested":
+            continue
+        try:
+            pdf_path = Path(item["path"])
+            key = summary_key(pdf_path, options)
+            result = summarize_flight.join(key)
+            if result is not None:
+                result = result[0]
+            else:
+                with scheduler.slot(
+                    tenant, "batch", SCHEDULER_SUMMARIZE_COST_TOKENS
+                ) as ticket:
+                    result, shared = summarize_flight.do(
+                        key, run_summarization, pdf_path, options
+                    )
+                    usage = result.get("metadata", {}).get("token_usage") or {}
+                    ticket.actual_cost = 0 if shared else usage.get("total_tokens", 0)
+            if "error" in result:
+                print(f"Erro ao sumarizar '{item['filename']}': {result['error']}")
+        except Exception as e:
+            print(f"Erro ao sumarizar '{item['filename']}': {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Ingestão em lote de PDFs a partir de um ZIP ou diretório"
+    )
+    parser.add_argument("source", help="Arquivo ZIP ou diretório com PDFs")
+    parser.add_argument("--workers", type=int, default=BULK_INGEST_WORKERS)
+    parser.add_argument(
+        "--summarize",
+        choices=["stuff", "map_reduce"],
+        help="Sumariza os PDFs ingeridos com o método informado",
+    )
+    args = parser.parse_args()
+
+    ingestor = BulkIngestor(max_workers=args.workers)
+    source = Path(args.source)
+    if source.is_dir():
+        report = ingestor.ingest_directory(source)
+    else:
+        report = ingestor.ingest_zip(source)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if args.summarize:
+        summarize_ingested(report, method=args.summarize)
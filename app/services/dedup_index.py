@@ -0,0 +1,471 @@
+import hashlib
+import json
+import multiprocessing
+import random
+import re
+import sqlite3
+import struct
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from config import (
+    DEDUP_BANDS,
+    DEDUP_INDEX_PATH,
+    DEDUP_INDEX_WORKERS,
+    DEDUP_NUM_PERM,
+    DEDUP_SHINGLE_SIZE,
+    DEDUP_SIMILARITY_THRESHOLD,
+)
+from utils.metrics import Instrumentation
+
+from services.pdf_processor import PDFProcessor
+
+# Primo de Mersenne usado nas permutações universais do MinHash
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD_PATTERN = re.compile(r"\w+")
+
+# Uma linha por documento; remoções deixam a assinatura nula. `seq` cresce a
+# cada alteração, e cada processo lê apenas as linhas alteradas desde a
+# última leitura
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (
+    doc_id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    signature BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_signatures_seq ON signatures (seq);
+
+CREATE TABLE IF NOT EXISTS failures (
+    doc_id TEXT PRIMARY KEY,
+    error TEXT NOT NULL
+);
+"""
+
+
+class NearDuplicateIndex:
+    """
+    Índice MinHash + LSH para detectar artigos quase duplicados
+    (preprints, versões finais, reenvios) a partir do texto extraído.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = DEDUP_INDEX_PATH,
+        num_perm: int = DEDUP_NUM_PERM,
+        bands: int = DEDUP_BANDS,
+        shingle_size: int = DEDUP_SHINGLE_SIZE,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm deve ser múltiplo de bands")
+
+        self.path = path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        # Permutações determinísticas para que assinaturas persistidas
+        # continuem comparáveis entre execuções
+        rng = random.Random(num_perm)
+        self._permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+        self._signatures: Dict[str, Tuple[int, ...]] = {}
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[str]] = {}
+        self._failures: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        # O índice em disco (SQLite) é compartilhado entre workers: cada
+        # alteração grava só a linha do documento e cada processo aplica as
+        # linhas alteradas por outros antes de consultar
+        self._local = threading.local()
+        self._loaded_seq = 0
+        if path:
+            conn = self._connection()
+            conn.executescript(_SCHEMA)
+            self._import_legacy(conn)
+        self._refresh()
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        """
+        Calcula a assinatura MinHash dos shingles de palavras do texto.
+
+        Args:
+            text: Texto completo do documento
+
+        Returns:
+            Tupla com `num_perm` valores mínimos
+        """
+        words = _WORD_PATTERN.findall(text.lower())
+        size = self.shingle_size
+        shingles = {
+            " ".join(words[i : i + size]) for i in range(max(1, len(words) - size + 1))
+        }
+        hashes = [
+            int.from_bytes(
+                hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "big"
+            )
+            for s in shingles
+        ] or [0]
+
+        with Instrumentation.stage("minhash"):
+            return tuple(
+                min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH
+                for a, b in self._permutations
+            )
+
+    def query(
+        self,
+        signature: Tuple[int, ...],
+        threshold: float = DEDUP_SIMILARITY_THRESHOLD,
+        exclude: Optional[str] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Busca documentos com similaridade de Jaccard estimada >= threshold.
+
+        Args:
+            signature: Assinatura MinHash do documento consultado
+            threshold: Similaridade mínima
+            exclude: ID de documento a ignorar (o próprio documento)
+
+        Returns:
+            Lista de (ID, similaridade) ordenada da mais similar para a menos
+        """
+        with self._lock:
+            self._refresh()
+            candidates = set()
+            for key in self._band_keys(signature):
+                candidates.update(self._buckets.get(key, ()))
+            candidates.discard(exclude)
+
+            matches = []
+            for doc_id in candidates:
+                similarity = self._similarity(signature, self._signatures[doc_id])
+                if similarity >= threshold:
+                    matches.append((doc_id, round(similarity, 3)))
+
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def add(
+        self, doc_id: str, text: str, threshold: float = DEDUP_SIMILARITY_THRESHOLD
+    ) -> List[Tuple[str, float]]:
+        """
+        Indexa um documento e retorna os quase duplicados já existentes.
+
+        Args:
+            doc_id: Identificador do documento (nome do PDF)
+            text: Texto completo do documento
+            threshold: Similaridade mínima para considerar duplicado
+
+        Returns:
+            Lista de (ID, similaridade) dos quase duplicados
+        """
+        return self.add_signature(doc_id, self.signature(text), threshold)
+
+    def add_signature(
+        self,
+        doc_id: str,
+        signature: Tuple[int, ...],
+        threshold: float = DEDUP_SIMILARITY_THRESHOLD,
+    ) -> List[Tuple[str, float]]:
+        """Como `add`, com a assinatura já calculada (ver `compute_signature`)."""
+        matches = self.query(signature, threshold, exclude=doc_id)
+        self._write(doc_id, signature)
+        return matches
+
+    def find(
+        self, doc_id: str, text: str, threshold: float = DEDUP_SIMILARITY_THRESHOLD
+    ) -> List[Tuple[str, float]]:
+        """
+        Busca os quase duplicados de um documento, reaproveitando a
+        assinatura já indexada ou indexando-o se ainda não estiver no índice.
+        """
+        signature = self.get_signature(doc_id)
+        if signature is None:
+            return self.add(doc_id, text, threshold)
+        return self.query(signature, threshold, exclude=doc_id)
+
+    def get_signature(self, doc_id: str) -> Optional[Tuple[int, ...]]:
+        """Retorna a assinatura de um documento indexado, se houver."""
+        with self._lock:
+            self._refresh()
+            return self._signatures.get(doc_id)
+
+    def remove(self, doc_id: str) -> None:
+        """Remove um documento do índice."""
+        if self.get_signature(doc_id) is not None:
+            self._write(doc_id, None)
+        elif self.get_failure(doc_id) is not None:
+            self._clear_failure(doc_id)
+
+    def record_failure(self, doc_id: str, error: str) -> None:
+        """Registra que a indexação de um documento falhou."""
+        if not self.path:
+            with self._lock:
+                self._failures[doc_id] = error
+            return
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO failures (doc_id, error) VALUES (?, ?)"
+                " ON CONFLICT (doc_id) DO UPDATE SET error = excluded.error",
+                (doc_id, error),
+            )
+
+    def get_failure(self, doc_id: str) -> Optional[str]:
+        """Erro da última indexação de um documento, se ela falhou."""
+        if not self.path:
+            with self._lock:
+                return self._failures.get(doc_id)
+        row = (
+            self._connection()
+            .execute("SELECT error FROM failures WHERE doc_id = ?", (doc_id,))
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def _clear_failure(self, doc_id: str) -> None:
+        if not self.path:
+            with self._lock:
+                self._failures.pop(doc_id, None)
+            return
+        with self._connection() as conn:
+            conn.execute("DELETE FROM failures WHERE doc_id = ?", (doc_id,))
+
+    def _write(self, doc_id: str, signature: Optional[Tuple[int, ...]]) -> None:
+        """Grava (ou remove, com assinatura None) um documento."""
+        if not self.path:
+            with self._lock:
+                self._failures.pop(doc_id, None)
+                self._remove(doc_id)
+                if signature is not None:
+                    self._insert(doc_id, signature)
+            return
+
+        blob = None if signature is None else self._pack(signature)
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO signatures (doc_id, seq, signature) VALUES"
+                " (?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM signatures), ?)"
+                " ON CONFLICT (doc_id) DO UPDATE"
+                " SET seq = excluded.seq, signature = excluded.signature",
+                (doc_id, blob),
+            )
+            # Uma nova indexação (ou remoção) substitui a falha anterior
+            conn.execute("DELETE FROM failures WHERE doc_id = ?", (doc_id,))
+        with self._lock:
+            self._refresh()
+
+    def _insert(self, doc_id: str, signature: Tuple[int, ...]) -> None:
+        self._signatures[doc_id] = signature
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(doc_id)
+
+    def _remove(self, doc_id: str) -> bool:
+        signature = self._signatures.pop(doc_id, None)
+        if signature is None:
+            return False
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket:
+                bucket.discard(doc_id)
+                if not bucket:
+                    del self._buckets[key]
+        return True
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, signature[start : start + self.rows]
+
+    @staticmethod
+    def _similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+        return sum(a == b for a, b in zip(first, second)) / len(first)
+
+    def _refresh(self) -> None:
+        """Aplica as alterações gravadas (inclusive por outros processos)."""
+        if not self.path:
+            return
+        rows = (
+            self._connection()
+            .execute(
+                "SELECT seq, doc_id, signature FROM signatures"
+                " WHERE seq > ? ORDER BY seq",
+                (self._loaded_seq,),
+            )
+            .fetchall()
+        )
+        for seq, doc_id, blob in rows:
+            self._remove(doc_id)
+            # Assinaturas com outro num_perm não são comparáveis
+            if blob is not None and len(blob) == 4 * self.num_perm:
+                self._insert(doc_id, self._unpack(blob))
+            self._loaded_seq = seq
+
+    def _import_legacy(self, conn: sqlite3.Connection) -> None:
+        """Importa uma única vez o índice do formato antigo (JSON)."""
+        legacy = self.path.with_suffix(".json")
+        if not legacy.exists():
+            return
+        with conn:
+            # Lock de escrita antes de verificar: só um worker importa
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM signatures LIMIT 1").fetchone():
+                return
+            data = json.loads(legacy.read_text(encoding="utf-8"))
+            if data.get("num_perm") != self.num_perm:
+                return
+            conn.executemany(
+                "INSERT INTO signatures (doc_id, seq, signature) VALUES (?, ?, ?)",
+                (
+                    (doc_id, seq, self._pack(signature))
+                    for seq, (doc_id, signature) in enumerate(
+                        data["signatures"].items(), start=1
+                    )
+                ),
+            )
+
+    @staticmethod
+    def _pack(signature: Tuple[int, ...]) -> bytes:
+        return struct.pack(f"<{len(signature)}I", *signature)
+
+    @staticmethod
+    def _unpack(blob: bytes) -> Tuple[int, ...]:
+        return struct.unpack(f"<{len(blob) // 4}I", blob)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexão própria de cada thread (sqlite3 não compartilha conexões)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+@lru_cache(maxsize=1)
+def get_dedup_index() -> NearDuplicateIndex:
+    """Índice compartilhado, carregado do disco no primeiro uso."""
+    return NearDuplicateIndex()
+
+
+def compute_signature(
+    pdf_path: str, num_perm: int, bands: int, shingle_size: int
+) -> Tuple[int, ...]:
+    """
+    Extrai o texto de um PDF e calcula sua assinatura MinHash. Executada
+    em um processo separado: o cálculo em Python puro não disputa a CPU
+    (e o GIL) com as requisições.
+    """
+    # Páginas lidas uma a uma: só o texto fica em memória
+    pages = PDFProcessor.iter_pages(Path(pdf_path))
+    text = "\n".join(doc.page_content for doc in pages)
+    index = NearDuplicateIndex(
+        path=None, num_perm=num_perm, bands=bands, shingle_size=shingle_size
+    )
+    return index.signature(text)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _executor() -> ProcessPoolExecutor:
+    """Pool de processos da indexação, criado no primeiro uso."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # "spawn" evita herdar locks das threads do servidor
+            _pool = ProcessPoolExecutor(
+                max_workers=DEDUP_INDEX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def index_pdf(pdf_path: Path) -> Future:
+    """
+    Agenda a indexação de um PDF recém-armazenado, em segundo plano. Falhas
+    na indexação não afetam o upload: o PDF fica fora do índice e o erro é
+    registrado (ver `index_failure`).
+
+    Args:
+        pdf_path: Caminho do PDF armazenado
+
+    Returns:
+        Future com a lista de quase duplicados ({"filename", "similarity"}),
+        ou com a exceção se a indexação falhar
+    """
+    result: Future = Future()
+    index = None
+
+    def failed(e: Exception) -> None:
+        print(f"Erro ao indexar '{pdf_path.name}': {e}")
+        if index is not None:
+            try:
+                index.record_failure(pdf_path.name, str(e) or type(e).__name__)
+            except Exception as record_error:
+                print(f"Erro ao registrar a falha de '{pdf_path.name}': {record_error}")
+        result.set_exception(e)
+
+    def done(completed: Future) -> None:
+        try:
+            matches = index.add_signature(pdf_path.name, completed.result())
+        except Exception as e:
+            failed(e)
+            return
+        result.set_result(_as_dicts(matches))
+
+    try:
+        index = get_dedup_index()
+        job = _executor().submit(
+            compute_signature,
+            str(pdf_path),
+            index.num_perm,
+            index.bands,
+            index.shingle_size,
+        )
+    except Exception as e:
+        failed(e)
+        return result
+
+    job.add_done_callback(done)
+    return result
+
+
+def near_duplicates(
+    pdf_name: str, threshold: float = DEDUP_SIMILARITY_THRESHOLD
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Quase duplicados de um PDF já indexado.
+
+    Args:
+        pdf_name: Nome do PDF armazenado
+        threshold: Similaridade mínima
+
+    Returns:
+        Lista de quase duplicados ({"filename", "similarity"}), ou None se o
+        PDF não está no índice (indexação pendente ou com falha)
+    """
+    index = get_dedup_index()
+    signature = index.get_signature(pdf_name)
+    if signature is None:
+        return None
+    return _as_dicts(index.query(signature, threshold, exclude=pdf_name))
+
+
+def index_failure(pdf_name: str) -> Optional[str]:
+    """Erro da indexação de um PDF, se ela falhou."""
+    return get_dedup_index().get_failure(pdf_name)
+
+
+def _as_dicts(matches: List[Tuple[str, float]]) -> List[Dict[str, Any]]:
+    return [
+        {"filename": doc_id, "similarity": similarity} for doc_id, similarity in matches
+    ]
@@ -0,0 +1,209 @@
+import hashlib
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+from utils.audio import MP3_FRAME_SECONDS, SILENT_MP3_FRAME
+
+
+class FakeBackendError(RuntimeError):
+    """Falha simulada por um backend falso."""
+
+
+class LatencyModel:
+    """
+    Amostra latências (em segundos) a partir de uma distribuição configurável.
+    """
+
+    DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal")
+
+    def __init__(self, mean_ms: float, jitter_ms: float, distribution: str):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Distribuição de latência inválida: {distribution}")
+
+        self.mean_ms = max(0.0, mean_ms)
+        self.jitter_ms = max(0.0, jitter_ms)
+        self.distribution = distribution
+
+    def sample(self, rng: random.Random) -> float:
+        """Retorna uma latência amostrada usando o gerador informado."""
+        if self.distribution == "constant" or self.jitter_ms == 0:
+            value = self.mean_ms
+        elif self.distribution == "uniform":
+            value = rng.uniform(
+                self.mean_ms - self.jitter_ms, self.mean_ms + self.jitter_ms
+            )
+        elif self.distribution == "normal":
+            value = rng.gauss(self.mean_ms, self.jitter_ms)
+        else:
+            # Parametriza a lognormal para ter a média e o desvio configurados
+            mean = max(self.mean_ms, 1e-6)
+            sigma2 = math.log1p((self.jitter_ms / mean) ** 2)
+            mu = math.log(mean) - sigma2 / 2
+            value = rng.lognormvariate(mu, sigma2**0.5)
+
+        return max(0.0, value) / 1000
+
+
+class _DeterministicSource:
+    """
+    Gera um `random.Random` reprodutível por entrada.
+    A semente combina a semente global, o conteúdo e o número da tentativa,
+    de modo que repetições da mesma entrada possam ter resultados diferentes
+    mas a sequência completa seja idêntica entre execuções. Apenas as
+    `max_keys` entradas usadas mais recentemente têm a contagem mantida; as
+    demais voltam à primeira tentativa.
+    """
+
+    def __init__(self, seed: int, max_keys: int = 10_000):
+        self.seed = seed
+        self.max_keys = max_keys
+        self._attempts: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def rng_for(self, content: str) -> random.Random:
+        key = hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+        with self._lock:
+            attempt = self._attempts.pop(key, 0)
+            self._attempts[key] = attempt + 1
+            if len(self._attempts) > self.max_keys:
+                self._attempts.popitem(last=False)
+
+        material = f"{self.seed}:{key}:{attempt}".encode("utf-8")
+        digest = hashlib.sha256(material).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Modelo de chat falso e determinístico, compatível com as chains do LangChain.
+    Simula latência, vazão de tokens e falhas sem acessar a rede.
+    """
+
+    model_name: str = "fake-llm"
+    seed: int = 42
+    latency_ms: float = 200
+    latency_jitter_ms: float = 50
+    latency_distribution: str = "normal"
+    tokens_per_second: float = 0
+    output_tokens: int = 120
+    failure_rate: float = 0.0
+
+    _source: _DeterministicSource = PrivateAttr()
+    _latency: LatencyModel = PrivateAttr()
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._source = _DeterministicSource(self.seed)
+        self._latency = LatencyModel(
+            self.latency_ms, self.latency_jitter_ms, self.latency_distribution
+        )
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def get_num_tokens(self, text: str) -> int:
+        """Estimativa local de tokens (~4 caracteres por token)."""
+        return len(text) // 4
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        rng = self._source.rng_for(prompt)
+
+        delay = self._latency.sample(rng)
+        if self.tokens_per_second > 0:
+            delay += self.output_tokens / self.tokens_per_second
+        time.sleep(delay)
+
+        if rng.random() < self.failure_rate:
+            raise FakeBackendError("Falha simulada do LLM falso")
+
+        # Resposta reprodutível composta por palavras do próprio prompt
+        words = prompt.split() or ["resumo"]
+        text = " ".join(rng.choice(words) for _ in range(self.output_tokens))
+
+        prompt_tokens = len(prompt) // 4
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": self.output_tokens,
+            "total_tokens": prompt_tokens + self.output_tokens,
+        }
+
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=text))],
+            llm_output={"token_usage": usage, "model_name": self.model_name},
+        )
+
+
+class FakeTTSBackend:
+    """
+    Backend de TTS falso e determinístico.
+    Produz MP3 silencioso com duração proporcional ao texto.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        seed: int = 42,
+        latency_ms: float = 300,
+        latency_jitter_ms: float = 100,
+        latency_distribution: str = "normal",
+        chars_per_second: float = 0,
+        failure_rate: float = 0.0,
+    ):
+        self.chars_per_second = chars_per_second
+        self.failure_rate = failure_rate
+        self._source = _DeterministicSource(seed)
+        self._latency = LatencyModel(
+            latency_ms, latency_jitter_ms, latency_distribution
+        )
+
+    def synthesize(self, text: str, voice_id: str) -> bytes:
+        """Gera o áudio (MP3) correspondente ao texto."""
+        return SILENT_MP3_FRAME * self._render(text, voice_id)
+
+    def stream(
+        self, text: str, voice_id: str, frames_per_chunk: int = 256
+    ) -> Iterator[bytes]:
+        """Gera o áudio em blocos, como a resposta em streaming da ElevenLabs."""
+        frames = self._render(text, voice_id)
+        for start in range(0, frames, frames_per_chunk):
+            yield SILENT_MP3_FRAME * min(frames_per_chunk, frames - start)
+
+    def _render(self, text: str, voice_id: str) -> int:
+        """Simula a latência e as falhas do TTS e retorna o número de quadros."""
+        rng = self._source.rng_for(f"{voice_id}:{text}")
+
+        delay = self._latency.sample(rng)
+        if self.chars_per_second > 0:
+            delay += len(text) / self.chars_per_second
+        time.sleep(delay)
+
+        if rng.random() < self.failure_rate:
+            raise FakeBackendError("Falha simulada do TTS falso")
+
+        # Aproximadamente 15 caracteres falados por segundo
+        return max(1, int(len(text) / 15 / MP3_FRAME_SECONDS))
+
+    def list_voices(self) -> list:
+        """Retorna vozes fictícias."""
+        return [
+            {"voice_id": "fake-voice-1", "name": "Fake One"},
+            {"voice_id": "fake-voice-2", "name": "Fake Two"},
+        ]
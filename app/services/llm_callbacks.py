@@ -0,0 +1,78 @@
+import threading
+import time
+from typing import Any, Dict
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from utils.metrics import STAGE_DURATION, STAGE_ERRORS, Instrumentation, Span
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Callback do LangChain que mede cada chamada ao LLM e contabiliza os
+    tokens consumidos, tanto nas métricas globais quanto por execução.
+    """
+
+    def __init__(self, stage: str = "llm_call"):
+        self.stage = stage
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._started: Dict[UUID, tuple] = {}
+        self._lock = threading.Lock()
+
+    def on_llm_start(self, serialized: Any, prompts: Any, *, run_id: UUID, **kwargs):
+        self._start(run_id)
+
+    def on_chat_model_start(
+        self, serialized: Any, messages: Any, *, run_id: UUID, **kwargs
+    ):
+        self._start(run_id)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs):
+        self._finish(run_id)
+
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+        Instrumentation.record_tokens(prompt_tokens, completion_tokens)
+
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        STAGE_ERRORS.labels(stage=self.stage).inc()
+        self._finish(run_id)
+
+    def usage(self) -> Dict[str, int]:
+        """Resumo do consumo de tokens desta execução."""
+        return {
+            "llm_calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.prompt_tokens + self.completion_tokens,
+        }
+
+    def _start(self, run_id: UUID) -> None:
+        # Os callbacks podem rodar fora do contexto da requisição, então o
+        # span pai é capturado aqui e o span é criado manualmente
+        parent = Instrumentation.current_span()
+        span = None
+        if parent is not None:
+            span = Span(self.stage)
+            parent.add_child(span)
+        with self._lock:
+            self._started[run_id] = (time.perf_counter(), span)
+
+    def _finish(self, run_id: UUID) -> None:
+        with self._lock:
+            start_time, span = self._started.pop(run_id, (None, None))
+        if start_time is None:
+            return
+        elapsed = time.perf_counter() - start_time
+        STAGE_DURATION.labels(stage=self.stage).observe(elapsed)
+        if span is not None:
+            span.finish()
@@ -0,0 +1,61 @@
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+from config import MAP_CACHE_DIR
+from utils.file_manager import FileManager
+from utils.metrics import Instrumentation
+
+
+class MapCache:
+    """
+    Cache em disco dos resumos parciais (fase "map") do map_reduce.
+    Cada entrada é indexada pelo hash do conteúdo da página, do modelo e do
+    prompt, de modo que uma nova versão de um artigo só reprocessa as
+    páginas que mudaram.
+    """
+
+    def __init__(self, directory: Path = MAP_CACHE_DIR):
+        self.directory = directory
+
+    @staticmethod
+    def key(content: str, model: str, prompt: str) -> str:
+        """
+        Calcula a chave de uma página.
+
+        Args:
+            content: Texto da página (já limpo)
+            model: Nome do modelo usado no map
+            prompt: Template do prompt do map
+
+        Returns:
+            Hash SHA-256 em hexadecimal
+        """
+        digest = hashlib.sha256()
+        for part in (model, prompt, content):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Retorna o resumo parcial armazenado ou None."""
+        path = self.path(key)
+        try:
+            text = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            text = None
+        Instrumentation.record_cache("map_summary", text is not None)
+        if text is not None:
+            FileManager.mark_accessed(path)
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        """Armazena o resumo parcial de uma página."""
+        path = self.path(key)
+        path.parent.mkdir(exist_ok=True)
+        FileManager.write_bytes_atomic(path, text.encode("utf-8"))
+
+    def path(self, key: str) -> Path:
+        """Arquivo de uma entrada (existente ou não)."""
+        # Subdiretórios pelo prefixo do hash evitam diretórios gigantes
+        return self.directory / key[:2] / f"{key}.txt"
@@ -1,11 +1,37 @@
+from __future__ import annotations
+
 import re
+from collections import Counter
 from pathlib import Path
-from typing import List, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Set, Tuple
 
-from config import PDF_DIR
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_core.documents import Document
+from config import LOW_MEMORY_PAGE_THRESHOLD, PDF_DIR
 from utils.file_manager import FileManager
+from utils.metrics import Instrumentation
+from utils.text_processor import TextProcessor
+
+from services.section_parser import SectionParser
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+# Linhas do topo/rodapé de cada página consideradas na análise posicional
+BOILERPLATE_EDGE_LINES = 3
+
+# Linhas típicas de cabeçalho/rodapé (números de página, DOI, licenças)
+BOILERPLATE_PATTERN = re.compile(
+    r"^(?:"
+    r"(?:page|página|pág\.|p\.)?\s*\d+(?:\s*(?:of|de|/)\s*\d+)?"
+    r"|(?:doi:|https?://(?:dx\.)?doi\.org/)\S+.*"
+    r"|.*(?:creative commons|cc[ -]by|licensed under|licenciado sob"
+    r"|all rights reserved|todos os direitos reservados|©|\(c\)\s*\d{4}).*"
+    r"|(?:downloaded from|baixado de|preprint)\s.*|arxiv:\S+.*"
+    r")$",
+    re.IGNORECASE,
+)
+
+# Palavras hifenizadas na quebra de linha ("sum-\nmarization")
+HYPHENATION_PATTERN = re.compile(r"(\w)-\n(\w)")
 
 
 class PDFProcessor:
@@ -34,12 +60,147 @@ class PDFProcessor:
         Retorna lista de documentos Langchain.
         """
         try:
-            loader = PyPDFLoader(str(pdf_path))
-            return loader.load()
+            from langchain_community.document_loaders import PyPDFLoader
+
+            with Instrumentation.stage("extraction") as span:
+                documents = PyPDFLoader(str(pdf_path)).load()
+                if span is not None:
+                    span.attributes["pages"] = len(documents)
+            return documents
         except Exception as e:
             print(f"Erro ao extrair texto do PDF: {e}")
             return []
 
+    @staticmethod
+    def iter_pages(pdf_path: Path) -> Iterator[Document]:
+        """
+        Extrai o texto do PDF uma página por vez, sem manter a lista de
+        documentos em memória (modo de memória limitada). O texto é o mesmo
+        do PyPDFLoader; cada página é medida como a etapa "extraction.page".
+        """
+        from langchain_core.documents import Document
+        from pypdf import PdfReader
+
+        with open(pdf_path, "rb") as stream:
+            reader = PdfReader(stream)
+            metadata = {"source": str(pdf_path), "total_pages": len(reader.pages)}
+            for number, page in enumerate(reader.pages):
+                with Instrumentation.stage("extraction.page"):
+                    text = page.extract_text().strip()
+                    # O pypdf guarda os objetos já lidos (inclusive o conteúdo
+                    # decodificado de cada página) até o fim da leitura
+                    reader.resolved_objects.clear()
+                yield Document(page_content=text, metadata={**metadata, "page": number})
+
+    @staticmethod
+    def page_count(pdf_path: Path) -> int:
+        """Número de páginas do PDF, sem extrair o texto."""
+        from pypdf import PdfReader
+
+        return len(PdfReader(str(pdf_path)).pages)
+
+    @staticmethod
+    def is_large(pdf_path: Path, threshold: int = LOW_MEMORY_PAGE_THRESHOLD) -> bool:
+        """
+        Indica se o PDF deve ser processado no modo de memória limitada
+        (mais de `threshold` páginas; 0 desativa).
+        """
+        if threshold <= 0:
+            return False
+        try:
+            return PDFProcessor.page_count(pdf_path) > threshold
+        except Exception as e:
+            print(f"Erro ao contar as páginas de '{pdf_path.name}': {e}")
+            return False
+
+    @staticmethod
+    def strip_boilerplate(
+        documents: List[Document], min_page_ratio: float = 0.5
+    ) -> Tuple[List[Document], Dict[str, Any]]:
+        """
+        Remove cabeçalhos, rodapés, números de página, DOIs e linhas de licença
+        repetidos entre as páginas, além de hifenizações de quebra de linha.
+
+        Uma linha é considerada repetida quando, após normalizar dígitos e
+        espaços, aparece no topo ou no rodapé de pelo menos `min_page_ratio`
+        das páginas.
+
+        Args:
+            documents: Lista de documentos Langchain extraídos do PDF
+            min_page_ratio: Fração mínima de páginas em que a linha se repete
+
+        Returns:
+            Tuple contendo:
+                - Lista de documentos limpos
+                - Dicionário com linhas, caracteres e tokens estimados removidos
+        """
+        report = {"lines_removed": 0, "chars_removed": 0, "tokens_saved": 0}
+        if not documents:
+            return documents, report
+
+        with Instrumentation.stage("boilerplate_removal"):
+            repeated = PDFProcessor.boilerplate_lines(documents, min_page_ratio)
+            for doc in documents:
+                PDFProcessor.clean_page(doc, repeated, report)
+
+        return documents, report
+
+    @staticmethod
+    def boilerplate_lines(
+        documents: Iterable[Document], min_page_ratio: float = 0.5
+    ) -> Set[str]:
+        """
+        Linhas de borda (normalizadas) repetidas em pelo menos
+        `min_page_ratio` das páginas. Percorre os documentos uma única vez,
+        guardando apenas as linhas de topo e rodapé.
+        """
+        edge_counts = Counter()
+        num_pages = 0
+        for doc in documents:
+            lines = doc.page_content.splitlines()
+            edges = lines[:BOILERPLATE_EDGE_LINES] + lines[-BOILERPLATE_EDGE_LINES:]
+            edge_counts.update({PDFProcessor._normalize_line(line) for line in edges})
+            num_pages += 1
+        edge_counts.pop("", None)
+
+        threshold = max(2, min_page_ratio * num_pages)
+        return {line for line, n in edge_counts.items() if n >= threshold}
+
+    @staticmethod
+    def clean_page(
+        doc: Document, repeated: Set[str], report: Dict[str, Any]
+    ) -> Document:
+        """
+        Remove de uma página as linhas de borda repetidas ou típicas de
+        cabeçalho/rodapé e as hifenizações, acumulando os totais em `report`.
+        """
+        lines = doc.page_content.splitlines()
+        last = len(lines) - BOILERPLATE_EDGE_LINES
+        kept = []
+        for i, line in enumerate(lines):
+            at_edge = i < BOILERPLATE_EDGE_LINES or i >= last
+            stripped = line.strip()
+            if at_edge and (
+                PDFProcessor._normalize_line(line) in repeated
+                or BOILERPLATE_PATTERN.match(stripped)
+            ):
+                report["lines_removed"] += 1
+                continue
+            kept.append(line)
+
+        cleaned = HYPHENATION_PATTERN.sub(r"\1\2", "\n".join(kept))
+        report["chars_removed"] += len(doc.page_content) - len(cleaned)
+        report["tokens_saved"] += TextProcessor.estimate_tokens(
+            doc.page_content
+        ) - TextProcessor.estimate_tokens(cleaned)
+        doc.page_content = cleaned
+        return doc
+
+    @staticmethod
+    def _normalize_line(line: str) -> str:
+        """Normaliza uma linha para comparação (dígitos e espaços)."""
+        return re.sub(r"\s+", " ", re.sub(r"\d+", "#", line)).strip().lower()
+
     @staticmethod
     def remove_references(documents: List[Document]) -> Tuple[List[Document], bool]:
         """
@@ -56,32 +217,41 @@ class PDFProcessor:
         if not documents:
             return documents, False
 
-        # Padrões comuns que indicam o início de seções de referências
-        reference_patterns = [
-            r"^references$",
-            r"^referências$",
-            # r"^bibliografia$",
-            # r"^referências bibliográficas$",
-            # r"^works cited$",
-            # r"^literatura citada$",
-            # r"^cited literature$",
-            # r"^citation$",
-            # r"^citations$",
-            # r"^reference list$",
-        ]
-
-        # Combinar padrões em uma expressão regular (case insensitive)
-        combined_pattern = "|".join(reference_patterns)
-
-        cleaned_documents = []
-        references_removed = False
-
-        # Procurar pela seção de referências
-        for _, doc in enumerate(documents):
+        with Instrumentation.stage("reference_removal"):
+            return PDFProcessor._remove_references(documents)
+
+    @staticmethod
+    def _remove_references(
+        documents: List[Document],
+    ) -> Tuple[List[Document], bool]:
+        """Implementação de `remove_references` (documentos não vazios)."""
+        report = {"references_removed": False}
+        cleaned_documents = list(PDFProcessor.until_references(documents, report))
+
+        # Se não encontrou referências, manter os documentos como estão
+        if not report["references_removed"]:
+            return documents, False
+
+        return cleaned_documents, True
+
+    @staticmethod
+    def until_references(
+        documents: Iterable[Document], report: Dict[str, Any]
+    ) -> Iterator[Document]:
+        """
+        Repassa os documentos até o início da seção de referências (a página
+        em que ela começa é truncada) e marca `report["references_removed"]`.
+        Consome os documentos sob demanda, então serve para páginas lidas
+        uma a uma; as páginas após as referências também são consumidas,
+        para que as etapas anteriores (ex.: o relatório de cabeçalhos e
+        rodapés) as contabilizem como no processamento em memória.
+        """
+        documents = iter(documents)
+        for doc in documents:
             content = doc.page_content
 
             # Verificar se este documento contém o início da seção de referências
-            match = re.search(combined_pattern, content.lower(), re.MULTILINE)
+            match = SectionParser.find_references(content)
 
             if match:
                 # Obter apenas o conteúdo antes da seção de referências
@@ -89,20 +259,15 @@ class PDFProcessor:
                 if ref_start_pos > 0:
                     # Atualizar o conteúdo para incluir apenas o que está antes das referências
                     doc.page_content = content[:ref_start_pos].strip()
-                    cleaned_documents.append(doc)
+                    yield doc
 
                 # Não incluir páginas após a seção de referências
-                references_removed = True
-                break
-
-            # Se não encontrou referências, manter o documento como está
-            cleaned_documents.append(doc)
-
-        # Se já encontrou a seção de referências, não incluir os documentos seguintes
-        if references_removed:
-            return cleaned_documents, True
+                report["references_removed"] = True
+                for _ in documents:
+                    pass
+                return
 
-        return documents, False
+            yield doc
 
     @staticmethod
     def get_pdf_metadata(pdf_path: Path) -> dict:
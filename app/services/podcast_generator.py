@@ -1,88 +1,127 @@
-import json
+import hashlib
 import time
-from typing import Any, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
-import requests
-from config import ELEVEN_LABS_API_KEY, PODCAST_DIR
+from config import (
+    DIALOGUE_PAUSE_MS,
+    DIALOGUE_TTS_CONCURRENCY,
+    DIALOGUE_VOICES,
+    PODCAST_DIR,
+    TTS_BACKEND,
+)
+from utils.audio import concat_mp3, iter_concat_mp3, mp3_file_duration
+from utils.file_manager import FileManager
+from utils.metrics import Instrumentation
+from utils.single_flight import SingleFlight
 from utils.text_processor import TextProcessor
 
+from services.audio_processor import get_audio_processor
+from services.backends import create_tts_backend
+from services.result_store import get_result_store
+from services.segment_cache import SegmentCache
+
+# Pedidos simultâneos para o mesmo texto, voz e PDF geram um único áudio,
+# inclusive entre workers diferentes
+_podcast_flight = SingleFlight("podcast", distributed=True)
+
 
 class PodcastGenerator:
     """
     Responsável por gerar podcasts a partir de textos usando TTS.
     """
 
-    def __init__(self, api_key: Optional[str] = None):
-        self.api_key = api_key or ELEVEN_LABS_API_KEY
-        self.base_url = "https://api.elevenlabs.io/v1"
+    # Rótulos dos apresentadores no roteiro do diálogo
+    SPEAKERS = ("A", "B")
 
-        if not self.api_key:
-            raise ValueError("ElevenLabs API key is required")
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        backend: Any = None,
+        summarizer: Any = None,
+        segment_cache: Optional[SegmentCache] = None,
+        concurrency: int = DIALOGUE_TTS_CONCURRENCY,
+    ):
+        self.backend = backend or create_tts_backend(TTS_BACKEND, api_key=api_key)
+        self._summarizer = summarizer
+        self.segment_cache = segment_cache or SegmentCache()
+        self.concurrency = max(1, concurrency)
 
     def generate_podcast(
-        self, text: str, voice_id: str = "21m00Tcm4TlvDq8ikWAM"
+        self,
+        text: str,
+        voice_id: str = "21m00Tcm4TlvDq8ikWAM",
+        source_file: Optional[str] = None,
+        low_memory: bool = False,
     ) -> Dict[str, Any]:
         """
-        Gera um arquivo de áudio a partir do texto usando ElevenLabs API.
+        Gera um arquivo de áudio a partir do texto usando o backend de TTS.
 
         Args:
             text: Texto para transformar em áudio
             voice_id: ID da voz a ser usada (padrão é "Rachel")
+            source_file: PDF de origem do resumo, registrado no histórico
+            low_memory: Grava o áudio no arquivo à medida que chega do TTS,
+                sem mantê-lo inteiro em memória
 
         Returns:
             Dicionário com informações sobre o podcast gerado
         """
+        # O PDF de origem faz parte da chave: o áudio é registrado em seu nome
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        key = (self.backend.name, voice_id, source_file, low_memory, text_hash)
+        result, shared = _podcast_flight.do(
+            key, self._generate_podcast, text, voice_id, source_file, low_memory
+        )
+        return self._mark_coalesced(result, shared)
 
+    def _generate_podcast(
+        self, text: str, voice_id: str, source_file: Optional[str], low_memory: bool
+    ) -> Dict[str, Any]:
+        """Implementação de `generate_podcast`, executada uma vez por chave."""
         formatted_text = TextProcessor.format_for_tts(text)
 
-        url = f"{self.base_url}/text-to-speech/{voice_id}/stream"
-
-        headers = {
-            "Accept": "audio/mpeg",
-            "Content-Type": "application/json",
-            "xi-api-key": self.api_key,
-        }
-
-        data = {
-            "text": formatted_text,
-            "model_id": "eleven_multilingual_v2",
-            "voice_settings": {
-                "stability": 0.5,
-                "similarity_boost": 0.75,
-                "style": 0.0,
-                "use_speaker_boost": True,
-            },
-        }
-
         start_time = time.time()
 
         try:
-            response = requests.post(url, json=data, headers=headers)
-            response.raise_for_status()
-
             timestamp = time.strftime("%Y%m%d_%H%M%S")
             filename = TextProcessor.sanitize_filename(text[:30])
             audio_path = PODCAST_DIR / f"podcast_{timestamp}_{filename}.mp3"
 
-            with open(audio_path, "wb") as f:
-                f.write(response.content)
+            if low_memory:
+                with Instrumentation.stage(
+                    "tts_synthesis", chars=len(formatted_text), streamed=True
+                ):
+                    audio_path = FileManager.write_chunks_unique(
+                        audio_path, self._stream(formatted_text, voice_id)
+                    )
+            else:
+                with Instrumentation.stage("tts_synthesis", chars=len(formatted_text)):
+                    audio = self.backend.synthesize(formatted_text, voice_id)
+
+                with Instrumentation.stage("file_write", kind="audio"):
+                    audio_path = FileManager.write_bytes_unique(audio_path, audio)
 
             duration = time.time() - start_time
 
             result = {
                 "audio_path": str(audio_path),
                 "metadata": {
+                    "mode": "monologue",
+                    "low_memory": low_memory,
                     "voice_id": voice_id,
+                    "tts_backend": self.backend.name,
                     "text_length": len(text),
+                    "tts_chars": len(formatted_text),
                     "duration_seconds": round(duration, 2),
                     "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
                 },
             }
 
             # Salvar metadados
-            metadata_path = audio_path.with_suffix(".json")
-            with open(metadata_path, "w", encoding="utf-8") as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
+            self._store(result, source_file)
 
             return result
 
@@ -91,15 +130,257 @@ class PodcastGenerator:
             print(error_msg)
             return {"error": error_msg}
 
-    def list_available_voices(self) -> list:
-        """Retorna lista de vozes disponíveis na ElevenLabs API."""
-        url = f"{self.base_url}/voices"
-        headers = {"xi-api-key": self.api_key}
+    def generate_dialogue(
+        self,
+        text: str,
+        voices: Sequence[str] = DIALOGUE_VOICES,
+        source_file: Optional[str] = None,
+        pause_ms: float = DIALOGUE_PAUSE_MS,
+        low_memory: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Gera um podcast em forma de diálogo entre dois apresentadores.
+
+        O LLM transforma o texto em um roteiro; as falas são sintetizadas em
+        paralelo (cada uma com a voz do seu apresentador) e unidas na ordem
+        do roteiro, separadas por pausas.
+
+        Args:
+            text: Texto (resumo) a transformar em diálogo
+            voices: IDs das vozes dos apresentadores A e B
+            source_file: PDF de origem do resumo, registrado no histórico
+            pause_ms: Pausa entre as falas, em milissegundos
+            low_memory: Mantém as falas sintetizadas apenas no cache em disco
+                e grava o áudio final lendo uma fala por vez
+
+        Returns:
+            Dicionário com informações sobre o podcast gerado
+        """
+        voices = tuple(voices)
+        if len(voices) != len(self.SPEAKERS):
+            raise ValueError(
+                f"O diálogo requer {len(self.SPEAKERS)} vozes, recebeu {len(voices)}"
+            )
+
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        key = (
+            self.backend.name,
+            "dialogue",
+            voices,
+            pause_ms,
+            source_file,
+            low_memory,
+            text_hash,
+        )
+        result, shared = _podcast_flight.do(
+            key,
+            self._generate_dialogue,
+            text,
+            voices,
+            source_file,
+            pause_ms,
+            low_memory,
+        )
+        return self._mark_coalesced(result, shared)
+
+    @staticmethod
+    def _mark_coalesced(result: Dict[str, Any], shared: bool) -> Dict[str, Any]:
+        """Indica nos metadados que o podcast veio da execução de outro pedido."""
+        if shared and "metadata" in result:
+            result["metadata"]["coalesced"] = True
+        return result
+
+    def _generate_dialogue(
+        self,
+        text: str,
+        voices: Tuple[str, ...],
+        source_file: Optional[str],
+        pause_ms: float,
+        low_memory: bool,
+    ) -> Dict[str, Any]:
+        """Implementação de `generate_dialogue`, executada uma vez por chave."""
+        start_time = time.time()
 
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json()["voices"]
+            script, token_usage = self.summarizer.write_dialogue(text)
+            voice_for = dict(zip(self.SPEAKERS, voices))
+            turns = [
+                (speaker, voice_for[speaker], TextProcessor.format_for_tts(line))
+                for speaker, line in TextProcessor.parse_dialogue(script, self.SPEAKERS)
+            ]
+            if not turns:
+                raise ValueError("O roteiro do diálogo está vazio")
+
+            segments, cached, tts_chars = self._render_segments(
+                [(voice_id, line) for _, voice_id, line in turns],
+                in_memory=not low_memory,
+            )
+
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            filename = TextProcessor.sanitize_filename(text[:30])
+            audio_path = PODCAST_DIR / f"dialogue_{timestamp}_{filename}.mp3"
+
+            if low_memory:
+                # Uma fala por vez, lida do cache e gravada direto no arquivo
+                with Instrumentation.stage(
+                    "audio_stitch", segments=len(segments), streamed=True
+                ):
+                    audio_path = FileManager.write_chunks_unique(
+                        audio_path,
+                        iter_concat_mp3(
+                            (path.read_bytes() for path in segments), pause_ms
+                        ),
+                    )
+            else:
+                with Instrumentation.stage("audio_stitch", segments=len(segments)):
+                    audio = concat_mp3(segments, pause_ms)
+
+                with Instrumentation.stage("file_write", kind="audio"):
+                    audio_path = FileManager.write_bytes_unique(audio_path, audio)
+
+            duration = time.time() - start_time
+
+            result = {
+                "audio_path": str(audio_path),
+                "script": [
+                    {"speaker": speaker, "voice_id": voice_id, "text": line}
+                    for speaker, voice_id, line in turns
+                ],
+                "metadata": {
+                    "mode": "dialogue",
+                    "low_memory": low_memory,
+                    "voice_id": ",".join(voices),
+                    "voices": dict(voice_for),
+                    "tts_backend": self.backend.name,
+                    "text_length": len(text),
+                    "turns": len(turns),
+                    "segments_cached": cached,
+                    "tts_chars": tts_chars,
+                    "pause_ms": pause_ms,
+                    "token_usage": token_usage,
+                    "duration_seconds": round(duration, 2),
+                    "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                },
+            }
+
+            self._store(result, source_file)
+
+            return result
+
+        except Exception as e:
+            error_msg = f"Erro na geração do podcast: {str(e)}"
+            print(error_msg)
+            return {"error": error_msg}
+
+    @staticmethod
+    def _store(result: Dict[str, Any], source_file: Optional[str]) -> None:
+        """
+        Registra o podcast no banco e agenda o pós-processamento do áudio;
+        ao final, as variantes geradas são gravadas nos metadados.
+        """
+        processor = get_audio_processor()
+        metadata = result["metadata"]
+        metadata["audio_duration_seconds"] = mp3_file_duration(result["audio_path"])
+        metadata["post_processing"] = (
+            "pending" if processor.available else "unavailable"
+        )
+
+        store = get_result_store()
+        with Instrumentation.stage("store_write", kind="podcast"):
+            podcast_id = result["id"] = store.save_podcast(result, source_file)
+
+        def on_done(outcome: Dict[str, Any]) -> None:
+            data = store.get_podcast(podcast_id)
+            if data is None:
+                return
+            data["metadata"]["post_processing"] = outcome.pop("status")
+            data.update(outcome)
+            store.update_podcast(podcast_id, data)
+
+        processor.submit(Path(result["audio_path"]), on_done)
+
+    def _render_segments(
+        self, segments: List[Tuple[str, str]], in_memory: bool = True
+    ) -> Tuple[List[Any], int, int]:
+        """
+        Sintetiza os trechos (voz, texto) em paralelo, com no máximo
+        `concurrency` chamadas simultâneas ao TTS. Trechos repetidos são
+        sintetizados uma vez e os já presentes no cache não voltam ao TTS.
+
+        Args:
+            segments: Trechos (voz, texto) na ordem do roteiro
+            in_memory: Se False, os áudios ficam apenas no cache em disco e
+                são retornados os caminhos dos arquivos
+
+        Returns:
+            Tupla (áudios ou caminhos na ordem dos trechos, quantidade vinda
+            do cache, caracteres enviados ao TTS)
+        """
+        keys = [
+            self.segment_cache.key(line, voice_id, self.backend.name)
+            for voice_id, line in segments
+        ]
+        audio: Dict[str, bytes] = {}
+        pending: Dict[str, Tuple[str, str]] = {}
+        for key, (voice_id, line) in zip(keys, segments):
+            if key in audio or key in pending:
+                continue
+            cached = self.segment_cache.get(key)
+            if cached is not None:
+                if in_memory:
+                    audio[key] = cached
+            else:
+                pending[key] = (voice_id, line)
+
+        cached_count = sum(1 for key in keys if key not in pending)
+
+        def render(key: str) -> None:
+            voice_id, line = pending[key]
+            data = self.backend.synthesize(line, voice_id)
+            self.segment_cache.put(key, data)
+            if in_memory:
+                audio[key] = data
+
+        chars = sum(len(line) for _, line in pending.values())
+        if pending:
+            with Instrumentation.stage(
+                "tts_synthesis", chars=chars, segments=len(pending)
+            ):
+                workers = min(self.concurrency, len(pending))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    # list() propaga a primeira falha
+                    list(executor.map(render, pending))
+
+        if not in_memory:
+            return [self.segment_cache.path(key) for key in keys], cached_count, chars
+        return [audio[key] for key in keys], cached_count, chars
+
+    def _stream(self, text: str, voice_id: str) -> Iterator[bytes]:
+        """Áudio em blocos; backends sem `stream` entregam um bloco único."""
+        stream = getattr(self.backend, "stream", None)
+        if stream is None:
+            return iter((self.backend.synthesize(text, voice_id),))
+        return stream(text, voice_id)
+
+    @property
+    def summarizer(self) -> Any:
+        """Summarizer que escreve o roteiro dos diálogos."""
+        if self._summarizer is None:
+            from services.summarizer import get_summarizer
+
+            self._summarizer = get_summarizer()
+        return self._summarizer
+
+    def list_available_voices(self) -> list:
+        """Retorna lista de vozes disponíveis no backend de TTS."""
+        try:
+            return self.backend.list_voices()
         except Exception as e:
             print(f"Erro ao obter vozes disponíveis: {e}")
             return []
+
+
+@lru_cache(maxsize=1)
+def get_podcast_generator() -> PodcastGenerator:
+    """Instância compartilhada do PodcastGenerator, criada no primeiro uso."""
+    return PodcastGenerator()
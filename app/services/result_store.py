@@ -0,0 +1,485 @@
+import argparse
+import json
+import sqlite3
+import threading
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import PODCAST_DIR, RESULT_STORE_PATH, SUMMARY_DIR
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zlib é usado como alternativa
+    zstandard = None
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    id INTEGER PRIMARY KEY,
+    source_file TEXT NOT NULL,
+    model TEXT,
+    created_at TEXT NOT NULL,
+    total_tokens INTEGER,
+    execution_time_seconds REAL,
+    reuse_key TEXT,
+    options_key TEXT,
+    codec TEXT NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_summaries_source
+    ON summaries (source_file, created_at);
+CREATE INDEX IF NOT EXISTS idx_summaries_model
+    ON summaries (model, created_at);
+CREATE INDEX IF NOT EXISTS idx_summaries_created ON summaries (created_at);
+
+CREATE TABLE IF NOT EXISTS podcasts (
+    id INTEGER PRIMARY KEY,
+    source_file TEXT,
+    audio_file TEXT NOT NULL,
+    voice_id TEXT,
+    tts_backend TEXT,
+    created_at TEXT NOT NULL,
+    codec TEXT NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_podcasts_source
+    ON podcasts (source_file, created_at);
+CREATE INDEX IF NOT EXISTS idx_podcasts_audio ON podcasts (audio_file);
+CREATE INDEX IF NOT EXISTS idx_podcasts_created ON podcasts (created_at);
+
+CREATE TABLE IF NOT EXISTS imported_files (
+    kind TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    record_id INTEGER NOT NULL,
+    PRIMARY KEY (kind, filename)
+);
+"""
+
+# Colunas adicionadas depois da criação do esquema: bancos antigos recebem as
+# colunas e os índices ao abrir
+_MIGRATIONS = (
+    (
+        "summaries",
+        "reuse_key",
+        "TEXT",
+        "CREATE INDEX IF NOT EXISTS idx_summaries_reuse"
+        " ON summaries (reuse_key, created_at)",
+    ),
+    (
+        "summaries",
+        "options_key",
+        "TEXT",
+        "CREATE INDEX IF NOT EXISTS idx_summaries_options"
+        " ON summaries (source_file, options_key, created_at)",
+    ),
+)
+
+_SUMMARY_COLUMNS = (
+    "id, source_file, model, created_at, total_tokens, execution_time_seconds"
+)
+_PODCAST_COLUMNS = "id, source_file, audio_file, voice_id, tts_backend, created_at"
+
+
+class ResultStore:
+    """
+    Armazena resumos, metadados de podcasts e o histórico de execuções em
+    um único banco SQLite, com o conteúdo JSON comprimido (zstd, ou zlib se
+    o pacote `zstandard` não estiver instalado). As colunas indexadas
+    permitem listar por arquivo de origem, modelo e data sem descomprimir.
+    """
+
+    def __init__(self, path: Path = RESULT_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        with self._init_lock:
+            conn = self._connection()
+            conn.executescript(_SCHEMA)
+            self._migrate(conn)
+
+    def save_summary(self, summary_data: Dict[str, Any]) -> int:
+        """
+        Armazena um resumo. Versões anteriores do mesmo arquivo são mantidas
+        como histórico.
+
+        Args:
+            summary_data: Resumo com `summary` e `metadata`
+
+        Returns:
+            ID do registro
+        """
+        metadata = summary_data.get("metadata", {})
+        codec, blob = self._compress(summary_data)
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO summaries (source_file, model, created_at, total_tokens,"
+                " execution_time_seconds, reuse_key, options_key, codec, data)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    metadata.get("source_file"),
+                    metadata.get("model_used"),
+                    metadata.get("timestamp"),
+                    (metadata.get("token_usage") or {}).get("total_tokens"),
+                    metadata.get("execution_time_seconds"),
+                    metadata.get("reuse_key"),
+                    metadata.get("options_key"),
+                    codec,
+                    blob,
+                ),
+            )
+        return cursor.lastrowid
+
+    def get_summary(
+        self, source_file: str, options_key: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Retorna o resumo mais recente de um arquivo, se houver.
+
+        Args:
+            source_file: Arquivo de origem
+            options_key: Considera apenas os resumos gerados com essas opções
+                (ver `Summarizer.options_key`)
+        """
+        query = "SELECT codec, data FROM summaries WHERE source_file = ?"
+        params: List[Any] = [source_file]
+        if options_key is not None:
+            query += " AND options_key = ?"
+            params.append(options_key)
+        row = (
+            self._connection()
+            .execute(query + " ORDER BY created_at DESC, id DESC LIMIT 1", params)
+            .fetchone()
+        )
+        return self._decompress(*row) if row else None
+
+    def find_summary(
+        self, reuse_key: str, exclude: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Retorna o resumo mais recente com a chave de reaproveitamento dada.
+
+        Args:
+            reuse_key: Chave calculada por `Summarizer.reuse_key`
+            exclude: Arquivo de origem a ignorar (o próprio PDF)
+        """
+        row = (
+            self._connection()
+            .execute(
+                "SELECT codec, data FROM summaries WHERE reuse_key = ?"
+                " AND source_file IS NOT ?"
+                " ORDER BY created_at DESC, id DESC LIMIT 1",
+                (reuse_key, exclude),
+            )
+            .fetchone()
+        )
+        return self._decompress(*row) if row else None
+
+    def list_summaries(
+        self,
+        source_file: Optional[str] = None,
+        model: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Lista os resumos (sem o texto) do mais recente para o mais antigo.
+
+        Args:
+            source_file: Filtra pelo PDF de origem
+            model: Filtra pelo modelo usado
+            since: Data mínima ("AAAA-MM-DD" ou "AAAA-MM-DD HH:MM:SS")
+            until: Data máxima (exclusiva)
+            limit: Número máximo de registros
+            offset: Registros a pular (paginação)
+        """
+        return self._list(
+            "summaries",
+            _SUMMARY_COLUMNS,
+            {"source_file": source_file, "model": model},
+            since,
+            until,
+            limit,
+            offset,
+        )
+
+    def save_podcast(
+        self, podcast_data: Dict[str, Any], source_file: Optional[str] = None
+    ) -> int:
+        """
+        Armazena os metadados de um podcast gerado.
+
+        Args:
+            podcast_data: Resultado com `audio_path` e `metadata`
+            source_file: PDF de origem do resumo, se conhecido
+
+        Returns:
+            ID do registro
+        """
+        metadata = podcast_data.get("metadata", {})
+        codec, blob = self._compress(podcast_data)
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO podcasts (source_file, audio_file, voice_id, tts_backend,"
+                " created_at, codec, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    source_file,
+                    Path(podcast_data["audio_path"]).name,
+                    metadata.get("voice_id"),
+                    metadata.get("tts_backend"),
+                    metadata.get("timestamp"),
+                    codec,
+                    blob,
+                ),
+            )
+        return cursor.lastrowid
+
+    def update_podcast(self, podcast_id: int, podcast_data: Dict[str, Any]) -> None:
+        """Substitui os metadados de um podcast (ex.: após o pós-processamento)."""
+        codec, blob = self._compress(podcast_data)
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE podcasts SET codec = ?, data = ? WHERE id = ?",
+                (codec, blob, podcast_id),
+            )
+
+    def get_podcast(self, podcast_id: int) -> Optional[Dict[str, Any]]:
+        """Retorna os metadados completos de um podcast."""
+        row = (
+            self._connection()
+            .execute("SELECT codec, data FROM podcasts WHERE id = ?", (podcast_id,))
+            .fetchone()
+        )
+        return self._decompress(*row) if row else None
+
+    def list_podcasts(
+        self,
+        source_file: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """Lista os podcasts gerados do mais recente para o mais antigo."""
+        return self._list(
+            "podcasts",
+            _PODCAST_COLUMNS,
+            {"source_file": source_file},
+            since,
+            until,
+            limit,
+            offset,
+        )
+
+    def history(self, source_file: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Histórico de execuções (resumos e podcasts) de um PDF."""
+        return {
+            "summaries": self.list_summaries(source_file=source_file, limit=-1),
+            "podcasts": self.list_podcasts(source_file=source_file, limit=-1),
+        }
+
+    def referenced_files(self, since: Optional[str] = None) -> Dict[str, set]:
+        """
+        Arquivos preservados pela retenção: PDFs com resumo e o podcast mais
+        recente de cada PDF (com o diretório de suas variantes). Podcasts
+        substituídos por outro mais recente não são preservados.
+
+        Args:
+            since: Considera apenas resumos e podcasts criados a partir dessa
+                data, para que a preservação expire
+        """
+        since = since or ""
+        conn = self._connection()
+        pdfs = {
+            row[0]
+            for row in conn.execute(
+                "SELECT source_file FROM summaries GROUP BY source_file"
+                " HAVING MAX(created_at) >= ?",
+                (since,),
+            )
+        }
+        podcasts = {
+            row[0]
+            for row in conn.execute(
+                "SELECT audio_file FROM ("
+                " SELECT audio_file, created_at, ROW_NUMBER() OVER ("
+                "  PARTITION BY COALESCE(source_file, audio_file)"
+                "  ORDER BY created_at DESC, id DESC) AS position"
+                " FROM podcasts)"
+                " WHERE position = 1 AND created_at >= ?",
+                (since,),
+            )
+        }
+        return {
+            "pdfs": pdfs,
+            "podcasts": podcasts,
+            "podcast_variants": {Path(audio).stem for audio in podcasts},
+        }
+
+    def import_json(
+        self, summary_files: Iterable[Path], podcast_files: Iterable[Path]
+    ) -> Dict[str, int]:
+        """
+        Importa arquivos JSON do formato antigo (um arquivo por resultado).
+        Arquivos já importados (pelo nome) são ignorados, então a importação
+        pode ser repetida.
+
+        Args:
+            summary_files: Arquivos `*_summary.json`
+            podcast_files: Arquivos `.json` de metadados dos podcasts
+
+        Returns:
+            Quantidade de resumos, podcasts, arquivos já importados e
+            arquivos com erro
+        """
+        counts = {"summaries": 0, "podcasts": 0, "skipped": 0, "errors": 0}
+
+        for path in summary_files:
+            if self._imported("summary", path):
+                counts["skipped"] += 1
+                continue
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                metadata = data.setdefault("metadata", {})
+                metadata.setdefault(
+                    "source_file", path.name.replace("_summary.json", ".pdf")
+                )
+                self._mark_imported("summary", path, self.save_summary(data))
+                counts["summaries"] += 1
+            except Exception as e:
+                print(f"Erro ao importar '{path}': {e}")
+                counts["errors"] += 1
+
+        for path in podcast_files:
+            if self._imported("podcast", path):
+                counts["skipped"] += 1
+                continue
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                data.setdefault("audio_path", str(path.with_suffix(".mp3")))
+                self._mark_imported("podcast", path, self.save_podcast(data))
+                counts["podcasts"] += 1
+            except Exception as e:
+                print(f"Erro ao importar '{path}': {e}")
+                counts["errors"] += 1
+
+        return counts
+
+    def _imported(self, kind: str, path: Path) -> bool:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT 1 FROM imported_files WHERE kind = ? AND filename = ?",
+                (kind, path.name),
+            )
+            .fetchone()
+        )
+        return row is not None
+
+    def _mark_imported(self, kind: str, path: Path, record_id: int) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO imported_files (kind, filename, record_id)"
+                " VALUES (?, ?, ?)",
+                (kind, path.name, record_id),
+            )
+
+    def _list(
+        self,
+        table: str,
+        columns: str,
+        filters: Dict[str, Optional[str]],
+        since: Optional[str],
+        until: Optional[str],
+        limit: int,
+        offset: int,
+    ) -> List[Dict[str, Any]]:
+        clauses, params = [], []
+        for column, value in filters.items():
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("created_at < ?")
+            params.append(until)
+
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        cursor = self._connection().execute(
+            f"SELECT {columns} FROM {table}{where}"
+            " ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+            (*params, limit, offset),
+        )
+        names = [description[0] for description in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        for table, column, column_type, index in _MIGRATIONS:
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+            conn.execute(index)
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexão própria de cada thread (sqlite3 não compartilha conexões)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _compress(data: Dict[str, Any]) -> tuple:
+        raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+        if zstandard is not None:
+            return "zstd", zstandard.ZstdCompressor(level=6).compress(raw)
+        return "zlib", zlib.compress(raw, 6)
+
+    @staticmethod
+    def _decompress(codec: str, blob: bytes) -> Dict[str, Any]:
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError("Pacote 'zstandard' necessário para ler o registro")
+            raw = zstandard.ZstdDecompressor().decompress(blob)
+        else:
+            raw = zlib.decompress(blob)
+        return json.loads(raw)
+
+
+@lru_cache(maxsize=1)
+def get_result_store() -> ResultStore:
+    """Instância compartilhada do ResultStore, criada no primeiro uso."""
+    return ResultStore()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Importa os resumos e metadados de podcasts em JSON para o banco"
+    )
+    parser.add_argument("--summaries", type=Path, default=SUMMARY_DIR)
+    parser.add_argument("--podcasts", type=Path, default=PODCAST_DIR)
+    parser.add_argument(
+        "--delete",
+        action="store_true",
+        help="Remove os arquivos JSON importados com sucesso",
+    )
+    args = parser.parse_args()
+
+    summary_files = sorted(args.summaries.glob("*_summary.json"))
+    podcast_files = sorted(args.podcasts.glob("*.json"))
+    counts = get_result_store().import_json(summary_files, podcast_files)
+    print(json.dumps(counts, indent=2))
+
+    if args.delete and not counts["errors"]:
+        for path in (*summary_files, *podcast_files):
+            path.unlink()
@@ -0,0 +1,294 @@
+import os
+import shutil
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import (
+    MAP_CACHE_DIR,
+    OUTPUT_DIR,
+    PDF_DIR,
+    PODCAST_DIR,
+    PODCAST_VARIANTS_DIR,
+    PROFILE_DIR,
+    SEGMENT_CACHE_DIR,
+    RETENTION_BATCH_SIZE,
+    RETENTION_INTERVAL_SECONDS,
+    RETENTION_KEEP_REFERENCED,
+    RETENTION_MAX_AGE_DAYS,
+    RETENTION_MAX_TOTAL_BYTES,
+    RETENTION_MIN_IDLE_SECONDS,
+    RETENTION_REFERENCED_TTL_DAYS,
+)
+from utils.coordination import FileLock
+from utils.metrics import (
+    RETENTION_DELETED_FILES,
+    RETENTION_FREED_BYTES,
+    Instrumentation,
+)
+
+# Diretórios gerenciados: nome -> (caminho, extensões removíveis)
+MANAGED_DIRECTORIES = {
+    "pdfs": (PDF_DIR, (".pdf",)),
+    "podcasts": (PODCAST_DIR, (".mp3", ".json")),
+    "podcast_variants": (PODCAST_VARIANTS_DIR, (".mp3", ".ogg", ".m3u8", ".ts")),
+    "map_cache": (MAP_CACHE_DIR, (".txt",)),
+    "segment_cache": (SEGMENT_CACHE_DIR, (".mp3",)),
+    "profiles": (PROFILE_DIR, (".json", ".prof")),
+}
+
+# Diretórios em que cada subdiretório é uma unidade (variantes e playlist HLS
+# com seus segmentos de um podcast): removido inteiro, nunca em parte
+UNIT_DIRECTORIES = {"podcast_variants"}
+
+
+class RetentionService:
+    """
+    Remove arquivos antigos de pdfs/ e output/ conforme as políticas de
+    retenção (idade máxima, tamanho total máximo com remoção LRU e
+    preservação, por um prazo, de arquivos referenciados no banco de
+    resultados).
+    A limpeza é incremental: cada passada remove no máximo `batch_size`
+    arquivos e roda em uma thread em segundo plano.
+    """
+
+    def __init__(
+        self,
+        directories: Dict[str, Tuple[Path, Tuple[str, ...]]] = MANAGED_DIRECTORIES,
+        max_age_days: float = RETENTION_MAX_AGE_DAYS,
+        max_total_bytes: int = RETENTION_MAX_TOTAL_BYTES,
+        min_idle_seconds: float = RETENTION_MIN_IDLE_SECONDS,
+        batch_size: int = RETENTION_BATCH_SIZE,
+        keep_referenced: bool = RETENTION_KEEP_REFERENCED,
+        referenced_ttl_days: float = RETENTION_REFERENCED_TTL_DAYS,
+        interval_seconds: float = RETENTION_INTERVAL_SECONDS,
+    ):
+        self.directories = directories
+        self.max_age_days = max_age_days
+        self.max_total_bytes = max_total_bytes
+        self.min_idle_seconds = min_idle_seconds
+        self.batch_size = max(1, batch_size)
+        self.keep_referenced = keep_referenced
+        self.referenced_ttl_days = referenced_ttl_days
+        self.interval_seconds = interval_seconds
+
+        # Apenas um worker por vez executa a limpeza no volume compartilhado
+        self._run_lock = FileLock(OUTPUT_DIR / ".retention.lock")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_report: Optional[Dict[str, Any]] = None
+        self._totals = {"runs": 0, "deleted_files": 0, "freed_bytes": 0}
+
+    def run_once(self, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Executa uma passada de limpeza.
+
+        Args:
+            dry_run: Se True, apenas informa o que seria removido
+
+        Returns:
+            Relatório com os arquivos removidos e o espaço liberado
+        """
+        with self._run_lock.acquire(blocking=False) as acquired:
+            if not acquired:
+                return {
+                    "dry_run": dry_run,
+                    "skipped": "Limpeza em andamento em outro worker",
+                    "batch_limit_reached": False,
+                }
+            with Instrumentation.stage("retention"):
+                return self._run(dry_run)
+
+    def _run(self, dry_run: bool) -> Dict[str, Any]:
+        """Passada de limpeza, executada com o lock adquirido."""
+        start_time = time.time()
+        entries = sorted(self._scan(), key=lambda entry: entry[0])
+        total_bytes = sum(entry[1] for entry in entries)
+        referenced = self._referenced(start_time) if self.keep_referenced else {}
+
+        deleted: List[Dict[str, Any]] = []
+        remaining = total_bytes
+        for last_access, size, directory, path in entries:
+            if len(deleted) >= self.batch_size:
+                break
+
+            idle = start_time - last_access
+            if idle < self.min_idle_seconds:
+                # Entradas ordenadas por acesso: as seguintes são mais recentes
+                break
+            if path.name in referenced.get(directory, ()):
+                continue
+
+            reason = self._reason(idle, remaining)
+            if reason is None:
+                break
+
+            if not dry_run and not self._delete(directory, path, reason):
+                continue
+
+            remaining -= size
+            deleted.append(
+                {
+                    "directory": directory,
+                    "file": path.name,
+                    "bytes": size,
+                    "reason": reason,
+                }
+            )
+
+        freed = total_bytes - remaining
+        report = {
+            "dry_run": dry_run,
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "elapsed_seconds": round(time.time() - start_time, 3),
+            "scanned_files": len(entries),
+            "total_bytes_before": total_bytes,
+            "total_bytes_after": remaining,
+            "deleted_files": len(deleted),
+            "freed_bytes": freed,
+            "batch_limit_reached": len(deleted) >= self.batch_size,
+            "deleted": deleted,
+        }
+
+        if not dry_run:
+            self._last_report = report
+            self._totals["runs"] += 1
+            self._totals["deleted_files"] += len(deleted)
+            self._totals["freed_bytes"] += freed
+
+        return report
+
+    def status(self) -> Dict[str, Any]:
+        """Políticas em vigor, última passada e totais acumulados."""
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "policy": {
+                "max_age_days": self.max_age_days,
+                "max_total_bytes": self.max_total_bytes,
+                "min_idle_seconds": self.min_idle_seconds,
+                "batch_size": self.batch_size,
+                "keep_referenced": self.keep_referenced,
+                "referenced_ttl_days": self.referenced_ttl_days,
+                "interval_seconds": self.interval_seconds,
+            },
+            "last_run": self._last_report,
+            "totals": dict(self._totals),
+        }
+
+    def start(self) -> None:
+        """Inicia as passadas periódicas em uma thread em segundo plano."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="retention", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Interrompe as passadas periódicas."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                # Se o lote encheu, continua logo em seguida até alcançar a meta
+                while self.run_once()["batch_limit_reached"]:
+                    if self._stop.is_set():
+                        return
+            except Exception as e:
+                print(f"Erro na retenção de arquivos: {e}")
+
+    def _reason(self, idle: float, remaining: int) -> Optional[str]:
+        """Política que justifica remover o arquivo, ou None."""
+        if self.max_age_days and idle > self.max_age_days * 86400:
+            return "age"
+        if self.max_total_bytes and remaining > self.max_total_bytes:
+            return "size"
+        return None
+
+    def _scan(self) -> Iterator[Tuple[float, int, str, Path]]:
+        """
+        Lista (último acesso, tamanho, diretório, caminho) dos arquivos e,
+        em UNIT_DIRECTORIES, dos subdiretórios (acesso mais recente e
+        tamanho total dos arquivos).
+        """
+        for directory, (root, suffixes) in self.directories.items():
+            units: Dict[Path, List[float]] = {}
+            for entry in self._walk(root):
+                if not entry.name.endswith(suffixes):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                last_access = max(stat.st_atime, stat.st_mtime)
+                path = Path(entry.path)
+                if directory in UNIT_DIRECTORIES and path.parent != root:
+                    unit = root / path.relative_to(root).parts[0]
+                    totals = units.setdefault(unit, [0.0, 0])
+                    totals[0] = max(totals[0], last_access)
+                    totals[1] += stat.st_size
+                    continue
+                yield last_access, stat.st_size, directory, path
+            for unit, (last_access, size) in units.items():
+                yield last_access, int(size), directory, unit
+
+    def _walk(self, root: Path) -> Iterator[os.DirEntry]:
+        """Percorre o diretório ignorando arquivos e pastas ocultos/temporários."""
+        try:
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from self._walk(Path(entry.path))
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry
+        except FileNotFoundError:
+            return
+
+    def _referenced(self, now: float) -> Dict[str, set]:
+        from services.result_store import get_result_store
+
+        since = None
+        if self.referenced_ttl_days:
+            cutoff = now - self.referenced_ttl_days * 86400
+            since = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(cutoff))
+        return get_result_store().referenced_files(since)
+
+    @staticmethod
+    def _delete(directory: str, path: Path, reason: str) -> bool:
+        """Remove o arquivo (ou a unidade) e as referências nos índices locais."""
+        try:
+            if path.is_dir():
+                size = sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+                shutil.rmtree(path)
+            else:
+                size = path.stat().st_size
+                path.unlink()
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            print(f"Erro ao remover '{path}': {e}")
+            return False
+
+        if directory == "pdfs":
+            from services.dedup_index import get_dedup_index
+
+            get_dedup_index().remove(path.name)
+
+        RETENTION_DELETED_FILES.labels(directory=directory, reason=reason).inc()
+        RETENTION_FREED_BYTES.labels(directory=directory, reason=reason).inc(size)
+        return True
+
+
+@lru_cache(maxsize=1)
+def get_retention_service() -> RetentionService:
+    """Instância compartilhada do RetentionService."""
+    return RetentionService()
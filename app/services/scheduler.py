@@ -0,0 +1,429 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+)
+
+from config import (
+    SCHEDULER_API_KEYS,
+    SCHEDULER_CONCURRENCY,
+    SCHEDULER_INTERACTIVE_RESERVED,
+    SCHEDULER_MAX_QUEUE_PER_TENANT,
+    SCHEDULER_TENANT_TOKENS_PER_MINUTE,
+    SCHEDULER_TENANT_WEIGHTS,
+    SCHEDULER_TOKENS_PER_MINUTE,
+)
+from utils.metrics import (
+    SCHEDULER_QUEUE_DEPTH,
+    SCHEDULER_RUNNING,
+    SCHEDULER_WAIT_SECONDS,
+)
+
+# Classes de prioridade, da mais para a menos prioritária
+PRIORITIES = ("interactive", "batch")
+
+ANONYMOUS_TENANT = "anonymous"
+
+
+class QueueFullError(RuntimeError):
+    """O cliente já tem o máximo de trabalhos aguardando na fila."""
+
+
+def tenant_id(api_key: Optional[str]) -> str:
+    """Identificador do cliente a partir da chave de API (sem expô-la)."""
+    if not api_key:
+        return ANONYMOUS_TENANT
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+class _TokenBucket:
+    """Cota de tokens por minuto, reposta continuamente."""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = tokens_per_minute
+        self.tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.capacity / 60
+        )
+        self._updated = now
+
+    def wait_time(self, cost: int, now: float) -> float:
+        """Segundos até haver tokens para o custo (0 se já houver)."""
+        if not self.capacity:
+            return 0.0
+        self._refill(now)
+        # Trabalhos maiores que a cota inteira rodam quando ela estiver cheia
+        needed = min(cost, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) * 60 / self.capacity
+
+    def consume(self, cost: int, now: float) -> None:
+        """Desconta o custo (ou devolve, se negativo) da cota."""
+        if self.capacity:
+            self._refill(now)
+            self.tokens = min(self.capacity, self.tokens - cost)
+
+
+class _Tenant:
+    def __init__(self, name: str, weight: float, tokens_per_minute: int):
+        self.name = name
+        self.weight = weight
+        self.bucket = _TokenBucket(tokens_per_minute)
+        self.finish_tag = 0.0
+        self.running = 0
+        self.queues: Dict[str, Deque["Ticket"]] = {p: deque() for p in PRIORITIES}
+
+    def idle(self, virtual_time: float, now: float) -> bool:
+        """
+        Sem trabalhos, com a cota cheia e sem serviço adiantado: recriá-lo
+        depois resulta no mesmo estado.
+        """
+        if self.running or any(self.queues.values()):
+            return False
+        return (
+            self.finish_tag <= virtual_time
+            and self.bucket.wait_time(self.bucket.capacity, now) == 0
+        )
+
+
+class Ticket:
+    """Trabalho aguardando (ou ocupando) uma vaga no escalonador."""
+
+    def __init__(self, tenant: _Tenant, priority: str, cost: int):
+        self.tenant = tenant
+        self.priority = priority
+        self.cost = cost
+        self.actual_cost: Optional[int] = None
+        self.enqueued_at = time.monotonic()
+        self.wait_seconds: Optional[float] = None
+        self._on_grant: Callable[[], None] = lambda: None
+
+
+class FairScheduler:
+    """
+    Escalonador justo entre clientes para as chamadas ao LLM e ao TTS.
+
+    - Limita o número de trabalhos simultâneos (`capacity`)
+    - Trabalhos "interactive" passam na frente dos "batch"; os "batch" usam
+      apenas a capacidade que sobra, deixando `interactive_reserved` vagas
+      sempre livres para os interativos
+    - Dentro de cada classe, a capacidade é dividida entre as chaves de API
+      por enfileiramento justo ponderado (start-time fair queueing): cada
+      cliente avança seu relógio virtual em custo / peso
+    - Cada cliente tem uma cota de tokens por minuto; trabalhos que
+      excederiam a cota aguardam a reposição
+    - Só as chaves configuradas (`api_keys` e as chaves com peso ou cota
+      próprios) são clientes separados; as demais compartilham o cliente
+      anônimo, para que trocar de chave não contorne as cotas. Clientes
+      ociosos são descartados
+    """
+
+    def __init__(
+        self,
+        capacity: int = SCHEDULER_CONCURRENCY,
+        interactive_reserved: int = SCHEDULER_INTERACTIVE_RESERVED,
+        tokens_per_minute: int = SCHEDULER_TOKENS_PER_MINUTE,
+        tenant_tokens_per_minute: Optional[Dict[str, int]] = None,
+        tenant_weights: Optional[Dict[str, float]] = None,
+        max_queue_per_tenant: int = SCHEDULER_MAX_QUEUE_PER_TENANT,
+        api_keys: Optional[Iterable[str]] = None,
+    ):
+        self.capacity = max(1, capacity)
+        self.interactive_reserved = min(max(0, interactive_reserved), self.capacity - 1)
+        self.tokens_per_minute = tokens_per_minute
+        # As configurações por cliente são indexadas pela chave de API
+        self.tenant_tokens_per_minute = {
+            self._config_key(key): value
+            for key, value in (
+                SCHEDULER_TENANT_TOKENS_PER_MINUTE
+                if tenant_tokens_per_minute is None
+                else tenant_tokens_per_minute
+            ).items()
+        }
+        self.tenant_weights = {
+            self._config_key(key): value
+            for key, value in (
+                SCHEDULER_TENANT_WEIGHTS if tenant_weights is None else tenant_weights
+            ).items()
+        }
+        self.max_queue_per_tenant = max_queue_per_tenant
+        self.known_tenants = {
+            self._config_key(key)
+            for key in (SCHEDULER_API_KEYS if api_keys is None else api_keys)
+        }
+        self.known_tenants.update(self.tenant_weights, self.tenant_tokens_per_minute)
+
+        self._tenants: Dict[str, _Tenant] = {}
+        self._running = {p: 0 for p in PRIORITIES}
+        self._virtual_time = 0.0
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def acquire(self, tenant: str, priority: str, cost: int) -> Ticket:
+        """
+        Aguarda (bloqueando a thread) uma vaga para o trabalho.
+
+        Args:
+            tenant: Identificador do cliente (ver `tenant_id`); clientes não
+                configurados usam o cliente anônimo
+            priority: "interactive" ou "batch"
+            cost: Estimativa de tokens do trabalho
+
+        Returns:
+            Ticket a ser devolvido com `release`
+        """
+        granted = threading.Event()
+        ticket = self._enqueue(tenant, priority, cost, granted.set)
+        granted.wait()
+        return ticket
+
+    async def acquire_async(self, tenant: str, priority: str, cost: int) -> Ticket:
+        """Versão assíncrona de `acquire`: aguarda sem ocupar uma thread."""
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def on_grant():
+            loop.call_soon_threadsafe(
+                lambda: granted.done() or granted.set_result(None)
+            )
+
+        ticket = self._enqueue(tenant, priority, cost, on_grant)
+        try:
+            await granted
+        except asyncio.CancelledError:
+            self._cancel(ticket)
+            raise
+        return ticket
+
+    def release(self, ticket: Ticket) -> None:
+        """
+        Libera a vaga do trabalho. Se `ticket.actual_cost` foi informado, a
+        diferença para a estimativa é acertada na cota e no relógio virtual.
+        """
+        with self._lock:
+            tenant = ticket.tenant
+            tenant.running -= 1
+            self._running[ticket.priority] -= 1
+            SCHEDULER_RUNNING.labels(priority=ticket.priority).dec()
+
+            if ticket.actual_cost is not None:
+                difference = ticket.actual_cost - ticket.cost
+                tenant.bucket.consume(difference, time.monotonic())
+                tenant.finish_tag = max(
+                    self._virtual_time, tenant.finish_tag + difference / tenant.weight
+                )
+            self._dispatch()
+            self._evict_idle()
+
+    @contextmanager
+    def slot(self, tenant: str, priority: str, cost: int) -> Iterator[Ticket]:
+        """Ocupa uma vaga durante o bloco `with` (bloqueante)."""
+        ticket = self.acquire(tenant, priority, cost)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    @asynccontextmanager
+    async def async_slot(
+        self, tenant: str, priority: str, cost: int
+    ) -> AsyncIterator[Ticket]:
+        """Ocupa uma vaga durante o bloco `async with`."""
+        ticket = await self.acquire_async(tenant, priority, cost)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def status(self) -> Dict[str, Any]:
+        """Capacidade, ocupação e filas por prioridade e por cliente."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "interactive_reserved": self.interactive_reserved,
+                "running": dict(self._running),
+                "queued": {
+                    p: sum(len(t.queues[p]) for t in self._tenants.values())
+                    for p in PRIORITIES
+                },
+                "tenants": {
+                    t.name: {
+                        "weight": t.weight,
+                        "running": t.running,
+                        "queued": {p: len(t.queues[p]) for p in PRIORITIES},
+                        "tokens_per_minute": t.bucket.capacity or None,
+                        "tokens_available": (
+                            int(t.bucket.tokens) if t.bucket.capacity else None
+                        ),
+                        "oldest_wait_seconds": max(
+                            (
+                                round(now - q[0].enqueued_at, 3)
+                                for q in t.queues.values()
+                                if q
+                            ),
+                            default=0.0,
+                        ),
+                    }
+                    for t in self._tenants.values()
+                },
+            }
+
+    def _enqueue(
+        self, tenant: str, priority: str, cost: int, on_grant: Callable[[], None]
+    ) -> Ticket:
+        if priority not in PRIORITIES:
+            raise ValueError(f"Prioridade desconhecida: {priority}")
+
+        with self._lock:
+            state = self._tenant(tenant)
+            queued = sum(len(q) for q in state.queues.values())
+            if self.max_queue_per_tenant and queued >= self.max_queue_per_tenant:
+                raise QueueFullError(
+                    f"Limite de {self.max_queue_per_tenant} trabalhos na fila atingido"
+                )
+
+            ticket = Ticket(state, priority, max(0, cost))
+            ticket._on_grant = on_grant
+            state.queues[priority].append(ticket)
+            SCHEDULER_QUEUE_DEPTH.labels(priority=priority).inc()
+            self._dispatch()
+        return ticket
+
+    def _cancel(self, ticket: Ticket) -> None:
+        """Remove um ticket cancelado da fila ou libera sua vaga."""
+        with self._lock:
+            queue = ticket.tenant.queues[ticket.priority]
+            if ticket in queue:
+                queue.remove(ticket)
+                SCHEDULER_QUEUE_DEPTH.labels(priority=ticket.priority).dec()
+                self._evict_idle()
+                return
+        self.release(ticket)
+
+    @staticmethod
+    def _config_key(api_key: str) -> str:
+        return api_key if api_key == ANONYMOUS_TENANT else tenant_id(api_key)
+
+    def _tenant(self, name: str) -> _Tenant:
+        if name not in self.known_tenants:
+            name = ANONYMOUS_TENANT
+        state = self._tenants.get(name)
+        if state is None:
+            state = _Tenant(
+                name,
+                self.tenant_weights.get(name, 1.0),
+                self.tenant_tokens_per_minute.get(name, self.tokens_per_minute),
+            )
+            self._tenants[name] = state
+        return state
+
+    def _evict_idle(self) -> None:
+        """Descarta os clientes ociosos (com o lock adquirido)."""
+        busy = any(self._running.values()) or any(
+            any(t.queues.values()) for t in self._tenants.values()
+        )
+        if not busy:
+            # Sem trabalhos, o relógio virtual alcança o cliente mais adiantado
+            self._virtual_time = max(
+                [self._virtual_time, *(t.finish_tag for t in self._tenants.values())]
+            )
+
+        now = time.monotonic()
+        for name, tenant in list(self._tenants.items()):
+            if tenant.idle(self._virtual_time, now):
+                del self._tenants[name]
+
+    def _dispatch(self) -> None:
+        """Concede vagas livres aos próximos trabalhos (com o lock adquirido)."""
+        now = time.monotonic()
+        retry_in = None
+
+        while sum(self._running.values()) < self.capacity:
+            ticket, wait = self._pick(now)
+            if wait is not None:
+                retry_in = wait if retry_in is None else min(retry_in, wait)
+            if ticket is None:
+                break
+
+            tenant = ticket.tenant
+            tenant.queues[ticket.priority].popleft()
+            start_tag = max(self._virtual_time, tenant.finish_tag)
+            tenant.finish_tag = start_tag + ticket.cost / tenant.weight
+            self._virtual_time = start_tag
+            tenant.bucket.consume(ticket.cost, now)
+            tenant.running += 1
+            self._running[ticket.priority] += 1
+
+            ticket.wait_seconds = now - ticket.enqueued_at
+            SCHEDULER_QUEUE_DEPTH.labels(priority=ticket.priority).dec()
+            SCHEDULER_RUNNING.labels(priority=ticket.priority).inc()
+            SCHEDULER_WAIT_SECONDS.labels(priority=ticket.priority).observe(
+                ticket.wait_seconds
+            )
+            ticket._on_grant()
+
+        # Trabalhos bloqueados pela cota são reavaliados após a reposição
+        if retry_in is not None and self._timer is None:
+            self._timer = threading.Timer(retry_in + 0.01, self._on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+            self._dispatch()
+
+    def _pick(self, now: float) -> tuple:
+        """
+        Escolhe o próximo trabalho: a classe mais prioritária com vaga e,
+        dentro dela, o cliente de menor tag virtual com cota disponível.
+
+        Returns:
+            (ticket ou None, menor espera por cota entre os bloqueados)
+        """
+        quota_wait = None
+        for priority in PRIORITIES:
+            if priority != PRIORITIES[0]:
+                limit = self.capacity - self.interactive_reserved
+                if self._running[priority] >= limit:
+                    continue
+
+            best, best_tag = None, None
+            for tenant in self._tenants.values():
+                queue = tenant.queues[priority]
+                if not queue:
+                    continue
+                wait = tenant.bucket.wait_time(queue[0].cost, now)
+                if wait > 0:
+                    quota_wait = wait if quota_wait is None else min(quota_wait, wait)
+                    continue
+                tag = max(self._virtual_time, tenant.finish_tag)
+                if best_tag is None or tag < best_tag:
+                    best, best_tag = queue[0], tag
+
+            if best is not None:
+                return best, quota_wait
+        return None, quota_wait
+
+
+@lru_cache(maxsize=1)
+def get_scheduler() -> FairScheduler:
+    """Escalonador compartilhado do processo."""
+    return FairScheduler()
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import re
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from utils.metrics import Instrumentation
+from utils.text_processor import TextProcessor
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+# Títulos de seção reconhecidos (inglês, português, espanhol, francês e alemão)
+SECTION_HEADINGS = {
+    "abstract": [
+        "abstract",
+        "resumo",
+        "resumen",
+        "résumé",
+        "zusammenfassung",
+    ],
+    "introduction": [
+        "introduction",
+        "introdução",
+        "introducción",
+        "einleitung",
+    ],
+    "related_work": [
+        "related work",
+        "related works",
+        "background",
+        "trabalhos relacionados",
+        "fundamentação teórica",
+        "referencial teórico",
+        "trabajos relacionados",
+        "état de l'art",
+    ],
+    "methods": [
+        "methods",
+        "method",
+        "methodology",
+        "materials and methods",
+        "experimental setup",
+        "approach",
+        "métodos",
+        "método",
+        "metodologia",
+        "materiais e métodos",
+        "metodología",
+        "materiales y métodos",
+        "méthodes",
+        "méthodologie",
+        "methoden",
+    ],
+    "results": [
+        "results",
+        "experiments",
+        "evaluation",
+        "results and discussion",
+        "resultados",
+        "experimentos",
+        "avaliação",
+        "resultados e discussão",
+        "résultats",
+        "ergebnisse",
+    ],
+    "discussion": [
+        "discussion",
+        "discussão",
+        "discusión",
+        "diskussion",
+    ],
+    "conclusion": [
+        "conclusion",
+        "conclusions",
+        "concluding remarks",
+        "conclusão",
+        "conclusões",
+        "considerações finais",
+        "conclusiones",
+        "fazit",
+    ],
+    "acknowledgments": [
+        "acknowledgments",
+        "acknowledgements",
+        "agradecimentos",
+        "agradecimientos",
+        "remerciements",
+        "danksagung",
+    ],
+    "references": [
+        "references",
+        "referências",
+        "bibliography",
+        "bibliografia",
+        "referências bibliográficas",
+        "works cited",
+        "literatura citada",
+        "cited literature",
+        "reference list",
+        "referencias",
+        "bibliographie",
+        "literatur",
+        "literaturverzeichnis",
+    ],
+    "appendix": [
+        "appendix",
+        "appendices",
+        "supplementary material",
+        "apêndice",
+        "apêndices",
+        "anexo",
+        "anexos",
+        "material suplementar",
+        "apéndice",
+        "annexe",
+        "anhang",
+    ],
+}
+
+# Títulos que também são palavras comuns no fim de frases quebradas
+# ("we evaluate our\napproach"): sem numeração, só valem em linha isolada
+AMBIGUOUS_HEADINGS = {
+    "approach",
+    "background",
+    "evaluation",
+    "experiments",
+    "method",
+    "literatur",
+}
+
+# Seções enviadas ao LLM por padrão no modo seletivo
+DEFAULT_SUMMARY_SECTIONS = (
+    "front_matter",
+    "abstract",
+    "introduction",
+    "methods",
+    "results",
+    "discussion",
+    "conclusion",
+)
+
+
+def _heading_pattern(sections: Iterable[str]) -> re.Pattern:
+    """
+    Compila um único padrão para os títulos das seções informadas.
+    O título deve ocupar a linha inteira, opcionalmente numerado
+    ("3", "3.1", "IV.", "A.") ou identificado ("Appendix A") e seguido
+    de ":". O "." final só é aceito em títulos numerados, e os títulos de
+    AMBIGUOUS_HEADINGS sem numeração só valem no início do texto, após uma
+    linha em branco ou após uma linha terminada em pontuação, para que o fim
+    de uma frase quebrada ("prior\ncitations.") não seja lido como título.
+    """
+    groups = []
+    for section in sections:
+        variants = sorted(SECTION_HEADINGS[section], key=len, reverse=True)
+        escaped = []
+        for variant in variants:
+            pattern = re.escape(variant).replace(r"\ ", r"\s+")
+            if variant in AMBIGUOUS_HEADINGS:
+                # Sem número nem linha isolada, a alternativa falha
+                pattern = rf"(?(number)|(?(isolated)|(?!))){pattern}"
+            escaped.append(pattern)
+        groups.append(f"(?P<{section}>{'|'.join(escaped)})")
+
+    return re.compile(
+        r"^(?P<isolated>(?<![\s\S])|(?<=\n\n)|(?<=[.!?:]\n))?[ \t]*"
+        r"(?P<number>(?:\d+(?:\.\d+)*\.?|(?:[IVXLC]+|[A-Z])\.)[ \t]+)?"
+        rf"(?:{'|'.join(groups)})(?:[ \t]+(?-i:[A-Z]|\d{{1,2}}))?"
+        r"[ \t]*(?(number)[:.]?|:?)[ \t]*$",
+        re.IGNORECASE | re.MULTILINE,
+    )
+
+
+HEADING_PATTERN = _heading_pattern(SECTION_HEADINGS)
+REFERENCES_PATTERN = _heading_pattern(["references"])
+
+
+class SectionParser:
+    """
+    Divide artigos científicos em seções (resumo, introdução, métodos,
+    resultados, conclusão, referências, apêndices...) a partir dos títulos.
+    """
+
+    @staticmethod
+    def split(documents: List[Document]) -> List[Document]:
+        """
+        Divide as páginas em trechos, cada um pertencente a uma única seção.
+        O texto antes do primeiro título reconhecido é marcado como
+        "front_matter" (título, autores, afiliações).
+
+        Args:
+            documents: Lista de documentos (páginas) extraídos do PDF
+
+        Returns:
+            Lista de documentos com `metadata["section"]` preenchido
+        """
+        with Instrumentation.stage("section_parsing"):
+            return list(SectionParser.iter_segments(documents))
+
+    @staticmethod
+    def iter_segments(documents: Iterable[Document]) -> Iterator[Document]:
+        """Versão incremental de `split`: consome uma página por vez."""
+        from langchain_core.documents import Document
+
+        current = "front_matter"
+        for doc in documents:
+            content = doc.page_content
+            position = 0
+
+            for match in HEADING_PATTERN.finditer(content):
+                text = content[position : match.start()].strip()
+                if text:
+                    yield Document(
+                        page_content=text,
+                        metadata={**doc.metadata, "section": current},
+                    )
+                current = match.lastgroup
+                position = match.start()
+
+            text = content[position:].strip()
+            if text:
+                yield Document(
+                    page_content=text,
+                    metadata={**doc.metadata, "section": current},
+                )
+
+    @staticmethod
+    def select(
+        documents: List[Document], sections: Optional[Iterable[str]] = None
+    ) -> Tuple[List[Document], Dict[str, Any]]:
+        """
+        Mantém apenas os trechos das seções desejadas.
+        Se nenhum título for reconhecido, os documentos são mantidos inteiros.
+
+        Args:
+            documents: Lista de documentos (páginas) extraídos do PDF
+            sections: Seções a manter (padrão: DEFAULT_SUMMARY_SECTIONS)
+
+        Returns:
+            Tuple contendo:
+                - Lista de trechos selecionados
+                - Dicionário com as seções encontradas, mantidas e tokens
+        """
+        wanted = set(sections or DEFAULT_SUMMARY_SECTIONS)
+        segments = SectionParser.split(documents)
+
+        found = []
+        for segment in segments:
+            if segment.metadata["section"] not in found:
+                found.append(segment.metadata["section"])
+
+        tokens_before = sum(
+            TextProcessor.estimate_tokens(doc.page_content) for doc in documents
+        )
+        report = {
+            "found": found,
+            "kept": [section for section in found if section in wanted],
+            "tokens_before": tokens_before,
+            "tokens_after": tokens_before,
+        }
+
+        if found == ["front_matter"] or not segments:
+            return documents, report
+
+        selected = [s for s in segments if s.metadata["section"] in wanted]
+        report["tokens_after"] = sum(
+            TextProcessor.estimate_tokens(doc.page_content) for doc in selected
+        )
+        return selected, report
+
+    @staticmethod
+    def select_stream(
+        documents: Iterable[Document],
+        sections: Optional[Iterable[str]],
+        report: Dict[str, Any],
+    ) -> Iterator[Document]:
+        """
+        Versão incremental de `select` para páginas lidas uma a uma: repassa
+        os trechos das seções desejadas e preenche `report` à medida que os
+        consome. Sem voltar às páginas não é possível manter os documentos
+        inteiros quando nenhum título é reconhecido; nesse caso (`found`
+        igual a ["front_matter"]) cabe ao chamador reler as páginas.
+        """
+        wanted = set(sections or DEFAULT_SUMMARY_SECTIONS)
+        report.update(found=[], kept=[], tokens_before=0, tokens_after=0)
+
+        def counted() -> Iterator[Document]:
+            for doc in documents:
+                report["tokens_before"] += TextProcessor.estimate_tokens(
+                    doc.page_content
+                )
+                yield doc
+
+        for segment in SectionParser.iter_segments(counted()):
+            section = segment.metadata["section"]
+            if section not in report["found"]:
+                report["found"].append(section)
+                if section in wanted:
+                    report["kept"].append(section)
+            if section in wanted:
+                report["tokens_after"] += TextProcessor.estimate_tokens(
+                    segment.page_content
+                )
+                yield segment
+
+    @staticmethod
+    def find_references(text: str) -> Optional[re.Match]:
+        """Retorna a primeira ocorrência de um título de referências."""
+        return REFERENCES_PATTERN.search(text)
@@ -0,0 +1,61 @@
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+from config import SEGMENT_CACHE_DIR
+from utils.file_manager import FileManager
+from utils.metrics import Instrumentation
+
+
+class SegmentCache:
+    """
+    Cache em disco dos trechos de áudio sintetizados (uma fala do diálogo).
+    Cada entrada é indexada pelo backend de TTS, pela voz e pelo texto, de
+    modo que falas repetidas ou um novo diálogo com falas em comum não
+    voltam ao TTS.
+    """
+
+    def __init__(self, directory: Path = SEGMENT_CACHE_DIR):
+        self.directory = directory
+
+    @staticmethod
+    def key(text: str, voice_id: str, backend: str) -> str:
+        """
+        Calcula a chave de um trecho.
+
+        Args:
+            text: Texto falado (já formatado para o TTS)
+            voice_id: Voz usada na síntese
+            backend: Nome do backend de TTS
+
+        Returns:
+            Hash SHA-256 em hexadecimal
+        """
+        digest = hashlib.sha256()
+        for part in (backend, voice_id, text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Retorna o áudio armazenado ou None."""
+        path = self.path(key)
+        try:
+            audio = path.read_bytes()
+        except FileNotFoundError:
+            audio = None
+        Instrumentation.record_cache("tts_segment", audio is not None)
+        if audio is not None:
+            FileManager.mark_accessed(path)
+        return audio
+
+    def put(self, key: str, audio: bytes) -> None:
+        """Armazena o áudio de um trecho."""
+        path = self.path(key)
+        path.parent.mkdir(exist_ok=True)
+        FileManager.write_bytes_atomic(path, audio)
+
+    def path(self, key: str) -> Path:
+        """Arquivo de uma entrada (existente ou não)."""
+        # Subdiretórios pelo prefixo do hash evitam diretórios gigantes
+        return self.directory / key[:2] / f"{key}.mp3"
@@ -1,26 +1,134 @@
+from __future__ import annotations
+
+import hashlib
+import itertools
 import json
+import tempfile
+import threading
 import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
-from config import OPENAI_MODEL, SUMMARY_DIR, llm
-from langchain.chains.summarize import load_summarize_chain
-from langchain.prompts import PromptTemplate
-from langchain_core.documents import Document
-from prompts import combine_prompt_template, map_prompt_template, stuff_template
+from config import DEDUP_REUSE_THRESHOLD, LOW_MEMORY_MAP_BATCH_SIZE, OPENAI_MODEL
+from prompts import (
+    combine_prompt_template,
+    dialogue_template,
+    map_prompt_template,
+    stuff_template,
+)
+from utils.file_manager import FileManager
+from utils.metrics import Instrumentation
+from utils.single_flight import SingleFlight
+from utils.text_processor import TextProcessor
 
+from services.backends import create_llm
+from services.dedup_index import near_duplicates
+from services.map_cache import MapCache
+from services.result_store import get_result_store
 from services.pdf_processor import PDFProcessor
+from services.section_parser import SectionParser
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+# Pedidos simultâneos para o mesmo PDF e opções geram um único resumo,
+# inclusive entre workers diferentes
+summarize_flight = SingleFlight("summarize", distributed=True)
+
+# Opções padrão da sumarização (as mesmas da API)
+DEFAULT_SUMMARY_OPTIONS: Dict[str, Any] = {
+    "method": "stuff",
+    "remove_references": True,
+    "strip_boilerplate": True,
+    "sections": (),
+    "reuse_duplicates": True,
+    "trace": False,
+    "low_memory": None,
+    "profile": {"memory": False, "cpu": False},
+}
 
 
 class Summarizer:
     """
     Responsável por gerar resumos de documentos usando LLMs.
+    O cliente do LLM e as chains (e seus imports) são criados no primeiro uso.
     """
 
-    def __init__(self):
-        self.llm = llm
+    def __init__(self, llm: Any = None, map_cache: Optional[MapCache] = None):
+        self._llm = llm
+        self.map_cache = map_cache or MapCache()
+        self._chains: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def llm(self) -> Any:
+        """Cliente do LLM, criado no primeiro acesso."""
+        if self._llm is None:
+            with self._lock:
+                if self._llm is None:
+                    self._llm = create_llm()
+        return self._llm
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.llm, "model_name", None) or OPENAI_MODEL
+
+    def _get_chain(self, method: str) -> Any:
+        """Retorna a chain de sumarização do método, criando-a no primeiro uso."""
+        chain = self._chains.get(method)
+        if chain is not None:
+            return chain
+
+        from langchain.chains.summarize import load_summarize_chain
+        from langchain.prompts import PromptTemplate
+
+        if method == "stuff":
+            prompt = PromptTemplate(template=stuff_template, input_variables=["text"])
+
+            chain = load_summarize_chain(
+                llm=self.llm,
+                chain_type="stuff",
+                prompt=prompt,
+                verbose=True,
+            )
+        else:
+            map_prompt = PromptTemplate(
+                template=map_prompt_template, input_variables=["text"]
+            )
 
-    def stuff(self, pdf_path: Path, chunks: List[Document] = None) -> Dict[str, Any]:
+            combine_prompt = PromptTemplate(
+                template=combine_prompt_template, input_variables=["text"]
+            )
+
+            chain = load_summarize_chain(
+                llm=self.llm,
+                chain_type="map_reduce",
+                map_prompt=map_prompt,
+                combine_prompt=combine_prompt,
+                verbose=True,
+            )
+
+        with self._lock:
+            return self._chains.setdefault(method, chain)
+
+    def stuff(
+        self,
+        pdf_path: Path,
+        chunks: List[Document] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
         """
         Resume um PDF usando o modelo de "stuff".
         Retorna um dicionário com o texto resumido e metadados.
@@ -28,6 +136,8 @@ class Summarizer:
         Args:
             pdf_path: Caminho para o arquivo PDF
             chunks: Lista de documentos já extraídos (opcional)
+            metadata: Informações adicionais armazenadas com o resumo
+                (ex.: limpeza do texto)
         """
         if chunks is None:
             chunks = PDFProcessor.extract_text(pdf_path)
@@ -35,17 +145,10 @@ class Summarizer:
         if not chunks:
             return {"error": "Não foi possível extrair texto do PDF"}
 
-        prompt = PromptTemplate(template=stuff_template, input_variables=["text"])
-
-        chain = load_summarize_chain(
-            llm=self.llm,
-            chain_type="stuff",
-            prompt=prompt,
-            verbose=True,
-        )
+        chain = self._get_chain("stuff")
 
         start_time = time.time()
-        summary = chain.invoke(chunks)
+        summary, token_usage = self._invoke(chain, chunks, "stuff")
         execution_time = time.time() - start_time
 
         result = {
@@ -55,7 +158,9 @@ class Summarizer:
                 "chunks_processed": len(chunks),
                 "execution_time_seconds": round(execution_time, 2),
                 "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "model_used": OPENAI_MODEL,
+                "model_used": self.model_name,
+                "token_usage": token_usage,
+                **(metadata or {}),
             },
         }
 
@@ -64,15 +169,22 @@ class Summarizer:
         return result
 
     def map_reduce(
-        self, pdf_path: Path, chunks: List[Document] = None
+        self,
+        pdf_path: Path,
+        chunks: List[Document] = None,
+        metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Resume um PDF usando o modelo de map-reduce.
+        Os resumos parciais de cada página ficam em cache pelo hash do
+        conteúdo: em uma nova versão do artigo só as páginas alteradas
+        passam pelo map, e apenas o combine é refeito.
         Retorna um dicionário com o texto resumido e metadados.
 
         Args:
             pdf_path: Caminho para o arquivo PDF
             chunks: Lista de documentos já extraídos (opcional)
+            metadata: Informações adicionais armazenadas com o resumo
         """
         if chunks is None:
             chunks = PDFProcessor.extract_text(pdf_path)
@@ -80,35 +192,241 @@ class Summarizer:
         if not chunks:
             return {"error": "Não foi possível extrair texto do PDF"}
 
-        map_prompt = PromptTemplate(
-            template=map_prompt_template, input_variables=["text"]
-        )
+        # Obter e executar a chain de resumo
+        chain = self._get_chain("map_reduce")
 
-        combine_prompt = PromptTemplate(
-            template=combine_prompt_template, input_variables=["text"]
-        )
+        start_time = time.time()
+        summary, token_usage, reused = self._invoke_map_reduce(chain, chunks)
+        execution_time = time.time() - start_time
 
-        # Criar e executar a chain de resumo
-        chain = load_summarize_chain(
-            llm=self.llm,
-            chain_type="map_reduce",
-            map_prompt=map_prompt,
-            combine_prompt=combine_prompt,
-            verbose=True,
+        result = {
+            "summary": summary["output_text"],
+            "metadata": {
+                "source_file": pdf_path.name,
+                "chunks_processed": len(chunks),
+                "execution_time_seconds": round(execution_time, 2),
+                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "model_used": self.model_name,
+                "token_usage": token_usage,
+                "map_outputs_reused": reused,
+                **(metadata or {}),
+            },
+        }
+
+        self._save_summary(result, pdf_path)
+
+        return result
+
+    def summarize(
+        self,
+        pdf_path: Path,
+        chunks: List[Document],
+        options: Dict[str, Any],
+        reuse_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Limpa o texto extraído conforme as opções e o envia ao LLM.
+
+        Args:
+            pdf_path: Caminho para o arquivo PDF
+            chunks: Documentos extraídos do PDF
+            options: `method` ("stuff" ou "map_reduce"), `strip_boilerplate`,
+                `sections` (seções a manter), `remove_references` e
+                `source_file` (nome com que o resumo é armazenado; padrão:
+                nome do PDF)
+            reuse_key: Chave de `reuse_duplicate`, armazenada com o resumo
+
+        Returns:
+            Resumo com as informações da limpeza nos metadados
+        """
+        # Informações sobre a limpeza do texto, armazenadas com o resumo
+        metadata: Dict[str, Any] = {"options_key": self.options_key(options)}
+        if reuse_key:
+            metadata["reuse_key"] = reuse_key
+        if options.get("source_file"):
+            metadata["source_file"] = options["source_file"]
+
+        # Remover cabeçalhos, rodapés e outras linhas repetidas
+        if options.get("strip_boilerplate"):
+            chunks, metadata["boilerplate"] = PDFProcessor.strip_boilerplate(chunks)
+
+        # Enviar ao LLM apenas as seções solicitadas
+        if options.get("sections"):
+            chunks, metadata["sections"] = SectionParser.select(
+                chunks, options["sections"]
+            )
+
+        # Remover referências se solicitado
+        if options.get("remove_references"):
+            chunks, metadata["references_removed"] = PDFProcessor.remove_references(
+                chunks
+            )
+
+        # Escolher método de sumarização
+        if options.get("method", "stuff") == "stuff":
+            return self.stuff(pdf_path, chunks=chunks, metadata=metadata)
+        return self.map_reduce(pdf_path, chunks=chunks, metadata=metadata)
+
+    def summarize_low_memory(
+        self,
+        pdf_path: Path,
+        options: Dict[str, Any],
+        reuse_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Variante de `summarize` com memória limitada, para PDFs muito
+        grandes: as páginas são lidas e limpas uma a uma, os resumos
+        parciais do map ficam apenas no cache em disco e o combine é feito
+        em níveis, lendo do disco um grupo de resumos por vez. A remoção de
+        cabeçalhos e rodapés custa uma leitura a mais do PDF.
+
+        O método "stuff" envia todo o texto em um único prompt; nele, apenas
+        a extração e a limpeza são incrementais.
+
+        Args:
+            pdf_path: Caminho para o arquivo PDF
+            options: As mesmas opções de `summarize`
+            reuse_key: Chave de `reuse_duplicate`, armazenada com o resumo
+
+        Returns:
+            Resumo com as informações da limpeza nos metadados
+        """
+        repeated = None
+        if options.get("strip_boilerplate"):
+            with Instrumentation.stage("boilerplate_removal"):
+                repeated = PDFProcessor.boilerplate_lines(
+                    PDFProcessor.iter_pages(pdf_path)
+                )
+
+        reports: Dict[str, Any] = {}
+        pages = self._clean_pages(pdf_path, options, repeated, reports)
+
+        if options.get("method", "stuff") == "stuff":
+            chunks = list(pages)
+            if not chunks and self._no_headings(reports):
+                chunks = list(self._clean_pages(pdf_path, options, repeated, {}))
+            return self.stuff(
+                pdf_path,
+                chunks=chunks,
+                metadata=self._low_memory_metadata(options, reports, reuse_key),
+            )
+
+        return self._map_reduce_low_memory(
+            pdf_path,
+            pages,
+            lambda: self._clean_pages(pdf_path, options, repeated, {}),
+            reports,
+            options,
+            reuse_key,
         )
 
+    def _low_memory_metadata(
+        self,
+        options: Dict[str, Any],
+        reports: Dict[str, Any],
+        reuse_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Informações sobre a limpeza do texto, como em `summarize`."""
+        metadata: Dict[str, Any] = {
+            "low_memory": True,
+            "options_key": self.options_key(options),
+        }
+        if reuse_key:
+            metadata["reuse_key"] = reuse_key
+        if options.get("source_file"):
+            metadata["source_file"] = options["source_file"]
+        if options.get("strip_boilerplate"):
+            metadata["boilerplate"] = reports["boilerplate"]
+        if options.get("sections"):
+            metadata["sections"] = reports["sections"]
+        if options.get("remove_references"):
+            metadata["references_removed"] = reports["references"]["references_removed"]
+        return metadata
+
+    def _clean_pages(
+        self,
+        pdf_path: Path,
+        options: Dict[str, Any],
+        repeated: Optional[Set[str]],
+        reports: Dict[str, Any],
+        sections: bool = True,
+    ) -> Iterator[Document]:
+        """
+        Encadeia a leitura das páginas e as etapas de limpeza como geradores;
+        os relatórios de cada etapa são preenchidos em `reports` à medida que
+        as páginas são consumidas.
+        """
+        pages = PDFProcessor.iter_pages(pdf_path)
+
+        if repeated is not None:
+            boilerplate = reports["boilerplate"] = {
+                "lines_removed": 0,
+                "chars_removed": 0,
+                "tokens_saved": 0,
+            }
+            pages = (
+                PDFProcessor.clean_page(doc, repeated, boilerplate) for doc in pages
+            )
+
+        if sections and options.get("sections"):
+            reports["sections"] = {}
+            pages = SectionParser.select_stream(
+                pages, options["sections"], reports["sections"]
+            )
+
+        if options.get("remove_references"):
+            reports["references"] = {"references_removed": False}
+            pages = PDFProcessor.until_references(pages, reports["references"])
+
+        return pages
+
+    @staticmethod
+    def _no_headings(reports: Dict[str, Any]) -> bool:
+        """
+        Indica se a seleção de seções descartou tudo por não reconhecer
+        nenhum título; como em `SectionParser.select`, o texto é mantido.
+        """
+        return reports.get("sections", {}).get("found") == ["front_matter"]
+
+    def _map_reduce_low_memory(
+        self,
+        pdf_path: Path,
+        pages: Iterator[Document],
+        reread: Callable[[], Iterator[Document]],
+        reports: Dict[str, Any],
+        options: Dict[str, Any],
+        reuse_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """map_reduce sobre páginas lidas sob demanda (ver `summarize_low_memory`)."""
+        from services.llm_callbacks import MetricsCallbackHandler
+
+        chain = self._get_chain("map_reduce")
+        handler = MetricsCallbackHandler()
+
         start_time = time.time()
-        summary = chain.invoke(chunks)
+        with Instrumentation.stage("summarize.map_reduce", low_memory=True) as span:
+            keys, reused = self._map_pages(chain, pages, handler)
+            if not keys and self._no_headings(reports):
+                keys, reused = self._map_pages(chain, reread(), handler)
+            if not keys:
+                return {"error": "Não foi possível extrair texto do PDF"}
+            if span is not None:
+                span.attributes["chunks"] = len(keys)
+            output_text = self._reduce_spilled(chain, keys, handler)
         execution_time = time.time() - start_time
 
         result = {
-            "summary": summary["output_text"],
+            "summary": output_text,
             "metadata": {
                 "source_file": pdf_path.name,
-                "chunks_processed": len(chunks),
+                "chunks_processed": len(keys),
                 "execution_time_seconds": round(execution_time, 2),
                 "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "model_used": OPENAI_MODEL,
+                "model_used": self.model_name,
+                "token_usage": handler.usage(),
+                "map_outputs_reused": reused,
+                # Os relatórios da limpeza ficam completos após o map
+                **self._low_memory_metadata(options, reports, reuse_key),
             },
         }
 
@@ -116,17 +434,382 @@ class Summarizer:
 
         return result
 
-    def _save_summary(self, summary_data: Dict[str, Any], pdf_path: Path) -> Path:
-        """Salva o resumo em um arquivo JSON.
+    def _map_pages(
+        self,
+        chain: Any,
+        pages: Iterable[Document],
+        handler: Any,
+        batch_size: int = LOW_MEMORY_MAP_BATCH_SIZE,
+    ) -> Tuple[List[str], int]:
+        """
+        Executa o map à medida que as páginas são lidas, em lotes de
+        `batch_size`, gravando cada resumo parcial no cache em disco.
+
+        Returns:
+            Tupla (chaves dos resumos parciais na ordem das páginas,
+            quantidade reaproveitada do cache)
+        """
+        keys: List[str] = []
+        reused = 0
+        batch: List[Tuple[str, Document]] = []
+
+        def flush() -> None:
+            with Instrumentation.stage("summarize.map", chunks=len(batch)):
+                results = chain.llm_chain.apply(
+                    [
+                        {chain.document_variable_name: doc.page_content}
+                        for _, doc in batch
+                    ],
+                    callbacks=[handler],
+                )
+            for (key, _), result in zip(batch, results):
+                self.map_cache.put(key, result[chain.llm_chain.output_key])
+            batch.clear()
+
+        for doc in pages:
+            key = self.map_cache.key(
+                doc.page_content, self.model_name, map_prompt_template
+            )
+            keys.append(key)
+            if self.map_cache.get(key) is not None:
+                reused += 1
+                continue
+            batch.append((key, doc))
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+        return keys, reused
+
+    def _reduce_spilled(self, chain: Any, keys: List[str], handler: Any) -> str:
+        """
+        Combine dos resumos parciais em disco. Reproduz o
+        `ReduceDocumentsChain` (grupos que cabem em `token_max` são
+        resumidos pelo collapse até restar um único grupo, enviado ao
+        combine), mas só o grupo em processamento fica em memória: os
+        resultados de cada nível vão para um diretório temporário.
+        """
+        from langchain_core.documents import Document
+
+        reduce_chain = chain.reduce_documents_chain
+        collapse_chain = (
+            reduce_chain.collapse_documents_chain
+            or reduce_chain.combine_documents_chain
+        )
+        # Espaço do prompt descontado, como em `prompt_length`
+        budget = reduce_chain.token_max - TextProcessor.estimate_tokens(
+            combine_prompt_template
+        )
+        paths = [self.map_cache.path(key) for key in keys]
+
+        with tempfile.TemporaryDirectory(
+            dir=self.map_cache.directory, prefix=".spill_"
+        ) as spill_dir:
+            level = 0
+            while True:
+                groups = self._token_groups(paths, budget)
+                first = next(groups)
+                second = next(groups, None)
+                if second is None:
+                    with Instrumentation.stage("summarize.combine"):
+                        output_text, _ = (
+                            reduce_chain.combine_documents_chain.combine_docs(
+                                [Document(page_content=text) for text in first],
+                                callbacks=[handler],
+                            )
+                        )
+                    return output_text
+
+                level += 1
+                collapsed = []
+                with Instrumentation.stage(
+                    "summarize.collapse", level=level, inputs=len(paths)
+                ):
+                    for group in itertools.chain((first, second), groups):
+                        text, _ = collapse_chain.combine_docs(
+                            [Document(page_content=text) for text in group],
+                            callbacks=[handler],
+                        )
+                        path = Path(spill_dir) / f"{level}_{len(collapsed)}.txt"
+                        path.write_text(text, encoding="utf-8")
+                        collapsed.append(path)
+                paths = collapsed
+
+    @staticmethod
+    def _token_groups(paths: List[Path], budget: int) -> Iterator[List[str]]:
+        """Lê os textos em ordem, agrupando-os em até `budget` tokens."""
+        group: List[str] = []
+        tokens = 0
+        for path in paths:
+            text = path.read_text(encoding="utf-8")
+            size = TextProcessor.estimate_tokens(text)
+            if size > budget:
+                raise ValueError(
+                    "Um resumo parcial excede o limite de tokens do combine"
+                )
+            if group and tokens + size > budget:
+                yield group
+                group, tokens = [], 0
+            group.append(text)
+            tokens += size
+        if group:
+            yield group
+
+    def reuse_key(self, text_hash: str, options: Dict[str, Any]) -> str:
+        """
+        Chave dos resumos que podem ser reaproveitados entre si: mesmo texto
+        extraído, mesmas opções de limpeza e método e mesmo modelo.
+
+        Args:
+            text_hash: Hash do texto extraído (ver `text_hash`)
+            options: Opções da sumarização
+        """
+        return self._hash_key({"text": text_hash, **self._option_fields(options)})
+
+    def options_key(self, options: Dict[str, Any]) -> str:
+        """
+        Chave das opções de limpeza, do método e do modelo, sem o texto: só
+        resumos com a mesma chave são reaproveitados entre quase duplicados.
+        """
+        return self._hash_key(self._option_fields(options))
+
+    def _option_fields(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "method": options.get("method", "stuff"),
+            "remove_references": bool(options.get("remove_references")),
+            "strip_boilerplate": bool(options.get("strip_boilerplate")),
+            "sections": list(options.get("sections") or ()),
+        }
+
+    @staticmethod
+    def _hash_key(fields: Dict[str, Any]) -> str:
+        raw = json.dumps(fields, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+
+    @staticmethod
+    def text_hash(pages: Iterable[Document]) -> str:
+        """SHA-256 do texto extraído, antes de qualquer limpeza."""
+        digest = hashlib.sha256()
+        for page in pages:
+            digest.update(page.page_content.encode("utf-8"))
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    def reuse_duplicate(
+        self, pdf_path: Path, reuse_key: str, options: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Reaproveita, em vez de chamar o LLM novamente, o resumo gerado com as
+        mesmas opções e o mesmo modelo de outro PDF com o mesmo texto
+        (reenvio, cópia com outro nome...) ou, se o PDF já foi indexado, de
+        um quase duplicado com similaridade >= DEDUP_REUSE_THRESHOLD (versão
+        final de um preprint...). Versões abaixo do limiar passam pelo
+        caminho normal (e pelo cache do map).
+
+        Args:
+            pdf_path: Caminho para o arquivo PDF
+            reuse_key: Chave calculada por `reuse_key`
+            options: Opções da sumarização (ver `options_key`)
+
+        Returns:
+            Resumo reaproveitado ou None se não houver duplicado resumido
+        """
+        store = get_result_store()
+        options_key = self.options_key(options)
+        existing = store.find_summary(reuse_key, exclude=pdf_path.name)
+        similarity = 1.0
+        if not existing:
+            # Quase duplicados do mais similar para o menos similar
+            for match in near_duplicates(pdf_path.name, DEDUP_REUSE_THRESHOLD) or []:
+                existing = store.get_summary(match["filename"], options_key)
+                if existing:
+                    similarity = match["similarity"]
+                    break
+
+        if not existing or "summary" not in existing:
+            Instrumentation.record_cache("duplicate", False)
+            return None
+
+        Instrumentation.record_cache("duplicate", True)
+        metadata = existing.get("metadata", {})
+        result = {
+            "summary": existing["summary"],
+            "metadata": {
+                **metadata,
+                "source_file": pdf_path.name,
+                "reuse_key": reuse_key,
+                "options_key": options_key,
+                "execution_time_seconds": 0.0,
+                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "token_usage": {
+                    "llm_calls": 0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "total_tokens": 0,
+                },
+                "reused_from": metadata.get("source_file"),
+                "reuse_similarity": similarity,
+            },
+        }
+        self._save_summary(result, pdf_path)
+        return result
+
+    def write_dialogue(self, summary: str) -> tuple:
+        """
+        Transforma um resumo no roteiro de um diálogo entre dois apresentadores.
+
+        Args:
+            summary: Texto do resumo
+
+        Returns:
+            Tupla (roteiro com falas "A:"/"B:", consumo de tokens)
+        """
+        from services.llm_callbacks import MetricsCallbackHandler
+
+        handler = MetricsCallbackHandler()
+        prompt = dialogue_template.format(text=summary)
+        with Instrumentation.stage("dialogue_script", chars=len(summary)):
+            message = self.llm.invoke(prompt, config={"callbacks": [handler]})
+        return message.content, handler.usage()
+
+    @staticmethod
+    def load_summary(pdf_path: Path) -> Optional[Dict[str, Any]]:
+        """Carrega o resumo mais recente de um PDF, se existir."""
+        return get_result_store().get_summary(pdf_path.name)
+
+    def _invoke(self, chain: Any, chunks: List[Document], method: str) -> tuple:
+        """Executa a chain medindo a etapa e o consumo de tokens."""
+        from services.llm_callbacks import MetricsCallbackHandler
+
+        handler = MetricsCallbackHandler()
+        with Instrumentation.stage(f"summarize.{method}", chunks=len(chunks)):
+            summary = chain.invoke(chunks, config={"callbacks": [handler]})
+        return summary, handler.usage()
+
+    def _invoke_map_reduce(self, chain: Any, chunks: List[Document]) -> tuple:
+        """
+        Executa o map_reduce reaproveitando os resumos parciais em cache.
+        Reproduz `MapReduceDocumentsChain.combine_docs`, mas só envia ao LLM
+        as páginas sem resumo parcial armazenado.
+        """
+        from langchain_core.documents import Document
+        from services.llm_callbacks import MetricsCallbackHandler
+
+        handler = MetricsCallbackHandler()
+        keys = [
+            self.map_cache.key(doc.page_content, self.model_name, map_prompt_template)
+            for doc in chunks
+        ]
+        outputs = [self.map_cache.get(key) for key in keys]
+        missing = [i for i, output in enumerate(outputs) if output is None]
+
+        with Instrumentation.stage("summarize.map_reduce", chunks=len(chunks)):
+            if missing:
+                with Instrumentation.stage("summarize.map", chunks=len(missing)):
+                    results = chain.llm_chain.apply(
+                        [
+                            {chain.document_variable_name: chunks[i].page_content}
+                            for i in missing
+                        ],
+                        callbacks=[handler],
+                    )
+                for i, result in zip(missing, results):
+                    outputs[i] = result[chain.llm_chain.output_key]
+                    self.map_cache.put(keys[i], outputs[i])
+
+            mapped = [
+                Document(page_content=output, metadata=doc.metadata)
+                for output, doc in zip(outputs, chunks)
+            ]
+            with Instrumentation.stage("summarize.combine"):
+                output_text, _ = chain.reduce_documents_chain.combine_docs(
+                    mapped, callbacks=[handler]
+                )
+
+        reused = len(chunks) - len(missing)
+        return {"output_text": output_text}, handler.usage(), reused
+
+    def _save_summary(self, summary_data: Dict[str, Any], pdf_path: Path) -> int:
+        """Salva o resumo no banco de resultados.
 
         Args:
             summary_data: Dados do resumo
             pdf_path: Caminho para o arquivo PDF
+
+        Returns:
+            ID do registro salvo
         """
-        base_name = pdf_path.stem
-        summary_path = SUMMARY_DIR / f"{base_name}_summary.json"
+        summary_data["metadata"].setdefault("source_file", pdf_path.name)
+
+        with Instrumentation.stage("store_write", kind="summary"):
+            return get_result_store().save_summary(summary_data)
+
+
+@lru_cache(maxsize=1)
+def get_summarizer() -> Summarizer:
+    """Instância compartilhada do Summarizer, criada no primeiro uso."""
+    return Summarizer()
+
+
+def summary_key(pdf_path: Path, options: Dict[str, Any]) -> Tuple[str, str]:
+    """Chave de `summarize_flight`: pedidos com a mesma chave são agrupados."""
+    return pdf_path.name, repr(sorted(options.items()))
+
+
+def run_summarization(pdf_path: Path, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extrai, limpa e sumariza um PDF, como na API.
+
+    Args:
+        pdf_path: Caminho para o arquivo PDF
+        options: As chaves de DEFAULT_SUMMARY_OPTIONS
+
+    Returns:
+        Resumo, com a árvore de tempos (`trace`) e o perfilamento
+        (`profile`) se solicitados
+    """
+    method = options["method"]
+    low_memory = options["low_memory"]
+    if low_memory is None:
+        low_memory = PDFProcessor.is_large(pdf_path)
+
+    with Instrumentation.in_flight("summarize"), Instrumentation.trace(
+        "summarize", enabled=options["trace"], pdf=pdf_path.name, method=method
+    ) as root, Instrumentation.profile(
+        "summarize", **options["profile"], pdf=pdf_path.name, method=method
+    ) as profile:
+        FileManager.mark_accessed(pdf_path)
+        summarizer = get_summarizer()
+
+        if low_memory:
+            # Páginas lidas uma a uma; o hash do texto custa uma leitura a
+            # mais do PDF e só é calculado se o resumo puder ser reaproveitado
+            key = None
+            result = None
+            if options["reuse_duplicates"]:
+                text_hash = summarizer.text_hash(PDFProcessor.iter_pages(pdf_path))
+                key = summarizer.reuse_key(text_hash, options)
+                result = summarizer.reuse_duplicate(pdf_path, key, options)
+            if result is None:
+                result = summarizer.summarize_low_memory(pdf_path, options, key)
+        else:
+            # Extrair texto do PDF
+            chunks = PDFProcessor.extract_text(pdf_path)
+            key = summarizer.reuse_key(summarizer.text_hash(chunks), options)
+
+            # Reaproveitar o resumo de uma cópia do artigo
+            result = None
+            if options["reuse_duplicates"] and chunks:
+                result = summarizer.reuse_duplicate(pdf_path, key, options)
+
+            if result is None:
+                result = summarizer.summarize(pdf_path, chunks, options, key)
 
-        with open(summary_path, "w", encoding="utf-8") as f:
-            json.dump(summary_data, f, ensure_ascii=False, indent=2)
+    if options["trace"]:
+        result["trace"] = root.to_dict()
+    if any(options["profile"].values()):
+        result["profile"] = profile.dump()
 
-        return summary_path
+    return result
@@ -0,0 +1,40 @@
+import copy
+from pathlib import Path
+
+import pytest
+from config import PDF_DIR
+
+from synthetic import make_pdf, paper_pages
+
+# Tamanhos (em páginas) dos PDFs sintéticos usados nos benchmarks
+PDF_SIZES = [5, 25, 100]
+
+
+@pytest.fixture(scope="session", params=PDF_SIZES, ids=lambda n: f"{n}p")
+def paper_pdf(request) -> Path:
+    """PDF sintético salvo no diretório de PDFs da aplicação."""
+    pages = request.param
+    path = PDF_DIR / f"synthetic_{pages}p.pdf"
+    if not path.exists():
+        path.write_bytes(make_pdf(paper_pages(pages, seed=pages)))
+    return path
+
+
+@pytest.fixture(scope="session")
+def paper_documents(paper_pdf):
+    """Documentos LangChain extraídos do PDF sintético."""
+    from services.pdf_processor import PDFProcessor
+
+    return PDFProcessor.extract_text(paper_pdf)
+
+
+@pytest.fixture(scope="session")
+def paper_text(paper_documents) -> str:
+    """Texto completo do PDF sintético."""
+    return "\n".join(doc.page_content for doc in paper_documents)
+
+
+@pytest.fixture
+def fresh_documents(paper_documents):
+    """Fábrica de cópias dos documentos (algumas etapas os modificam)."""
+    return lambda: copy.deepcopy(paper_documents)
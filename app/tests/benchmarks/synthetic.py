@@ -0,0 +1,104 @@
+import random
+from typing import List
+
+WORDS = (
+    "model data results method analysis network learning training evaluation "
+    "performance dataset proposed approach baseline experiment accuracy "
+    "language text summary paper research study effect sample significant "
+    "modelo dados resultados método análise rede aprendizado avaliação "
+    "desempenho proposta abordagem experimento precisão estudo amostra"
+).split()
+
+SECTIONS = ["Abstract", "Introduction", "Methods", "Results", "Conclusion"]
+
+
+def _paragraph(rng: random.Random, sentences: int = 6) -> List[str]:
+    """Gera linhas de um parágrafo com frases pseudoaleatórias."""
+    lines = []
+    for _ in range(sentences):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(8, 16))]
+        sentence = " ".join(words).capitalize() + "."
+        if rng.random() < 0.3:
+            sentence = sentence.replace(".", ", e.g. 42% of 3 samples.", 1)
+        lines.append(sentence)
+    return lines
+
+
+def paper_pages(num_pages: int, seed: int = 0) -> List[str]:
+    """
+    Gera o texto das páginas de um artigo sintético, com cabeçalho e rodapé
+    repetidos, seções típicas e uma seção de referências no final.
+    """
+    rng = random.Random(seed)
+    reference_pages = max(1, num_pages // 10)
+    body_pages = max(1, num_pages - reference_pages)
+    pages = []
+
+    for page in range(num_pages):
+        lines = ["Journal of Synthetic Research, Vol. 12 (2024)"]
+        if page < body_pages:
+            section = SECTIONS[min(page * len(SECTIONS) // body_pages, 4)]
+            lines.append(section)
+            for _ in range(4):
+                lines.extend(_paragraph(rng))
+        else:
+            if page == body_pages:
+                lines.append("References")
+            for ref in range(20):
+                lines.append(
+                    f"[{page * 20 + ref}] A. Author, B. Author. "
+                    f"{rng.choice(WORDS).title()} {rng.choice(WORDS)}. 2021."
+                )
+        lines.append(f"doi:10.1234/jsr.2024.{seed:04d}   Page {page + 1}")
+        pages.append("\n".join(lines))
+
+    return pages
+
+
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: List[str]) -> bytes:
+    """
+    Monta um PDF mínimo (fonte Helvetica, uma linha de texto por linha de
+    entrada) sem depender de bibliotecas de geração de PDF.
+    """
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages))), len(pages)
+        ),
+    ]
+    font_ref = 3 + 2 * len(pages)
+
+    for i, text in enumerate(pages):
+        ops = " ".join(f"({_escape(line)}) Tj T*" for line in text.split("\n"))
+        stream = f"BT /F1 9 Tf 11 TL 40 760 Td {ops} ET"
+        stream_bytes = stream.encode("latin-1", "replace")
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {font_ref} 0 R >> >> >>"
+        )
+        objects.append(
+            f"<< /Length {len(stream_bytes)} >>\nstream\n"
+            + stream_bytes.decode("latin-1")
+            + "\nendstream"
+        )
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    output = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n{obj}\nendobj\n".encode("latin-1", "replace")
+
+    xref_start = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    output += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref_start}\n%%EOF\n"
+    ).encode()
+    return output
@@ -0,0 +1,53 @@
+import shutil
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from services.audio_processor import AudioPostProcessor, process_audio  # noqa: E402
+from utils.audio import MP3_FRAME_SECONDS, SILENT_MP3_FRAME  # noqa: E402
+from utils.audio import concat_mp3, mp3_duration, mp3_file_duration  # noqa: E402
+
+# Aproximadamente 10 minutos de áudio
+EPISODE_FRAMES = int(600 / MP3_FRAME_SECONDS)
+
+
+@pytest.mark.benchmark(group="audio")
+def test_mp3_duration(benchmark):
+    audio = SILENT_MP3_FRAME * EPISODE_FRAMES
+    duration = benchmark(mp3_duration, audio)
+    assert duration == pytest.approx(600, abs=0.1)
+
+
+@pytest.mark.benchmark(group="audio")
+def test_mp3_file_duration(benchmark, tmp_path):
+    """Duração lida do disco via mmap, sem carregar o arquivo."""
+    path = tmp_path / "episode.mp3"
+    path.write_bytes(SILENT_MP3_FRAME * EPISODE_FRAMES)
+    duration = benchmark(mp3_file_duration, path)
+    assert duration == pytest.approx(600, abs=0.1)
+
+
+@pytest.mark.benchmark(group="audio")
+def test_concat_segments(benchmark):
+    segments = [SILENT_MP3_FRAME * (EPISODE_FRAMES // 60)] * 60
+    audio = benchmark(concat_mp3, segments, 400)
+    assert len(audio) > sum(len(segment) for segment in segments)
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg não instalado")
+@pytest.mark.benchmark(group="audio_postprocess")
+def test_process_audio(benchmark, tmp_path):
+    """Normalização, variantes e HLS de um minuto de áudio."""
+    source = tmp_path / "episode.mp3"
+    source.write_bytes(SILENT_MP3_FRAME * (EPISODE_FRAMES // 10))
+    settings = AudioPostProcessor(output_dir=tmp_path, enabled=True)._settings()
+
+    result = benchmark.pedantic(
+        process_audio,
+        args=(str(source), str(tmp_path / "episode"), settings),
+        rounds=3,
+        iterations=1,
+    )
+    assert result["status"] == "ready"
+    assert result["hls"]["segments"] > 0
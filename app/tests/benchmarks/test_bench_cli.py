@@ -0,0 +1,90 @@
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from cli import BatchRunner, Checkpoint, main  # noqa: E402
+from services.summarizer import Summarizer  # noqa: E402
+from synthetic import make_pdf, paper_pages  # noqa: E402
+
+BATCH_SIZE = 8
+
+
+@pytest.fixture(scope="module")
+def batch_pdfs(tmp_path_factory):
+    """Lote de PDFs sintéticos distintos de 5 páginas."""
+    directory = tmp_path_factory.mktemp("batch")
+    paths = []
+    for i in range(BATCH_SIZE):
+        path = directory / f"batch_{i}.pdf"
+        path.write_bytes(make_pdf(paper_pages(5, seed=100 + i)))
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.benchmark(group="cli")
+@pytest.mark.parametrize("podcast", ["none", "monologue"])
+def test_batch_run(benchmark, batch_pdfs, tmp_path, podcast):
+    options = {"method": "stuff", "podcast": podcast, "voice_id": "voice"}
+
+    def run():
+        checkpoint = Checkpoint(tmp_path / f"checkpoint_{podcast}.jsonl")
+        checkpoint.path.unlink(missing_ok=True)
+        return BatchRunner(options, workers=4, checkpoint=checkpoint).run(batch_pdfs)
+
+    report = benchmark.pedantic(run, rounds=3, iterations=1)
+    summary = report["summary"]
+    benchmark.extra_info["files_per_minute"] = summary["files_per_minute"]
+    assert summary["done"] == BATCH_SIZE
+    assert summary["failed"] == 0
+
+
+def test_batch_resume_skips_done(batch_pdfs, tmp_path):
+    options = {"method": "stuff", "podcast": "none"}
+    checkpoint_path = tmp_path / "checkpoint.jsonl"
+
+    first = BatchRunner(options, checkpoint=Checkpoint(checkpoint_path))
+    assert first.run(batch_pdfs[:3])["summary"]["done"] == 3
+
+    resumed = BatchRunner(options, checkpoint=Checkpoint(checkpoint_path))
+    summary = resumed.run(batch_pdfs[:4])["summary"]
+    assert summary["skipped"] == 3
+    assert summary["done"] == 1
+
+
+def test_same_name_in_different_directories(tmp_path):
+    """PDFs homônimos com conteúdo diferente não compartilham resumos."""
+    pdfs = []
+    for seed in (200, 201):
+        directory = tmp_path / f"dir_{seed}"
+        directory.mkdir()
+        pdfs.append(directory / "paper.pdf")
+        pdfs[-1].write_bytes(make_pdf(paper_pages(5, seed=seed)))
+
+    options = {"method": "stuff", "podcast": "none"}
+    report = BatchRunner(options).run(pdfs)
+    names = {record["source_file"] for record in report["files"]}
+    assert len(names) == 2
+
+    summaries = [Summarizer.load_summary(Path(name)) for name in names]
+    assert all(summary is not None for summary in summaries)
+    assert summaries[0]["summary"] != summaries[1]["summary"]
+
+
+@pytest.mark.parametrize(
+    "flags, boilerplate", [([], True), (["--no-strip-boilerplate"], False)]
+)
+def test_cli_uses_api_defaults(tmp_path, flags, boilerplate):
+    pdf = tmp_path / "defaults.pdf"
+    pdf.write_bytes(make_pdf(paper_pages(5, seed=300 + len(flags))))
+    report_path = tmp_path / "report.json"
+    argv = [str(pdf), "--podcast", "none", "--checkpoint", str(tmp_path / "c.jsonl")]
+
+    assert main([*argv, "--report", str(report_path), *flags]) == 0
+
+    (record,) = json.loads(report_path.read_text())["files"]
+    metadata = Summarizer.load_summary(Path(record["source_file"]))["metadata"]
+    assert metadata["references_removed"] is True
+    assert ("boilerplate" in metadata) is boilerplate
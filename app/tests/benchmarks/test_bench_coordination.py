@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from utils.coordination import SQLiteCoordinator  # noqa: E402
+
+APP_DIR = Path(__file__).resolve().parents[2]
+
+# Worker em outro processo: executa a tarefa lenta "key" via run_once
+WORKER_SCRIPT = """
+import json, os, sys, time
+from pathlib import Path
+from utils.coordination import SQLiteCoordinator
+
+db, marker = Path(sys.argv[1]), Path(sys.argv[2])
+
+def run():
+    with open(marker, "a") as f:
+        f.write(f"{os.getpid()}\\n")
+    time.sleep(1.0)
+    return {"pid": os.getpid()}
+
+result, shared = SQLiteCoordinator(db).run_once("key", run, claim_ttl=0.6)
+print(json.dumps({"result": result, "shared": shared}))
+"""
+
+# Worker que morre no meio da tarefa, sem liberar a reivindicação
+DYING_WORKER_SCRIPT = """
+import os, sys
+from pathlib import Path
+from utils.coordination import SQLiteCoordinator
+
+SQLiteCoordinator(Path(sys.argv[1])).run_once(
+    "key", lambda: os._exit(0), claim_ttl=0.5
+)
+"""
+
+
+def run_python(script, *args):
+    return subprocess.Popen(
+        [sys.executable, "-c", script, *map(str, args)],
+        cwd=APP_DIR,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+
+
+@pytest.mark.benchmark(group="coordination")
+def test_claim_release(benchmark, tmp_path):
+    coordinator = SQLiteCoordinator(tmp_path / "coordination.db")
+
+    def claim_release():
+        token, holder = coordinator.claim("key", 30)
+        coordinator.release("key", token)
+        return token, holder
+
+    token, holder = benchmark(claim_release)
+    assert token is not None and holder is None
+
+
+def test_claim_is_exclusive(tmp_path):
+    first = SQLiteCoordinator(tmp_path / "coordination.db")
+    second = SQLiteCoordinator(tmp_path / "coordination.db")
+
+    token, _ = first.claim("key", 30)
+    assert second.claim("key", 30) == (None, token)
+    assert second.current_claim("key") == token
+
+    first.release("key", token)
+    new_token, holder = second.claim("key", 30)
+    assert new_token not in (None, token) and holder is None
+
+
+def test_claim_renewed_while_running(tmp_path):
+    """Reivindicações mais curtas que a tarefa não passam a outro worker."""
+    leader = SQLiteCoordinator(tmp_path / "coordination.db")
+    follower = SQLiteCoordinator(tmp_path / "coordination.db")
+    calls = []
+
+    def run():
+        calls.append(1)
+        time.sleep(1.0)
+        return {"value": 42}
+
+    thread = threading.Thread(
+        target=leader.run_once, args=("key", run), kwargs={"claim_ttl": 0.3}
+    )
+    thread.start()
+    time.sleep(0.1)
+    result = follower.run_once("key", run, claim_ttl=0.3)
+    thread.join()
+
+    assert result == ({"value": 42}, True)
+    assert len(calls) == 1
+
+
+def test_claim_taken_over_after_worker_dies(tmp_path):
+    db = tmp_path / "coordination.db"
+    run_python(DYING_WORKER_SCRIPT, db).wait(timeout=60)
+
+    coordinator = SQLiteCoordinator(db)
+    key = hashlib.sha256(b"key").hexdigest()
+    assert coordinator.current_claim(key) is not None
+
+    # Outro worker assume a tarefa quando o prazo da reivindicação termina
+    result, shared = coordinator.run_once("key", lambda: {"value": 1})
+    assert (result, shared) == ({"value": 1}, False)
+
+
+def test_result_shared_between_processes(tmp_path):
+    db, marker = tmp_path / "coordination.db", tmp_path / "runs.txt"
+    SQLiteCoordinator(db)  # Cria o esquema antes dos workers
+    workers = [run_python(WORKER_SCRIPT, db, marker) for _ in range(3)]
+    outputs = [json.loads(worker.communicate(timeout=60)[0]) for worker in workers]
+
+    runs = marker.read_text().split()
+    assert len(runs) == 1
+    assert all(output["result"] == {"pid": int(runs[0])} for output in outputs)
+    assert sorted(output["shared"] for output in outputs) == [False, True, True]
+
+
+@pytest.mark.parametrize("workers, backend", [("1", "local"), ("4", "sqlite")])
+def test_default_backend(workers, backend):
+    env = {k: v for k, v in os.environ.items() if k != "COORDINATION_BACKEND"}
+    output = subprocess.run(
+        [sys.executable, "-c", "import config; print(config.COORDINATION_BACKEND)"],
+        cwd=APP_DIR,
+        env={**env, "UVICORN_WORKERS": workers},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert output.stdout.strip() == backend
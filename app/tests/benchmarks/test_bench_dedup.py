@@ -0,0 +1,169 @@
+import json
+import random
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from config import PDF_DIR  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from main import app  # noqa: E402
+from services import summarizer as summarizer_module  # noqa: E402
+from services.dedup_index import NearDuplicateIndex, index_pdf  # noqa: E402
+from synthetic import make_pdf, paper_pages  # noqa: E402
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def dedup_index():
+    """Índice em memória com alguns artigos distintos já indexados."""
+    index = NearDuplicateIndex(path=None)
+    for seed in range(20):
+        index.add(f"paper_{seed}.pdf", "\n".join(paper_pages(5, seed=1000 + seed)))
+    return index
+
+
+@pytest.mark.benchmark(group="minhash_signature")
+def test_minhash_signature(benchmark, dedup_index, paper_text):
+    signature = benchmark(dedup_index.signature, paper_text)
+    benchmark.extra_info["chars"] = len(paper_text)
+    assert len(signature) == dedup_index.num_perm
+
+
+@pytest.mark.benchmark(group="near_duplicate_lookup")
+def test_near_duplicate_lookup(benchmark, dedup_index, paper_text):
+    dedup_index.add("original.pdf", paper_text)
+    signature = dedup_index.signature(paper_text + "\nCamera-ready revision.")
+    matches = benchmark(dedup_index.query, signature)
+    assert matches[0][0] == "original.pdf"
+
+
+def random_signature(rng, num_perm=128):
+    return tuple(rng.getrandbits(32) for _ in range(num_perm))
+
+
+@pytest.mark.benchmark(group="near_duplicate_add")
+def test_index_add(benchmark, tmp_path):
+    """Inclusão no índice em disco com milhares de documentos indexados."""
+    rng = random.Random(0)
+    index = NearDuplicateIndex(path=tmp_path / "index.db")
+    for i in range(2000):
+        index.add_signature(f"paper_{i}.pdf", random_signature(rng))
+    # Outro worker, que lê apenas as alterações feitas após carregar o índice
+    other = NearDuplicateIndex(path=tmp_path / "index.db")
+    names = (f"new_{i}.pdf" for i in range(10**6))
+
+    def add():
+        index.add_signature(next(names), random_signature(rng))
+        return other.get_signature("paper_0.pdf")
+
+    assert benchmark(add) is not None
+
+
+def test_index_shared_between_workers(tmp_path, paper_text):
+    first = NearDuplicateIndex(path=tmp_path / "index.db")
+    second = NearDuplicateIndex(path=tmp_path / "index.db")
+
+    first.add("original.pdf", paper_text)
+    matches = second.add("revision.pdf", paper_text + "\nCamera-ready revision.")
+    assert [doc_id for doc_id, _ in matches] == ["original.pdf"]
+    assert first.get_signature("revision.pdf") == second.get_signature("revision.pdf")
+
+    second.remove("original.pdf")
+    assert first.get_signature("original.pdf") is None
+    assert NearDuplicateIndex(path=tmp_path / "index.db").get_signature("revision.pdf")
+
+
+def test_index_imports_legacy_json(tmp_path):
+    signature = random_signature(random.Random(1))
+    legacy = {"num_perm": 128, "signatures": {"old.pdf": list(signature)}}
+    (tmp_path / "index.json").write_text(json.dumps(legacy))
+
+    assert (
+        NearDuplicateIndex(path=tmp_path / "index.db").get_signature("old.pdf")
+        == signature
+    )
+    # A importação acontece uma única vez
+    NearDuplicateIndex(path=tmp_path / "index.db").remove("old.pdf")
+    assert (
+        NearDuplicateIndex(path=tmp_path / "index.db").get_signature("old.pdf") is None
+    )
+
+
+def test_near_duplicates_indexed_in_background():
+    pages = paper_pages(5, seed=7100)
+    revised = pages[:-1] + [pages[-1] + "\nCamera-ready revision."]
+    paths = []
+    for name, content in (("bg_original.pdf", pages), ("bg_revision.pdf", revised)):
+        (PDF_DIR / name).write_bytes(make_pdf(content))
+        paths.append(PDF_DIR / name)
+
+    index_pdf(paths[0]).result(timeout=120)
+    matches = index_pdf(paths[1]).result(timeout=120)
+    assert [match["filename"] for match in matches] == ["bg_original.pdf"]
+
+    response = client.get("/pdfs/bg_original.pdf/duplicates")
+    assert response.status_code == 200
+    assert response.json()["status"] == "indexed"
+    assert response.json()["near_duplicates"][0]["filename"] == "bg_revision.pdf"
+    assert client.get("/pdfs/missing.pdf/duplicates").status_code == 404
+
+
+def test_failed_indexing_is_reported():
+    (PDF_DIR / "bg_broken.pdf").write_bytes(b"%PDF-1.4 truncated")
+
+    with pytest.raises(Exception):
+        index_pdf(PDF_DIR / "bg_broken.pdf").result(timeout=120)
+
+    body = client.get("/pdfs/bg_broken.pdf/duplicates").json()
+    assert body["status"] == "failed"
+    assert body["error"]
+
+
+def summarize(pages, name, indexed=False, **data):
+    (PDF_DIR / name).write_bytes(make_pdf(pages))
+    if indexed:
+        index_pdf(PDF_DIR / name).result(timeout=120)
+    response = client.post(f"/summarize/{name}", data={"method": "map_reduce", **data})
+    assert response.status_code == 200, response.text
+    return response.json()["metadata"]
+
+
+def test_summary_reused_only_for_identical_text():
+    pages = paper_pages(5, seed=7000)
+    original = summarize(pages, "reuse_v1.pdf")
+
+    copy = summarize(pages, "reuse_copy.pdf")
+    assert copy["reused_from"] == "reuse_v1.pdf"
+
+    # Nova versão com uma página alterada: só essa página volta ao LLM
+    revised = list(pages)
+    revised[1] += "\nThe revised version adds one more sentence."
+    revision = summarize(revised, "reuse_v2.pdf")
+    assert "reused_from" not in revision
+    assert revision["map_outputs_reused"] == original["chunks_processed"] - 1
+
+    # Mesmo texto, outras opções
+    sections = summarize(pages, "reuse_sections.pdf", sections="methods")
+    assert "reused_from" not in sections
+    assert sections["sections"]["kept"]
+
+
+def test_summary_reused_from_near_duplicate():
+    pages = paper_pages(5, seed=7200)
+    revised = pages[:-1] + [pages[-1] + "\nCamera-ready revision."]
+    summarize(pages, "near_v1.pdf", indexed=True)
+
+    # Outras opções: o resumo do quase duplicado não serve
+    other = summarize(revised, "near_v2.pdf", indexed=True, method="stuff")
+    assert "reused_from" not in other
+
+    reused = summarize(revised, "near_v2.pdf")
+    assert reused["reused_from"] == "near_v1.pdf"
+    assert reused["reuse_similarity"] >= summarizer_module.DEDUP_REUSE_THRESHOLD
+
+    # Com uma página reescrita, a similaridade fica abaixo do limiar
+    rewritten = list(pages)
+    rewritten[1] = paper_pages(5, seed=7300)[1]
+    assert "reused_from" not in summarize(rewritten, "near_v3.pdf", indexed=True)
@@ -0,0 +1,125 @@
+import io
+import shutil
+import zipfile
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import main  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from services import bulk_ingestor  # noqa: E402
+from services.bulk_ingestor import BulkIngestor, summarize_ingested  # noqa: E402
+from synthetic import make_pdf, paper_pages  # noqa: E402
+
+client = TestClient(main.app)
+
+BATCH_SIZE = 8
+
+
+def make_batch(directory, seed):
+    """PDFs distintos de 5 páginas e uma cópia exata do primeiro."""
+    directory.mkdir(parents=True)
+    for i in range(BATCH_SIZE):
+        pdf = make_pdf(paper_pages(5, seed=seed + i))
+        (directory / f"paper_{i}.pdf").write_bytes(pdf)
+    shutil.copy(directory / "paper_0.pdf", directory / "copy_of_paper_0.pdf")
+    return directory
+
+
+@pytest.mark.benchmark(group="bulk_ingest")
+def test_ingest_directory(benchmark, tmp_path):
+    seeds = iter(range(3))
+
+    def new_batch():
+        batch = make_batch(tmp_path / f"batch_{next(seeds)}", seed=5000)
+        return (batch,), {}
+
+    def ingest(directory):
+        # Cada rodada começa com PDFs que ainda não estão armazenados
+        report = BulkIngestor().ingest_directory(directory)
+        for item in report["files"]:
+            if item["status"] == "ingested":
+                Path(item["path"]).unlink()
+        return report
+
+    report = benchmark.pedantic(ingest, setup=new_batch, rounds=3, iterations=1)
+    summary = report["summary"]
+    benchmark.extra_info["files_per_second"] = summary["files_per_second"]
+    assert summary["ingested"] == BATCH_SIZE
+    assert summary["duplicates"] == 1
+
+    by_source = {item["source"]: item for item in report["files"]}
+    duplicate = by_source["copy_of_paper_0.pdf"]
+    original = by_source["paper_0.pdf"]
+    if duplicate["status"] == "ingested":
+        duplicate, original = original, duplicate
+    assert duplicate["duplicate_of"] == original["filename"]
+
+
+def test_ingest_directory_disabled_without_root(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "INGEST_ROOT_DIR", None)
+    response = client.post("/ingest/directory", data={"path": str(tmp_path)})
+    assert response.status_code == 403
+
+
+@pytest.mark.parametrize("path", ["..", "/etc", "inside/../../outside"])
+def test_ingest_directory_outside_root(monkeypatch, tmp_path, path):
+    root = tmp_path / "root"
+    (root / "inside").mkdir(parents=True)
+    monkeypatch.setattr(main, "INGEST_ROOT_DIR", root)
+    response = client.post("/ingest/directory", data={"path": path})
+    assert response.status_code == 403
+
+
+def test_ingest_rejects_unknown_method(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "INGEST_ROOT_DIR", tmp_path)
+    response = client.post(
+        "/ingest/directory", data={"path": ".", "summarize_method": "refine"}
+    )
+    assert response.status_code == 400
+
+
+def test_summarize_ingested_uses_api_defaults(tmp_path):
+    directory = tmp_path / "single"
+    directory.mkdir()
+    (directory / "ingested.pdf").write_bytes(make_pdf(paper_pages(5, seed=6000)))
+    report = BulkIngestor().ingest_directory(directory)
+    (item,) = report["files"]
+
+    summarize_ingested(report, "stuff")
+
+    stored = main.get_summarizer().load_summary(Path(item["filename"]))
+    assert stored["metadata"]["references_removed"] is True
+    assert stored["metadata"]["boilerplate"]["lines_removed"] > 0
+
+
+def test_zip_total_size_limit(monkeypatch):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i in range(4):
+            zf.writestr(f"big_{i}.pdf", b"%PDF-" + b"\0" * 4096)
+    monkeypatch.setattr(bulk_ingestor, "BULK_MAX_TOTAL_BYTES", 10_000)
+
+    response = client.post(
+        "/upload/bulk",
+        files={"file": ("big.zip", archive.getvalue(), "application/zip")},
+    )
+    assert response.status_code == 413
+    assert not list(main.PDF_DIR.glob(".bulk_*"))
+
+
+def test_hash_cache_drops_removed_pdfs(tmp_path):
+    directory = tmp_path / "cached"
+    directory.mkdir()
+    (directory / "cached.pdf").write_bytes(make_pdf(paper_pages(5, seed=6100)))
+    (item,) = BulkIngestor().ingest_directory(directory)["files"]
+    stored = Path(item["path"])
+
+    BulkIngestor().ingest_directory(tmp_path / "cached")
+    assert stored in BulkIngestor._hash_cache
+
+    stored.unlink()
+    BulkIngestor().ingest_directory(tmp_path / "cached")
+    assert stored not in BulkIngestor._hash_cache
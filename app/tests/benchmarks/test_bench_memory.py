@@ -0,0 +1,70 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from services.map_cache import MapCache  # noqa: E402
+from services.pdf_processor import PDFProcessor  # noqa: E402
+from services.summarizer import Summarizer  # noqa: E402
+from synthetic import make_pdf, paper_pages  # noqa: E402
+from utils.metrics import Instrumentation  # noqa: E402
+
+LARGE_PDF_PAGES = 200
+
+OPTIONS = {
+    "method": "map_reduce",
+    "remove_references": True,
+    "strip_boilerplate": True,
+}
+
+
+@pytest.fixture(scope="module")
+def pdf_factory(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("large")
+
+    def make(pages):
+        path = directory / f"large_{pages}p.pdf"
+        if not path.exists():
+            path.write_bytes(make_pdf(paper_pages(pages, seed=pages)))
+        return path
+
+    return make
+
+
+def summarize_profiled(pdf_path, cache_dir, low_memory):
+    """Resumo com cache de map vazio; retorna o resultado e o pico em MB."""
+    cache_dir.mkdir()
+    summarizer = Summarizer(map_cache=MapCache(cache_dir))
+    with Instrumentation.profile("benchmark", memory=True) as profile:
+        if low_memory:
+            result = summarizer.summarize_low_memory(pdf_path, OPTIONS)
+        else:
+            chunks = PDFProcessor.extract_text(pdf_path)
+            result = summarizer.summarize(pdf_path, chunks, OPTIONS)
+    return result, profile.report()["peak_mb"]
+
+
+@pytest.mark.benchmark(group="low_memory")
+def test_low_memory_peak(benchmark, pdf_factory, tmp_path):
+    """Pico de memória do map_reduce com e sem o modo de memória limitada."""
+    # Os imports do primeiro uso não devem entrar nos picos medidos
+    for low_memory in (False, True):
+        warmup_dir = tmp_path / f"warmup_{low_memory}"
+        summarize_profiled(pdf_factory(5), warmup_dir, low_memory)
+
+    pdf_path = pdf_factory(LARGE_PDF_PAGES)
+    expected, in_memory_peak = summarize_profiled(
+        pdf_path, tmp_path / "in_memory", low_memory=False
+    )
+    result, peak = benchmark.pedantic(
+        summarize_profiled,
+        args=(pdf_path, tmp_path / "low_memory", True),
+        rounds=1,
+        iterations=1,
+    )
+    benchmark.extra_info.update(peak_mb=peak, in_memory_peak_mb=in_memory_peak)
+
+    metadata = result["metadata"]
+    assert metadata["low_memory"]
+    assert metadata["chunks_processed"] == expected["metadata"]["chunks_processed"]
+    assert metadata["boilerplate"] == expected["metadata"]["boilerplate"]
+    assert peak < in_memory_peak / 2
@@ -0,0 +1,76 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from services.pdf_processor import PDFProcessor  # noqa: E402
+
+
+@pytest.mark.benchmark(group="extract_text")
+def test_extract_text(benchmark, paper_pdf):
+    documents = benchmark(PDFProcessor.extract_text, paper_pdf)
+    benchmark.extra_info["pages"] = len(documents)
+    assert documents
+
+
+@pytest.mark.benchmark(group="remove_references")
+def test_remove_references(benchmark, fresh_documents):
+    documents, removed = benchmark.pedantic(
+        PDFProcessor.remove_references,
+        setup=lambda: ((fresh_documents(),), {}),
+        rounds=20,
+    )
+    benchmark.extra_info["pages_kept"] = len(documents)
+    assert removed
+
+
+@pytest.mark.benchmark(group="strip_boilerplate")
+def test_strip_boilerplate(benchmark, fresh_documents):
+    documents, report = benchmark.pedantic(
+        PDFProcessor.strip_boilerplate,
+        setup=lambda: ((fresh_documents(),), {}),
+        rounds=20,
+    )
+    benchmark.extra_info["tokens_saved"] = report["tokens_saved"]
+    assert report["lines_removed"] >= len(documents)
+
+
+@pytest.mark.benchmark(group="section_parsing")
+def test_select_sections(benchmark, paper_documents):
+    from services.section_parser import SectionParser
+
+    selected, report = benchmark(SectionParser.select, paper_documents)
+    benchmark.extra_info["tokens_before"] = report["tokens_before"]
+    benchmark.extra_info["tokens_after"] = report["tokens_after"]
+    assert "references" not in report["kept"]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "as shown in prior\ncitations.\nMore text",
+        "we evaluate our\napproach.\nNext we",
+        "we evaluate our\napproach\nin three settings",
+        "the remaining\nexperiments\nuse the same data",
+        "as listed in the\nreferences.\nMore text",
+    ],
+)
+def test_wrapped_prose_is_not_a_heading(text):
+    from services.section_parser import HEADING_PATTERN
+
+    assert HEADING_PATTERN.search(text) is None
+
+
+@pytest.mark.parametrize(
+    "text, section",
+    [
+        ("Some text.\nReferences\n[1] A. Author", "references"),
+        ("3 Approach\nWe propose", "methods"),
+        ("IV. Evaluation.\nWe measure", "results"),
+        ("Intro ends here.\nApproach\nWe propose", "methods"),
+        ("Journal (2024)\n\nBackground:\nPrior work", "related_work"),
+    ],
+)
+def test_heading_detected(text, section):
+    from services.section_parser import HEADING_PATTERN
+
+    assert HEADING_PATTERN.search(text).lastgroup == section
@@ -0,0 +1,88 @@
+import os
+import time
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from services.retention import RetentionService  # noqa: E402
+
+MANAGED_FILES = 5000
+
+
+@pytest.fixture(scope="module")
+def retention_service(tmp_path_factory):
+    """Diretório com milhares de arquivos de idades variadas."""
+    root = tmp_path_factory.mktemp("retention")
+    now = time.time()
+    for i in range(MANAGED_FILES):
+        path = root / f"{i % 16:x}" / f"{i}.txt"
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(b"x" * 1024)
+        age = (i % 30) * 86400
+        os.utime(path, (now - age, now - age))
+
+    return RetentionService(
+        directories={"map_cache": (root, (".txt",))},
+        max_age_days=7,
+        max_total_bytes=MANAGED_FILES * 512,
+        keep_referenced=False,
+    )
+
+
+@pytest.mark.benchmark(group="retention")
+def test_retention_dry_run(benchmark, retention_service):
+    report = benchmark(retention_service.run_once, dry_run=True)
+    benchmark.extra_info["scanned_files"] = report["scanned_files"]
+    assert report["scanned_files"] == MANAGED_FILES
+    assert report["deleted_files"] == retention_service.batch_size
+
+
+def test_variant_directory_removed_as_unit(tmp_path):
+    """Playlist HLS e segmentos de um podcast saem juntos, nunca em parte."""
+    old = time.time() - 10 * 86400
+    unit = tmp_path / "podcast_1"
+    (unit / "hls").mkdir(parents=True)
+    for name in ("mono.mp3", "hls/index.m3u8", "hls/seg_000.ts", "hls/seg_001.ts"):
+        (unit / name).write_bytes(b"x" * 1024)
+        os.utime(unit / name, (old, old))
+
+    service = RetentionService(
+        directories={"podcast_variants": (tmp_path, (".mp3", ".m3u8", ".ts"))},
+        max_total_bytes=1,
+        keep_referenced=False,
+    )
+    report = service.run_once()
+
+    assert [item["file"] for item in report["deleted"]] == ["podcast_1"]
+    assert report["freed_bytes"] == 4 * 1024
+    assert not unit.exists()
+
+
+def test_referenced_files_expire(tmp_path):
+    from services.result_store import ResultStore
+
+    store = ResultStore(tmp_path / "results.db")
+    for audio, created_at in (
+        ("paper_v1.mp3", "2024-01-01 00:00:00"),
+        ("paper_v2.mp3", "2024-03-01 00:00:00"),
+    ):
+        store.save_podcast(
+            {"audio_path": audio, "metadata": {"timestamp": created_at}}, "paper.pdf"
+        )
+    store.save_summary(
+        {
+            "summary": "...",
+            "metadata": {"source_file": "paper.pdf", "timestamp": "2024-03-01"},
+        }
+    )
+
+    # Só o podcast mais recente de cada PDF é preservado
+    referenced = store.referenced_files()
+    assert referenced["podcasts"] == {"paper_v2.mp3"}
+    assert referenced["podcast_variants"] == {"paper_v2"}
+    assert referenced["pdfs"] == {"paper.pdf"}
+
+    # Registros anteriores ao prazo deixam de proteger os arquivos
+    expired = store.referenced_files(since="2024-06-01 00:00:00")
+    assert expired == {"pdfs": set(), "podcasts": set(), "podcast_variants": set()}
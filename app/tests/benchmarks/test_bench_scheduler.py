@@ -0,0 +1,123 @@
+import itertools
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import main  # noqa: E402
+from config import PDF_DIR  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from services.scheduler import ANONYMOUS_TENANT, FairScheduler, tenant_id  # noqa: E402
+from synthetic import make_pdf, paper_pages  # noqa: E402
+
+TENANTS = [f"tenant-{i}" for i in range(50)]
+
+
+@pytest.mark.parametrize("priority", ["interactive", "batch"])
+@pytest.mark.benchmark(group="scheduler")
+def test_scheduler_slot(benchmark, priority):
+    scheduler = FairScheduler(capacity=8, interactive_reserved=2)
+    tenants = itertools.cycle(TENANTS)
+
+    def acquire_and_release():
+        with scheduler.slot(next(tenants), priority, 8000) as ticket:
+            ticket.actual_cost = 6000
+
+    benchmark(acquire_and_release)
+    status = scheduler.status()
+    assert sum(status["running"].values()) == 0
+    assert sum(status["queued"].values()) == 0
+
+
+def run_queued(scheduler, jobs):
+    """
+    Enfileira os trabalhos (chave, prioridade, custo) com a única vaga
+    ocupada, libera a vaga e retorna a ordem em que foram atendidos.
+    """
+    order, threads = [], []
+    holder = scheduler.acquire(ANONYMOUS_TENANT, "interactive", 0)
+
+    def run(job):
+        key, priority, cost = job
+        with scheduler.slot(tenant_id(key), priority, cost):
+            order.append(job)
+
+    for job in jobs:
+        threads.append(threading.Thread(target=run, args=(job,)))
+        threads[-1].start()
+        # Espera o trabalho entrar na fila, preservando a ordem de chegada
+        while sum(scheduler.status()["queued"].values()) < len(threads):
+            time.sleep(0.001)
+
+    scheduler.release(holder)
+    for thread in threads:
+        thread.join()
+    return order
+
+
+def test_interactive_before_batch():
+    scheduler = FairScheduler(capacity=1, interactive_reserved=0, api_keys=["a"])
+    jobs = [("a", "batch", 100)] * 3 + [("a", "interactive", 100)] * 3
+    order = run_queued(scheduler, jobs)
+    assert [priority for _, priority, _ in order] == ["interactive"] * 3 + ["batch"] * 3
+
+
+def test_weights_split_capacity():
+    scheduler = FairScheduler(
+        capacity=1, interactive_reserved=0, tenant_weights={"a": 3, "b": 1}
+    )
+    jobs = [(key, "interactive", 100) for key in ("a", "b") for _ in range(20)]
+    order = run_queued(scheduler, jobs)
+    # Enquanto os dois têm trabalhos na fila, "a" recebe 3 vagas para cada 1
+    first = [key for key, _, _ in order[:16]]
+    assert first.count("a") == 12
+
+
+def test_exhausted_quota_delays_dispatch():
+    # 6000 tokens por minuto: 100 por segundo
+    scheduler = FairScheduler(capacity=4, tenant_tokens_per_minute={"a": 6000})
+    with scheduler.slot(tenant_id("a"), "interactive", 6000):
+        pass
+
+    with scheduler.slot(tenant_id("a"), "interactive", 50) as ticket:
+        pass
+    assert ticket.wait_seconds >= 0.4
+
+
+def test_unknown_keys_share_anonymous_tenant():
+    scheduler = FairScheduler(api_keys=["a"])
+    with scheduler.slot(tenant_id("random-1"), "interactive", 100):
+        with scheduler.slot(tenant_id("random-2"), "interactive", 100):
+            with scheduler.slot(tenant_id("a"), "interactive", 100):
+                tenants = scheduler.status()["tenants"]
+    assert set(tenants) == {ANONYMOUS_TENANT, tenant_id("a")}
+    assert tenants[ANONYMOUS_TENANT]["running"] == 2
+    # Clientes ociosos são descartados
+    assert scheduler.status()["tenants"] == {}
+
+
+@pytest.mark.parametrize("mode", ["monologue", "dialogue"])
+def test_podcast_settles_actual_cost(monkeypatch, mode):
+    client = TestClient(main.app)
+    name = f"podcast_cost_{mode}.pdf"
+    (PDF_DIR / name).write_bytes(make_pdf(paper_pages(5, seed=8000)))
+    assert client.post(f"/summarize/{name}").status_code == 200
+
+    scheduler = FairScheduler()
+    released = []
+    release = scheduler.release
+    monkeypatch.setattr(
+        scheduler, "release", lambda ticket: (released.append(ticket), release(ticket))
+    )
+    monkeypatch.setattr(main, "get_scheduler", lambda: scheduler)
+
+    response = client.post(f"/podcast/{name}", data={"mode": mode})
+    assert response.status_code == 200, response.text
+
+    metadata = response.json()["metadata"]
+    (ticket,) = released
+    llm_tokens = (metadata.get("token_usage") or {}).get("total_tokens", 0)
+    assert metadata["tts_chars"] > 0
+    assert ticket.actual_cost == llm_tokens + (metadata["tts_chars"] + 3) // 4
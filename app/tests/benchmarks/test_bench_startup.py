@@ -0,0 +1,49 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+APP_DIR = Path(__file__).resolve().parents[2]
+
+# Orçamento de tempo para `import main` em um processo novo
+IMPORT_TIME_BUDGET_SECONDS = float(os.getenv("IMPORT_TIME_BUDGET_SECONDS", 1.0))
+
+# Módulos pesados que só devem ser carregados no primeiro uso
+DEFERRED_MODULES = ["langchain", "langchain_openai", "openai", "pypdf", "pytesseract"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (DEFERRED_MODULES,)
+
+
+def _measure_import() -> dict:
+    env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+    env["LLM_BACKEND"] = "openai"
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=APP_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+@pytest.mark.benchmark(group="startup")
+def test_import_main_cold(benchmark):
+    result = benchmark.pedantic(_measure_import, rounds=3, iterations=1)
+    benchmark.extra_info["import_seconds"] = round(result["elapsed"], 3)
+
+    # Importar a aplicação não deve exigir chave de API nem carregar o LLM
+    assert result["loaded"] == []
+    assert result["elapsed"] < IMPORT_TIME_BUDGET_SECONDS
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from main import app  # noqa: E402
+from services.result_store import ResultStore, get_result_store  # noqa: E402
+
+STORED_SUMMARIES = 5000
+
+
+@pytest.fixture(scope="module")
+def result_store(tmp_path_factory):
+    """Banco com milhares de resumos de vários PDFs e modelos."""
+    store = ResultStore(tmp_path_factory.mktemp("store") / "results.db")
+    summary = "Resumo do artigo. " * 200
+    for i in range(STORED_SUMMARIES):
+        store.save_summary(
+            {
+                "summary": summary,
+                "metadata": {
+                    "source_file": f"paper_{i % 1000}.pdf",
+                    "model_used": ("gpt-4o-mini", "fake-llm")[i % 2],
+                    "timestamp": f"2025-{1 + i % 12:02d}-01 10:00:{i % 60:02d}",
+                    "token_usage": {"total_tokens": 1000},
+                },
+            }
+        )
+    return store
+
+
+@pytest.mark.benchmark(group="result_store")
+def test_get_latest_summary(benchmark, result_store):
+    summary = benchmark(result_store.get_summary, "paper_500.pdf")
+    assert summary["metadata"]["source_file"] == "paper_500.pdf"
+
+
+@pytest.mark.benchmark(group="result_store")
+def test_list_summaries_by_model_and_date(benchmark, result_store):
+    rows = benchmark(
+        result_store.list_summaries, model="fake-llm", since="2025-06-01", limit=100
+    )
+    assert len(rows) == 100
+
+
+def test_import_json_skips_imported_files(tmp_path):
+    store = ResultStore(tmp_path / "results.db")
+    summary_file = tmp_path / "paper_summary.json"
+    metadata = {"timestamp": "2025-01-01 10:00:00"}
+    summary_file.write_text(json.dumps({"summary": "Resumo", "metadata": metadata}))
+    podcast_file = tmp_path / "podcast.json"
+    podcast_file.write_text(json.dumps({"metadata": metadata}))
+
+    first = store.import_json([summary_file], [podcast_file])
+    second = store.import_json([summary_file], [podcast_file])
+
+    assert (first["summaries"], first["podcasts"], first["skipped"]) == (1, 1, 0)
+    assert (second["summaries"], second["podcasts"], second["skipped"]) == (0, 0, 2)
+    assert len(store.history("paper.pdf")["summaries"]) == 1
+    assert len(store.list_podcasts()) == 1
+
+
+@pytest.mark.parametrize("limit", [-1, 0])
+def test_list_limit_is_clamped(limit):
+    for i in range(2):
+        get_result_store().save_summary(
+            {
+                "summary": "Resumo",
+                "metadata": {
+                    "source_file": f"limit_{i}.pdf",
+                    "timestamp": "2025-01-01 10:00:00",
+                },
+            }
+        )
+    client = TestClient(app)
+    params = {"limit": limit, "offset": -5}
+    assert len(client.get("/summaries", params=params).json()["summaries"]) == 1
+    assert len(client.get("/podcasts", params=params).json()["podcasts"]) <= 1
@@ -0,0 +1,118 @@
+import itertools
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from config import MAP_CACHE_DIR  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from main import app  # noqa: E402
+from utils.single_flight import SingleFlight  # noqa: E402
+
+client = TestClient(app)
+
+CONCURRENT_REQUESTS = 6
+
+
+def clear_map_cache():
+    """Garante que cada rodada meça o map_reduce completo."""
+    shutil.rmtree(MAP_CACHE_DIR, ignore_errors=True)
+    MAP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+
+@pytest.mark.parametrize("method", ["stuff", "map_reduce"])
+@pytest.mark.benchmark(group="summarize_endpoint")
+def test_summarize_endpoint(benchmark, paper_pdf, method):
+    def summarize():
+        return client.post(
+            f"/summarize/{paper_pdf.name}",
+            data={"method": method, "remove_references": "true"},
+        )
+
+    response = benchmark.pedantic(
+        summarize, setup=clear_map_cache, rounds=3, iterations=1
+    )
+    assert response.status_code == 200, response.text
+    benchmark.extra_info["chunks"] = response.json()["metadata"]["chunks_processed"]
+
+
+@pytest.mark.benchmark(group="map_reduce_revision")
+def test_map_reduce_revision(benchmark, paper_pdf, fresh_documents):
+    """Nova versão do artigo com uma única página alterada."""
+    from services.summarizer import get_summarizer
+
+    summarizer = get_summarizer()
+    summarizer.map_reduce(paper_pdf, chunks=fresh_documents())
+    revision = itertools.count()
+
+    def revised_documents():
+        documents = fresh_documents()
+        documents[0].page_content += f"\nRevision {next(revision)}."
+        return (paper_pdf,), {"chunks": documents}
+
+    result = benchmark.pedantic(
+        summarizer.map_reduce, setup=revised_documents, rounds=3, iterations=1
+    )
+    benchmark.extra_info["chunks"] = result["metadata"]["chunks_processed"]
+    assert result["metadata"]["map_outputs_reused"] == len(fresh_documents()) - 1
+
+
+def test_single_flight_results_are_independent():
+    """Cada chamada pode alterar o próprio resultado sem afetar as demais."""
+    flight = SingleFlight("test")
+    calls = []
+
+    def run():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"metadata": {"callers": []}}
+
+    def call(caller):
+        result, _ = flight.do("key", run)
+        result["metadata"]["callers"].append(caller)
+        return result
+
+    with ThreadPoolExecutor(CONCURRENT_REQUESTS) as executor:
+        results = list(executor.map(call, range(CONCURRENT_REQUESTS)))
+
+    assert len(calls) == 1
+    assert [r["metadata"]["callers"] for r in results] == [
+        [caller] for caller in range(CONCURRENT_REQUESTS)
+    ]
+
+
+def test_concurrent_requests_coalesce(monkeypatch, paper_pdf):
+    """Pedidos idênticos simultâneos geram uma única sumarização."""
+    import main
+
+    calls = []
+    lock = threading.Lock()
+    run_summarization = main.run_summarization
+
+    def slow_run(pdf_path, options):
+        with lock:
+            calls.append(pdf_path.name)
+        time.sleep(0.3)
+        return run_summarization(pdf_path, options)
+
+    monkeypatch.setattr(main, "run_summarization", slow_run)
+
+    def summarize(_):
+        return client.post(
+            f"/summarize/{paper_pdf.name}",
+            data={"method": "stuff", "reuse_duplicates": "false"},
+        )
+
+    with ThreadPoolExecutor(CONCURRENT_REQUESTS) as executor:
+        responses = list(executor.map(summarize, range(CONCURRENT_REQUESTS)))
+
+    assert all(r.status_code == 200 for r in responses), responses[0].text
+    assert calls == [paper_pdf.name]
+    results = [r.json() for r in responses]
+    assert len({r["summary"] for r in results}) == 1
+    coalesced = [r["metadata"].get("coalesced", False) for r in results]
+    assert coalesced.count(False) == 1
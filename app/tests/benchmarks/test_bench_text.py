@@ -0,0 +1,48 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from utils.text_processor import TextProcessor  # noqa: E402
+
+
+@pytest.mark.benchmark(group="split_into_chunks")
+def test_split_into_chunks(benchmark, paper_text):
+    chunks = benchmark(TextProcessor.split_into_chunks, paper_text)
+    benchmark.extra_info["chars"] = len(paper_text)
+    benchmark.extra_info["chunks"] = len(chunks)
+    assert chunks
+
+
+@pytest.mark.benchmark(group="format_for_tts")
+def test_format_for_tts(benchmark, paper_text):
+    formatted = benchmark(TextProcessor.format_for_tts, paper_text)
+    benchmark.extra_info["chars"] = len(paper_text)
+    assert formatted
+
+
+@pytest.mark.benchmark(group="extract_keywords")
+def test_extract_keywords(benchmark, paper_text):
+    keywords = benchmark(TextProcessor.extract_keywords, paper_text)
+    benchmark.extra_info["chars"] = len(paper_text)
+    assert keywords
+
+
+@pytest.mark.parametrize(
+    "line, speaker",
+    [
+        ("A: Welcome to the show.", "A"),
+        ("**B:** Thanks for having me.", "B"),
+        ("- A - Today we discuss immunology.", "A"),
+        ("B — Let us begin.", "B"),
+        ("B-cells produce antibodies.", None),
+        ("A-priori estimates were used.", None),
+    ],
+)
+def test_parse_dialogue_labels(line, speaker):
+    script = f"A: Intro.\nB: Reply.\n{line}"
+    turns = TextProcessor.parse_dialogue(script)
+    if speaker is None:
+        # Sem rótulo, a linha continua a fala anterior
+        assert turns[-1] == ("B", f"Reply. {line}")
+    else:
+        assert turns[-1][0] == speaker
@@ -0,0 +1,121 @@
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from config import SEGMENT_CACHE_DIR  # noqa: E402
+from services.backends import ElevenLabsBackend  # noqa: E402
+from services.fake_backends import SILENT_MP3_FRAME, FakeTTSBackend  # noqa: E402
+from services.podcast_generator import PodcastGenerator  # noqa: E402
+
+
+class _StubTTSHandler(BaseHTTPRequestHandler):
+    """Imita o endpoint de streaming de TTS da ElevenLabs."""
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        audio = SILENT_MP3_FRAME * max(1, len(body) // 20)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Content-Length", str(len(audio)))
+        self.end_headers()
+        self.wfile.write(audio)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def stub_tts_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubTTSHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/v1"
+    server.shutdown()
+
+
+@pytest.mark.benchmark(group="tts")
+def test_generate_podcast_stub_server(benchmark, stub_tts_url, paper_text):
+    backend = ElevenLabsBackend(api_key="benchmark", base_url=stub_tts_url)
+    generator = PodcastGenerator(backend=backend)
+    text = paper_text[:5000]
+
+    result = benchmark.pedantic(
+        generator.generate_podcast, args=(text,), rounds=5, iterations=1
+    )
+    assert "error" not in result, result
+    benchmark.extra_info["chars"] = len(text)
+
+
+def clear_segment_cache():
+    """Garante que cada rodada sintetize todas as falas."""
+    shutil.rmtree(SEGMENT_CACHE_DIR, ignore_errors=True)
+    SEGMENT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+@pytest.mark.benchmark(group="tts_dialogue")
+def test_generate_dialogue(benchmark, paper_text, concurrency):
+    """Diálogo com TTS de latência fixa: o paralelismo divide o tempo total."""
+    backend = FakeTTSBackend(latency_ms=20, latency_distribution="constant")
+    generator = PodcastGenerator(backend=backend, concurrency=concurrency)
+    text = paper_text[:3000]
+
+    result = benchmark.pedantic(
+        generator.generate_dialogue,
+        args=(text,),
+        setup=clear_segment_cache,
+        rounds=3,
+        iterations=1,
+    )
+    assert "error" not in result, result
+    benchmark.extra_info["turns"] = result["metadata"]["turns"]
+
+
+@pytest.mark.parametrize("mode", ["monologue", "dialogue"])
+def test_same_text_from_different_pdfs_not_coalesced(mode):
+    """Cada PDF recebe o próprio podcast, mesmo com resumos idênticos."""
+    from services.result_store import get_result_store
+
+    backend = FakeTTSBackend(latency_ms=200, latency_distribution="constant")
+    generator = PodcastGenerator(backend=backend)
+    barrier = threading.Barrier(2)
+    results = {}
+
+    def generate(source_file):
+        barrier.wait()
+        if mode == "dialogue":
+            result = generator.generate_dialogue(
+                "Resumo idêntico.", source_file=source_file
+            )
+        else:
+            result = generator.generate_podcast(
+                "Resumo idêntico.", "voice", source_file
+            )
+        results[source_file] = result
+
+    names = (f"twin_{mode}_a.pdf", f"twin_{mode}_b.pdf")
+    threads = [threading.Thread(target=generate, args=(name,)) for name in names]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results[names[0]]["audio_path"] != results[names[1]]["audio_path"]
+    for name, result in results.items():
+        (podcast,) = get_result_store().list_podcasts(source_file=name)
+        assert podcast["audio_file"] == Path(result["audio_path"]).name
+
+
+def test_fake_backend_attempts_are_bounded():
+    backend = FakeTTSBackend(latency_ms=0, latency_distribution="constant")
+    backend._source.max_keys = 100
+    for i in range(1000):
+        backend.synthesize(f"Fala {i}.", "voice")
+    assert len(backend._source._attempts) == 100
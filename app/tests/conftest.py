@@ -0,0 +1,22 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Os módulos da aplicação usam imports relativos ao diretório `app`
+APP_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_DIR))
+
+# Diretórios isolados e backends falsos (sem rede) devem ser configurados
+# antes do primeiro import de `config`
+_DATA_DIR = Path(tempfile.mkdtemp(prefix="p2p-tests-"))
+os.environ.setdefault("PDF_DIR", str(_DATA_DIR / "pdfs"))
+os.environ.setdefault("OUTPUT_DIR", str(_DATA_DIR / "output"))
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("TTS_BACKEND", "fake")
+os.environ.setdefault("FAKE_LLM_LATENCY_MS", "0")
+os.environ.setdefault("FAKE_LLM_LATENCY_DISTRIBUTION", "constant")
+os.environ.setdefault("FAKE_TTS_LATENCY_MS", "0")
+os.environ.setdefault("FAKE_TTS_LATENCY_DISTRIBUTION", "constant")
+# O pós-processamento do áudio é medido à parte, em test_bench_audio.py
+os.environ.setdefault("AUDIO_POSTPROCESS_ENABLED", "false")
@@ -0,0 +1,169 @@
+import math
+import mmap
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+# Quadro MPEG-1 Layer III silencioso (32 kbps, 44.1 kHz, mono, ~26 ms de áudio)
+SILENT_MP3_FRAME = b"\xff\xfb\x10\xc4" + b"\x00" * 100
+MP3_FRAME_SECONDS = 1152 / 44100
+
+# Tabelas do cabeçalho MPEG Layer III
+_BITRATES_KBPS = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_BITRATES_KBPS_V2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+_SAMPLE_RATES = (44100, 48000, 32000)
+# Divisor da taxa de amostragem por versão: MPEG-1 (11), MPEG-2 (10), 2.5 (00)
+_SAMPLE_RATE_DIVISORS = {3: 1, 2: 2, 0: 4}
+
+
+def _tag_bounds(data: bytes) -> Tuple[int, int]:
+    """
+    Início e fim do áudio de um MP3, descontadas as tags ID3v2 (início) e
+    ID3v1 (fim). Não copia os dados, então também serve para um `mmap`.
+    """
+    start, end = 0, len(data)
+    if data[:3] == b"ID3" and end >= 10:
+        # Tamanho "syncsafe": 7 bits úteis por byte
+        size = 0
+        for byte in data[6:10]:
+            size = (size << 7) | (byte & 0x7F)
+        footer = 10 if data[5] & 0x10 else 0
+        start = min(end, 10 + size + footer)
+    if end - start >= 128 and data[end - 128 : end - 125] == b"TAG":
+        end -= 128
+    return start, end
+
+
+def strip_tags(data: bytes) -> bytes:
+    """Remove as tags ID3v2 (início) e ID3v1 (fim) de um MP3."""
+    start, end = _tag_bounds(data)
+    return data[start:end]
+
+
+def _first_frame(data: bytes) -> Optional[bytes]:
+    """Cabeçalho do primeiro quadro MPEG-1 Layer III do áudio, se houver."""
+    start = 0
+    while True:
+        index = data.find(b"\xff", start)
+        if index < 0 or index + 4 > len(data):
+            return None
+        header = data[index : index + 4]
+        # Sincronismo, MPEG-1 (versão 11) e Layer III (camada 01)
+        if header[1] & 0xFE == 0xFA:
+            bitrate = header[2] >> 4
+            sample_rate = (header[2] >> 2) & 0x03
+            if 0 < bitrate < 15 and sample_rate < 3:
+                return header
+        start = index + 1
+
+
+def silent_frame(template: Optional[bytes] = None) -> bytes:
+    """
+    Quadro silencioso com a mesma taxa de bits, amostragem e canais do
+    primeiro quadro de `template`, para que as pausas entre trechos não
+    mudem o formato do fluxo. Sem modelo válido, usa SILENT_MP3_FRAME.
+    """
+    header = _first_frame(template) if template else None
+    if header is None:
+        return SILENT_MP3_FRAME
+
+    bitrate = _BITRATES_KBPS[header[2] >> 4] * 1000
+    sample_rate = _SAMPLE_RATES[(header[2] >> 2) & 0x03]
+    # Sem CRC e sem byte de preenchimento; side info zerada decodifica silêncio
+    header = bytes((0xFF, header[1] | 0x01, header[2] & 0xFD, header[3]))
+    length = 144 * bitrate // sample_rate
+    return header + b"\x00" * (length - 4)
+
+
+def frame_seconds(frame: bytes) -> float:
+    """Duração de um quadro MPEG-1 Layer III (1152 amostras)."""
+    header = _first_frame(frame)
+    if header is None:
+        return MP3_FRAME_SECONDS
+    return 1152 / _SAMPLE_RATES[(header[2] >> 2) & 0x03]
+
+
+def silence(milliseconds: float, template: Optional[bytes] = None) -> bytes:
+    """Silêncio em MP3 com pelo menos a duração informada."""
+    if milliseconds <= 0:
+        return b""
+    frame = silent_frame(template)
+    return frame * math.ceil(milliseconds / 1000 / frame_seconds(frame))
+
+
+def iter_concat_mp3(segments: Iterable[bytes], pause_ms: float = 0) -> Iterator[bytes]:
+    """
+    Versão incremental de `concat_mp3`: consome um trecho por vez, de modo
+    que o áudio completo nunca precisa estar em memória.
+    """
+    pause = None
+    for segment in segments:
+        part = strip_tags(segment)
+        if not part:
+            continue
+        if pause is None:
+            pause = silence(pause_ms, part)
+        else:
+            yield pause
+        yield part
+
+
+def concat_mp3(segments: Iterable[bytes], pause_ms: float = 0) -> bytes:
+    """
+    Une trechos MP3 na ordem informada, separados por pausas silenciosas.
+    Quadros MP3 são independentes, então basta remover as tags de cada trecho.
+    """
+    return b"".join(iter_concat_mp3(segments, pause_ms))
+
+
+def _frame_info(header: bytes) -> Optional[tuple]:
+    """(tamanho em bytes, duração em segundos) de um quadro Layer III."""
+    if header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = (header[1] >> 3) & 0x03
+    layer = (header[1] >> 1) & 0x03
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x03
+    if version not in _SAMPLE_RATE_DIVISORS or layer != 1:
+        return None
+    if not 0 < bitrate_index < 15 or rate_index == 3:
+        return None
+
+    sample_rate = _SAMPLE_RATES[rate_index] // _SAMPLE_RATE_DIVISORS[version]
+    padding = (header[2] >> 1) & 0x01
+    if version == 3:
+        bitrate = _BITRATES_KBPS[bitrate_index] * 1000
+        return 144 * bitrate // sample_rate + padding, 1152 / sample_rate
+    bitrate = _BITRATES_KBPS_V2[bitrate_index] * 1000
+    return 72 * bitrate // sample_rate + padding, 576 / sample_rate
+
+
+def mp3_duration(data: bytes) -> float:
+    """
+    Duração de um MP3 em segundos, somando a duração de cada quadro (vale
+    também para taxa de bits variável). Bytes que não formam um quadro
+    válido são ignorados.
+    """
+    position, end = _tag_bounds(data)
+    end -= 4
+    total = 0.0
+    while position <= end:
+        info = _frame_info(data[position : position + 4])
+        if info is None:
+            position = data.find(b"\xff", position + 1)
+            if position < 0:
+                break
+            continue
+        length, seconds = info
+        total += seconds
+        position += length
+    return round(total, 3)
+
+
+def mp3_file_duration(path: Union[str, Path]) -> float:
+    """Duração de um arquivo MP3, lido por `mmap` em vez de carregado."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0.0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return mp3_duration(data)
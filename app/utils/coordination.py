@@ -0,0 +1,367 @@
+import fcntl
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Tuple, Union
+
+from config import (
+    COORDINATION_BACKEND,
+    COORDINATION_CLAIM_TTL_SECONDS,
+    COORDINATION_DB_PATH,
+    COORDINATION_POLL_SECONDS,
+    COORDINATION_REDIS_URL,
+    COORDINATION_RESULT_TTL_SECONDS,
+)
+
+# Identifica o processo dono de uma tarefa (vários workers e contêineres)
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class FileLock:
+    """
+    Lock entre processos baseado em `flock` sobre um arquivo no volume
+    compartilhado. Também serializa as threads do mesmo processo.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._thread_lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self, blocking: bool = True) -> Iterator[bool]:
+        """
+        Adquire o lock durante o bloco `with`.
+
+        Args:
+            blocking: Se False, não espera; o bloco recebe False se o lock
+                estiver com outro processo
+
+        Yields:
+            True se o lock foi adquirido
+        """
+        if not self._thread_lock.acquire(blocking):
+            yield False
+            return
+        try:
+            with open(self.path, "a") as f:
+                flags = fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB)
+                try:
+                    fcntl.flock(f.fileno(), flags)
+                except BlockingIOError:
+                    yield False
+                    return
+                try:
+                    yield True
+                finally:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._thread_lock.release()
+
+
+class Coordinator:
+    """
+    Coordena tarefas entre workers: apenas quem reivindica uma chave a
+    executa; os demais aguardam e recebem o resultado publicado por ele.
+    As subclasses implementam o armazenamento das reivindicações e resultados.
+    """
+
+    name = "base"
+
+    def run_once(
+        self,
+        key: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        claim_ttl: float = COORDINATION_CLAIM_TTL_SECONDS,
+        **kwargs: Any,
+    ) -> Tuple[Any, bool]:
+        """
+        Executa `fn` uma única vez por chave entre todos os workers.
+        O resultado precisa ser serializável em JSON.
+
+        Args:
+            key: Chave que identifica execuções equivalentes
+            fn: Função a executar
+            claim_ttl: Prazo da reivindicação, renovado enquanto `fn` executa;
+                se o dono morrer, outro worker assume a tarefa depois dele
+
+        Returns:
+            Tupla (resultado, compartilhado)
+        """
+        key = hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+        while True:
+            token, holder = self.claim(key, claim_ttl)
+            if token is not None:
+                try:
+                    with self._heartbeat(key, token, claim_ttl):
+                        result = fn(*args, **kwargs)
+                    self.publish(
+                        key,
+                        token,
+                        json.dumps(result, ensure_ascii=False),
+                        COORDINATION_RESULT_TTL_SECONDS,
+                    )
+                    return result, False
+                finally:
+                    self.release(key, token)
+
+            # Aguarda o resultado da execução em andamento em outro worker
+            while holder is not None:
+                value = self.fetch(key, holder)
+                if value is not None:
+                    return json.loads(value), True
+                if self.current_claim(key) != holder:
+                    # O dono terminou sem publicar (erro) ou expirou
+                    value = self.fetch(key, holder)
+                    if value is not None:
+                        return json.loads(value), True
+                    break
+                time.sleep(COORDINATION_POLL_SECONDS)
+
+    @contextmanager
+    def _heartbeat(self, key: str, token: str, ttl: float) -> Iterator[None]:
+        """Renova a reivindicação a cada terço do prazo durante o bloco."""
+        stop = threading.Event()
+
+        def renew() -> None:
+            while not stop.wait(ttl / 3):
+                try:
+                    if not self.renew(key, token, ttl):
+                        return
+                except Exception as e:
+                    print(f"Erro ao renovar a reivindicação: {e}")
+
+        thread = threading.Thread(target=renew, name="claim-heartbeat", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def claim(self, key: str, ttl: float) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Tenta reivindicar a chave.
+
+        Returns:
+            (token, None) se a chave foi reivindicada ou (None, token do dono)
+        """
+        raise NotImplementedError
+
+    def current_claim(self, key: str) -> Optional[str]:
+        """Token da reivindicação válida da chave, se houver."""
+        raise NotImplementedError
+
+    def renew(self, key: str, token: str, ttl: float) -> bool:
+        """
+        Estende o prazo da reivindicação, se ainda pertencer ao token.
+
+        Returns:
+            False se a reivindicação expirou e passou a outro worker
+        """
+        raise NotImplementedError
+
+    def release(self, key: str, token: str) -> None:
+        """Libera a chave, se ainda pertencer ao token."""
+        raise NotImplementedError
+
+    def publish(self, key: str, token: str, value: str, ttl: float) -> None:
+        """Publica o resultado da execução identificada pelo token."""
+        raise NotImplementedError
+
+    def fetch(self, key: str, token: str) -> Optional[str]:
+        """Resultado publicado pela execução identificada pelo token."""
+        raise NotImplementedError
+
+
+class SQLiteCoordinator(Coordinator):
+    """
+    Coordenação por um banco SQLite no volume compartilhado. Atende vários
+    workers e contêineres no mesmo host; para vários hosts, use Redis.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: Path = COORDINATION_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._connection().executescript("""
+            CREATE TABLE IF NOT EXISTS claims (
+                key TEXT PRIMARY KEY,
+                token TEXT NOT NULL,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT NOT NULL,
+                token TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (key, token)
+            );
+            """)
+
+    def claim(self, key: str, ttl: float) -> Tuple[Optional[str], Optional[str]]:
+        conn = self._connection()
+        now = time.time()
+        # BEGIN IMMEDIATE impede que dois processos leiam a mesma reivindicação
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT token, expires_at FROM claims WHERE key = ?", (key,)
+            ).fetchone()
+            if row and row[1] > now:
+                return None, row[0]
+
+            token = uuid.uuid4().hex
+            conn.execute(
+                "INSERT OR REPLACE INTO claims VALUES (?, ?, ?, ?)",
+                (key, token, WORKER_ID, now + ttl),
+            )
+            return token, None
+        finally:
+            conn.execute("COMMIT")
+
+    def current_claim(self, key: str) -> Optional[str]:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT token FROM claims WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            )
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def renew(self, key: str, token: str, ttl: float) -> bool:
+        cursor = self._connection().execute(
+            "UPDATE claims SET expires_at = ? WHERE key = ? AND token = ?",
+            (time.time() + ttl, key, token),
+        )
+        return cursor.rowcount > 0
+
+    def release(self, key: str, token: str) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM claims WHERE key = ? AND token = ?", (key, token))
+
+    def publish(self, key: str, token: str, value: str, ttl: float) -> None:
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute("DELETE FROM results WHERE expires_at < ?", (now,))
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (key, token, value, now + ttl),
+            )
+
+    def fetch(self, key: str, token: str) -> Optional[str]:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT value FROM results WHERE key = ? AND token = ?", (key, token)
+            )
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexão própria de cada thread, em modo autocommit."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+
+class RedisCoordinator(Coordinator):
+    """
+    Coordenação por Redis (ou servidor compatível), para workers em vários
+    hosts. Requer o pacote `redis`.
+    """
+
+    name = "redis"
+
+    # Remove a reivindicação apenas se ainda pertencer ao token
+    _RELEASE_SCRIPT = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+
+    # Estende o prazo apenas se a reivindicação ainda pertencer ao token
+    _RENEW_SCRIPT = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('pexpire', KEYS[1], ARGV[2])
+    end
+    return 0
+    """
+
+    def __init__(self, url: str = COORDINATION_REDIS_URL):
+        import redis
+
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+
+    def claim(self, key: str, ttl: float) -> Tuple[Optional[str], Optional[str]]:
+        token = uuid.uuid4().hex
+        while True:
+            claimed = self.client.set(
+                f"p2p:claim:{key}", token, nx=True, px=int(ttl * 1000)
+            )
+            if claimed:
+                return token, None
+            holder = self.client.get(f"p2p:claim:{key}")
+            if holder is not None:
+                return None, holder
+
+    def current_claim(self, key: str) -> Optional[str]:
+        return self.client.get(f"p2p:claim:{key}")
+
+    def renew(self, key: str, token: str, ttl: float) -> bool:
+        renewed = self.client.eval(
+            self._RENEW_SCRIPT, 1, f"p2p:claim:{key}", token, int(ttl * 1000)
+        )
+        return bool(renewed)
+
+    def release(self, key: str, token: str) -> None:
+        self.client.eval(self._RELEASE_SCRIPT, 1, f"p2p:claim:{key}", token)
+
+    def publish(self, key: str, token: str, value: str, ttl: float) -> None:
+        self.client.set(f"p2p:result:{key}:{token}", value, px=int(ttl * 1000))
+
+    def fetch(self, key: str, token: str) -> Optional[str]:
+        return self.client.get(f"p2p:result:{key}:{token}")
+
+
+def create_coordinator(backend: str = COORDINATION_BACKEND) -> Optional[Coordinator]:
+    """
+    Cria o coordenador configurado.
+
+    Args:
+        backend: "sqlite", "redis" ou "local" (sem coordenação entre processos)
+
+    Returns:
+        Coordenador ou None para "local"
+    """
+    if backend == "local":
+        return None
+    if backend == "sqlite":
+        return SQLiteCoordinator()
+    if backend == "redis":
+        return RedisCoordinator()
+    raise ValueError(f"Backend de coordenação desconhecido: {backend}")
+
+
+@lru_cache(maxsize=1)
+def get_coordinator() -> Optional[Coordinator]:
+    """Coordenador compartilhado, criado no primeiro uso."""
+    return create_coordinator()
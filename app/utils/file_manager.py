@@ -1,8 +1,12 @@
+import hashlib
+import json
 import os
 import shutil
+import tempfile
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Any, Dict, Iterable, List, Union
 
 # from config import PDF_DIR, PODCAST_DIR, SUMMARY_DIR
 
@@ -73,10 +77,153 @@ class FileManager:
         else:
             dest_filename = source_path.name
 
-        dest_path = target_dir / dest_filename
+        # Copiar para um arquivo temporário e publicá-lo com um nome livre
+        fd, temp_path = tempfile.mkstemp(dir=target_dir, prefix=f".{dest_filename}.")
+        os.close(fd)
+        try:
+            shutil.copy2(source_path, temp_path)
+            return FileManager.publish_unique(temp_path, target_dir / dest_filename)
+        finally:
+            Path(temp_path).unlink(missing_ok=True)
+
+    @staticmethod
+    def publish_unique(temp_path: Union[str, Path], dest_path: Path) -> Path:
+        """
+        Publica um arquivo temporário com o nome desejado sem sobrescrever
+        arquivos existentes, acrescentando um contador se o nome estiver em
+        uso. A criação do link é atômica, então vários processos gravando no
+        mesmo volume (workers, contêineres) nunca recebem o mesmo nome.
+
+        Args:
+            temp_path: Arquivo temporário no mesmo diretório do destino
+            dest_path: Caminho desejado
+
+        Returns:
+            Caminho efetivamente usado
+        """
+        stem, suffix = dest_path.stem, dest_path.suffix
+        candidate = dest_path
+        counter = 1
+        while True:
+            try:
+                os.link(temp_path, candidate)
+                return candidate
+            except FileExistsError:
+                candidate = dest_path.with_name(f"{stem}_{counter}{suffix}")
+                counter += 1
+
+    @staticmethod
+    def write_bytes_atomic(file_path: Union[str, Path], data: bytes) -> Path:
+        """
+        Grava um arquivo de forma atômica: o conteúdo é escrito em um arquivo
+        temporário no mesmo diretório e depois renomeado sobre o destino, de
+        modo que leitores nunca vejam um arquivo parcial.
+
+        Args:
+            file_path: Caminho do arquivo de destino
+            data: Conteúdo a gravar
+
+        Returns:
+            Caminho do arquivo gravado
+        """
+        path = Path(file_path)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+        return path
+
+    @staticmethod
+    def write_bytes_unique(file_path: Union[str, Path], data: bytes) -> Path:
+        """
+        Grava um novo arquivo sem sobrescrever nenhum existente (ver
+        `publish_unique`).
+
+        Args:
+            file_path: Caminho desejado
+            data: Conteúdo a gravar
+
+        Returns:
+            Caminho efetivamente usado
+        """
+        return FileManager.write_chunks_unique(file_path, (data,))
+
+    @staticmethod
+    def write_chunks_unique(
+        file_path: Union[str, Path], chunks: Iterable[bytes]
+    ) -> Path:
+        """
+        Como `write_bytes_unique`, mas grava o conteúdo à medida que os
+        blocos são produzidos, sem mantê-lo inteiro em memória.
 
-        shutil.copy2(source_path, dest_path)
-        return dest_path
+        Args:
+            file_path: Caminho desejado
+            chunks: Blocos do conteúdo, na ordem
+
+        Returns:
+            Caminho efetivamente usado
+        """
+        path = Path(file_path)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            return FileManager.publish_unique(temp_path, path)
+        finally:
+            Path(temp_path).unlink(missing_ok=True)
+
+    @staticmethod
+    def write_json_atomic(file_path: Union[str, Path], data: Any) -> Path:
+        """
+        Grava dados em JSON de forma atômica (veja `write_bytes_atomic`).
+
+        Args:
+            file_path: Caminho do arquivo de destino
+            data: Dados serializáveis em JSON
+
+        Returns:
+            Caminho do arquivo gravado
+        """
+        content = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+        return FileManager.write_bytes_atomic(file_path, content)
+
+    @staticmethod
+    def compute_hash(file_path: Union[str, Path], block_size: int = 1024 * 1024) -> str:
+        """
+        Calcula o hash SHA-256 de um arquivo lendo-o em blocos.
+
+        Args:
+            file_path: Caminho do arquivo
+            block_size: Tamanho de cada bloco lido
+
+        Returns:
+            Hash hexadecimal do conteúdo do arquivo
+        """
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def mark_accessed(file_path: Union[str, Path]) -> None:
+        """
+        Atualiza o horário de último acesso de um arquivo (usado pela
+        retenção LRU, já que volumes montados com noatime não o atualizam).
+
+        Args:
+            file_path: Caminho do arquivo acessado
+        """
+        try:
+            stat = os.stat(file_path)
+            os.utime(file_path, (time.time(), stat.st_mtime))
+        except OSError:
+            pass
 
     @staticmethod
     def delete_file(file_path: Union[str, Path]) -> bool:
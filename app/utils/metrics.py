@@ -0,0 +1,246 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+from utils.profiling import ProfileSession
+
+STAGE_DURATION = Histogram(
+    "p2p_stage_duration_seconds",
+    "Duração de cada etapa do pipeline",
+    ["stage"],
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+STAGE_ERRORS = Counter(
+    "p2p_stage_errors_total", "Etapas do pipeline que terminaram com erro", ["stage"]
+)
+LLM_TOKENS = Counter(
+    "p2p_llm_tokens_total", "Tokens consumidos nas chamadas ao LLM", ["kind"]
+)
+CACHE_REQUESTS = Counter(
+    "p2p_cache_requests_total", "Consultas a caches por resultado", ["cache", "result"]
+)
+RETENTION_DELETED_FILES = Counter(
+    "p2p_retention_deleted_files_total",
+    "Arquivos removidos pela retenção",
+    ["directory", "reason"],
+)
+RETENTION_FREED_BYTES = Counter(
+    "p2p_retention_freed_bytes_total",
+    "Bytes liberados pela retenção",
+    ["directory", "reason"],
+)
+JOBS_IN_FLIGHT = Gauge(
+    "p2p_jobs_in_flight",
+    "Trabalhos em execução no momento",
+    ["job"],
+    multiprocess_mode="livesum",
+)
+
+SCHEDULER_QUEUE_DEPTH = Gauge(
+    "p2p_scheduler_queue_depth",
+    "Trabalhos aguardando vaga no escalonador",
+    ["priority"],
+    multiprocess_mode="livesum",
+)
+SCHEDULER_RUNNING = Gauge(
+    "p2p_scheduler_running",
+    "Trabalhos ocupando vagas do escalonador",
+    ["priority"],
+    multiprocess_mode="livesum",
+)
+SCHEDULER_WAIT_SECONDS = Histogram(
+    "p2p_scheduler_wait_seconds",
+    "Tempo de espera na fila do escalonador",
+    ["priority"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("p2p_span", default=None)
+_current_profile: ContextVar[Optional[ProfileSession]] = ContextVar(
+    "p2p_profile", default=None
+)
+
+
+class Span:
+    """
+    Nó da árvore de rastreamento de uma requisição.
+    """
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.children: List["Span"] = []
+        self._lock = threading.Lock()
+
+    def add_child(self, span: "Span") -> None:
+        with self._lock:
+            self.children.append(span)
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self.start
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializa o span e seus filhos com tempos relativos em milissegundos."""
+        return self._to_dict(self.start)
+
+    def _to_dict(self, origin: float) -> Dict[str, Any]:
+        with self._lock:
+            children = list(self.children)
+        return {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 2),
+            "duration_ms": (
+                round(self.duration * 1000, 2) if self.duration is not None else None
+            ),
+            "attributes": self.attributes,
+            "children": [child._to_dict(origin) for child in children],
+        }
+
+
+class Instrumentation:
+    """
+    Instrumentação das etapas do pipeline: histogramas de duração,
+    contadores de tokens e de cache, gauges de trabalhos em execução,
+    rastreamento e perfilamento opcionais por requisição.
+    """
+
+    @staticmethod
+    @contextmanager
+    def stage(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """
+        Mede a duração de uma etapa. Se houver um rastreamento ativo,
+        registra também um span filho do span atual; se houver um
+        perfilamento ativo, mede a memória e as funções da etapa.
+
+        Args:
+            name: Nome da etapa (ex.: "extraction", "tts_synthesis")
+            attributes: Atributos adicionais do span
+        """
+        parent = _current_span.get()
+        span = None
+        token = None
+        if parent is not None:
+            span = Span(name, attributes)
+            parent.add_child(span)
+            token = _current_span.set(span)
+
+        profile = _current_profile.get()
+        frame = profile.enter(name) if profile is not None else None
+
+        start_time = time.perf_counter()
+        try:
+            yield span
+        except Exception:
+            STAGE_ERRORS.labels(stage=name).inc()
+            if span is not None:
+                span.attributes["error"] = True
+            raise
+        finally:
+            STAGE_DURATION.labels(stage=name).observe(time.perf_counter() - start_time)
+            if frame is not None:
+                profile.exit(frame)
+            if span is not None:
+                span.finish()
+                _current_span.reset(token)
+
+    @staticmethod
+    @contextmanager
+    def trace(name: str, enabled: bool = True, **attributes: Any) -> Iterator[Span]:
+        """
+        Inicia a árvore de spans de uma requisição.
+        Etapas executadas dentro do bloco (inclusive em threads que copiam o
+        contexto) são registradas como filhas.
+
+        Args:
+            name: Nome do span raiz
+            enabled: Se False, nenhum span é registrado
+        """
+        root = Span(name, attributes)
+        token = _current_span.set(root) if enabled else None
+        try:
+            yield root
+        finally:
+            root.finish()
+            if token is not None:
+                _current_span.reset(token)
+
+    @staticmethod
+    @contextmanager
+    def profile(
+        name: str, memory: bool = False, cpu: bool = False, **attributes: Any
+    ) -> Iterator[ProfileSession]:
+        """
+        Perfila as etapas executadas dentro do bloco (ver `ProfileSession`).
+        Sem `memory` nem `cpu`, nada é medido e o custo é nulo.
+
+        Args:
+            name: Nome do perfilamento (ex.: "summarize")
+            memory: Mede o pico de memória de cada etapa com tracemalloc
+            cpu: Lista as funções mais custosas de cada etapa com cProfile
+            attributes: Identificação da requisição, incluída no relatório
+        """
+        session = ProfileSession(name, memory=memory, cpu=cpu, **attributes)
+        token = _current_profile.set(session) if session.start() else None
+        try:
+            yield session
+        finally:
+            if token is not None:
+                _current_profile.reset(token)
+            session.stop()
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        """Retorna o span ativo no contexto atual, se houver."""
+        return _current_span.get()
+
+    @staticmethod
+    @contextmanager
+    def in_flight(job: str) -> Iterator[None]:
+        """Mantém o gauge de trabalhos em execução durante o bloco."""
+        gauge = JOBS_IN_FLIGHT.labels(job=job)
+        gauge.inc()
+        try:
+            yield
+        finally:
+            gauge.dec()
+
+    @staticmethod
+    def record_tokens(prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+        """Contabiliza tokens consumidos pelo LLM."""
+        if prompt_tokens:
+            LLM_TOKENS.labels(kind="prompt").inc(prompt_tokens)
+        if completion_tokens:
+            LLM_TOKENS.labels(kind="completion").inc(completion_tokens)
+
+    @staticmethod
+    def record_cache(cache: str, hit: bool) -> None:
+        """Contabiliza uma consulta a um cache."""
+        CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+    @staticmethod
+    def export() -> tuple:
+        """
+        Retorna o conteúdo e o content-type do endpoint de métricas.
+        Com vários workers (PROMETHEUS_MULTIPROC_DIR definido), agrega as
+        métricas de todos os processos.
+        """
+        if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+            from prometheus_client import CollectorRegistry, multiprocess
+
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            return generate_latest(registry), CONTENT_TYPE_LATEST
+        return generate_latest(), CONTENT_TYPE_LATEST
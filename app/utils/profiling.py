@@ -0,0 +1,261 @@
+import cProfile
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import PROFILE_DIR, PROFILE_TOP_FUNCTIONS
+
+from utils.file_manager import FileManager
+from utils.text_processor import TextProcessor
+
+# O tracemalloc e o pico de memória são globais: um perfilamento por processo
+_session_lock = threading.Lock()
+
+_MB = 1024 * 1024
+
+
+class _Frame:
+    """Etapa em andamento na pilha do perfilamento."""
+
+    __slots__ = ("name", "start", "start_bytes", "peak_bytes", "profiler")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.start_bytes = 0
+        self.peak_bytes = 0
+        self.profiler: Optional[cProfile.Profile] = None
+
+
+class ProfileSession:
+    """
+    Perfilamento de uma requisição, etapa por etapa (`Instrumentation.stage`):
+    pico de memória alocada pelo Python (tracemalloc) e funções com maior
+    tempo próprio (cProfile).
+
+    O pico de uma etapa inclui as etapas internas a ela; as funções
+    listadas, não (cada etapa tem seu próprio cProfile). Apenas as etapas
+    executadas na thread que iniciou o perfilamento são medidas, e só um
+    perfilamento roda por vez em cada processo: os demais pedidos recebem
+    o status "busy".
+    """
+
+    def __init__(
+        self,
+        name: str,
+        memory: bool = True,
+        cpu: bool = True,
+        top: int = PROFILE_TOP_FUNCTIONS,
+        **attributes: Any,
+    ):
+        self.name = name
+        self.memory = memory
+        self.cpu = cpu
+        self.top = top
+        self.attributes = attributes
+        self.status = "disabled"
+        self._stack: List[_Frame] = []
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._stats: Dict[str, pstats.Stats] = {}
+        self._thread: Optional[int] = None
+        self._owns_tracemalloc = False
+
+    def start(self) -> bool:
+        """Inicia o perfilamento; retorna False se outro estiver em andamento."""
+        if not (self.memory or self.cpu):
+            return False
+        if not _session_lock.acquire(blocking=False):
+            self.status = "busy"
+            return False
+
+        self._thread = threading.get_ident()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        self.status = "running"
+        self._push(self.name)
+        return True
+
+    def stop(self) -> None:
+        """Encerra o perfilamento e libera o processo para o próximo."""
+        if self.status != "running":
+            return
+        try:
+            if self._stack:
+                self._pop(self._stack[0])
+        finally:
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+            self.status = "done"
+            _session_lock.release()
+
+    def enter(self, stage: str) -> Optional[_Frame]:
+        """Início de uma etapa (chamado por `Instrumentation.stage`)."""
+        if self.status != "running" or threading.get_ident() != self._thread:
+            return None
+        return self._push(stage)
+
+    def exit(self, frame: Optional[_Frame]) -> None:
+        """Fim de uma etapa iniciada por `enter`."""
+        if frame is not None and self.status == "running":
+            self._pop(frame)
+
+    def _push(self, name: str) -> _Frame:
+        parent = self._stack[-1] if self._stack else None
+        frame = _Frame(name)
+        self._stages.setdefault(
+            name, {"calls": 0, "seconds": 0.0, "peak_bytes": 0, "net_bytes": 0}
+        )
+
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                parent.peak_bytes = max(parent.peak_bytes, peak)
+            # O pico passa a ser medido a partir do início desta etapa
+            tracemalloc.reset_peak()
+            frame.start_bytes = frame.peak_bytes = current
+
+        if self.cpu:
+            if parent is not None and parent.profiler is not None:
+                parent.profiler.disable()
+            frame.profiler = cProfile.Profile()
+            frame.profiler.enable()
+
+        self._stack.append(frame)
+        return frame
+
+    def _pop(self, frame: _Frame) -> None:
+        if frame not in self._stack:
+            return
+        # Etapas internas que não foram encerradas terminam junto
+        while self._stack[-1] is not frame:
+            self._pop(self._stack[-1])
+        self._stack.pop()
+        parent = self._stack[-1] if self._stack else None
+
+        record = self._stages[frame.name]
+        record["calls"] += 1
+        record["seconds"] += time.perf_counter() - frame.start
+
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            frame.peak_bytes = max(frame.peak_bytes, peak)
+            record["peak_bytes"] = max(record["peak_bytes"], frame.peak_bytes)
+            record["net_bytes"] += current - frame.start_bytes
+            if parent is not None:
+                parent.peak_bytes = max(parent.peak_bytes, frame.peak_bytes)
+
+        if frame.profiler is not None:
+            frame.profiler.disable()
+            self._add_stats(frame.name, frame.profiler)
+            if parent is not None and parent.profiler is not None:
+                parent.profiler.enable()
+
+    def _add_stats(self, stage: str, profiler: cProfile.Profile) -> None:
+        try:
+            if stage in self._stats:
+                self._stats[stage].add(profiler)
+            else:
+                self._stats[stage] = pstats.Stats(profiler)
+        except TypeError:
+            # Nenhuma chamada registrada na etapa
+            pass
+
+    def _hot_functions(self, stage: str) -> List[Dict[str, Any]]:
+        """Funções com maior tempo próprio na etapa."""
+        stats = self._stats.get(stage)
+        if stats is None:
+            return []
+
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+        functions = []
+        for (filename, line, function), (_, calls, own, cumulative, _) in rows[
+            : self.top
+        ]:
+            location = "/".join(Path(filename).parts[-2:])
+            functions.append(
+                {
+                    "function": (
+                        f"{function} ({location}:{line})" if line else function
+                    ),
+                    "calls": calls,
+                    "self_seconds": round(own, 4),
+                    "cumulative_seconds": round(cumulative, 4),
+                }
+            )
+        return functions
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Relatório do perfilamento.
+
+        Returns:
+            Status, pico de memória da requisição e, para cada etapa, número
+            de execuções, tempo total, pico e saldo de memória (MB) e funções
+            com maior tempo próprio
+        """
+        report: Dict[str, Any] = {
+            "name": self.name,
+            "status": self.status,
+            "memory": self.memory,
+            "cpu": self.cpu,
+            **self.attributes,
+        }
+        if self.status != "done":
+            return report
+
+        stages = []
+        for stage, record in self._stages.items():
+            entry: Dict[str, Any] = {
+                "stage": stage,
+                "calls": record["calls"],
+                "seconds": round(record["seconds"], 4),
+            }
+            if self.memory:
+                entry["peak_mb"] = round(record["peak_bytes"] / _MB, 3)
+                entry["net_mb"] = round(record["net_bytes"] / _MB, 3)
+            if self.cpu:
+                entry["hot_functions"] = self._hot_functions(stage)
+            stages.append(entry)
+
+        if self.memory:
+            report["peak_mb"] = stages[0]["peak_mb"]
+        report["stages"] = stages
+        return report
+
+    def dump(self, directory: Path = PROFILE_DIR) -> Dict[str, Any]:
+        """
+        Grava o relatório em JSON e, com cProfile, as estatísticas de todas
+        as etapas em um arquivo .prof (legível por `pstats` e `snakeviz`).
+
+        Returns:
+            Relatório com os caminhos dos arquivos em `files`
+        """
+        report = self.report()
+        if self.status != "done":
+            return report
+
+        label = "_".join(
+            [self.name, *(str(value) for value in self.attributes.values())]
+        )
+        stem = f"{time.strftime('%Y%m%d_%H%M%S')}_" + TextProcessor.sanitize_filename(
+            label[:60]
+        )
+        report_path = FileManager.write_bytes_unique(
+            directory / f"{stem}.json",
+            json.dumps(report, ensure_ascii=False, indent=2).encode("utf-8"),
+        )
+        report["files"] = {"report": str(report_path)}
+
+        if self._stats:
+            combined = pstats.Stats()
+            combined.add(*self._stats.values())
+            stats_path = report_path.with_suffix(".prof")
+            combined.dump_stats(stats_path)
+            report["files"]["cpu_stats"] = str(stats_path)
+
+        return report
@@ -0,0 +1,99 @@
+import copy
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from utils.metrics import Instrumentation
+
+
+class SingleFlight:
+    """
+    Agrupa chamadas concorrentes com a mesma chave: apenas a primeira
+    (líder) executa a função; as demais aguardam e recebem uma cópia do
+    mesmo resultado (ou da mesma exceção). Cada chamada recebe um objeto
+    próprio, que pode alterar sem afetar as demais.
+    """
+
+    def __init__(self, name: str, distributed: bool = False):
+        self.name = name
+        self.distributed = distributed
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(
+        self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Tuple[Any, bool]:
+        """
+        Executa `fn` uma única vez por chave entre chamadas simultâneas.
+
+        Args:
+            key: Chave que identifica chamadas equivalentes
+            fn: Função a executar
+
+        Returns:
+            Tupla (resultado, compartilhado), onde `compartilhado` indica se o
+            resultado veio da execução de outra chamada
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        Instrumentation.record_cache(f"single_flight.{self.name}", hit=not leader)
+
+        if not leader:
+            return copy.deepcopy(future.result()), True
+
+        shared = False
+        try:
+            result, shared = self._execute(key, fn, *args, **kwargs)
+            # As demais chamadas copiam um instantâneo, e não o objeto que o
+            # líder devolve e pode alterar em seguida
+            future.set_result(copy.deepcopy(result))
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+        return result, shared
+
+    def _execute(
+        self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Tuple[Any, bool]:
+        """
+        Executa a chamada do líder. No modo distribuído, o líder de cada
+        processo ainda disputa a chave com os outros workers pelo coordenador.
+        """
+        if self.distributed:
+            from utils.coordination import get_coordinator
+
+            coordinator = get_coordinator()
+            if coordinator is not None:
+                return coordinator.run_once(f"{self.name}:{key!r}", fn, *args, **kwargs)
+        return fn(*args, **kwargs), False
+
+    def join(self, key: Hashable) -> Optional[Tuple[Any, bool]]:
+        """
+        Aguarda a execução em andamento para a chave, sem iniciar outra.
+
+        Returns:
+            Tupla (cópia do resultado, True) como em `do`, ou None se não
+            houver execução em andamento; nesse caso, quem chamou deve
+            usar `do`
+        """
+        with self._lock:
+            future = self._calls.get(key)
+        if future is None:
+            return None
+
+        Instrumentation.record_cache(f"single_flight.{self.name}", hit=True)
+        return copy.deepcopy(future.result()), True
+
+    def in_flight(self) -> int:
+        """Número de chaves em execução no momento."""
+        with self._lock:
+            return len(self._calls)
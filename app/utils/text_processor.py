@@ -1,5 +1,5 @@
 import re
-from typing import List
+from typing import List, Sequence, Tuple
 
 
 class TextProcessor:
@@ -88,8 +88,13 @@ class TextProcessor:
             # Adicionar o pedaço à lista
             chunks.append(clean_text[start:end])
 
+            # O último pedaço já alcançou o fim do texto
+            if end >= len(clean_text):
+                break
+
             # Avançar o início para o próximo chunk, considerando a sobreposição
-            start = end - overlap
+            # (sempre avançando, mesmo que a sobreposição seja maior que o chunk)
+            start = max(end - overlap, start + 1)
 
         return chunks
 
@@ -322,6 +327,73 @@ class TextProcessor:
 
         return formatted
 
+    @staticmethod
+    def parse_dialogue(
+        script: str, speakers: Sequence[str] = ("A", "B")
+    ) -> List[Tuple[str, str]]:
+        """
+        Separa o roteiro de um diálogo em falas.
+
+        Cada fala começa com o rótulo do apresentador seguido de dois-pontos
+        ou de um travessão entre espaços ("A: ...", "B - ..."); linhas sem
+        rótulo (inclusive "B-cells...") continuam a fala anterior, e falas
+        seguidas do mesmo apresentador são unidas. Se o roteiro não tiver
+        rótulos, as frases são distribuídas alternadamente entre os
+        apresentadores.
+
+        Args:
+            script: Roteiro gerado pelo LLM
+            speakers: Rótulos dos apresentadores
+
+        Returns:
+            Lista de tuplas (apresentador, texto) na ordem do roteiro
+        """
+        labels = "|".join(re.escape(speaker) for speaker in speakers)
+        pattern = re.compile(
+            rf"^[\s*_>\-]*({labels})[\s*_]*(?::|\s[-–—](?=\s|$))[\s*_]*(.*)$"
+        )
+
+        turns: List[List[str]] = []
+        for line in script.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            match = pattern.match(line)
+            if match:
+                speaker, text = match.groups()
+                if turns and turns[-1][0] == speaker:
+                    turns[-1][1] += " " + text
+                else:
+                    turns.append([speaker, text])
+            elif turns:
+                turns[-1][1] += " " + line
+
+        if len({speaker for speaker, _ in turns}) < min(2, len(speakers)):
+            text = " ".join(text for _, text in turns) if turns else script
+            sentences = re.split(r"(?<=[.!?])\s+", text.strip())
+            turns = [
+                [speakers[i % len(speakers)], sentence]
+                for i, sentence in enumerate(s for s in sentences if s)
+            ]
+
+        return [(speaker, text.strip()) for speaker, text in turns if text.strip()]
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """
+        Estima o número de tokens de um texto (~4 caracteres por token).
+
+        Args:
+            text: Texto para estimar
+
+        Returns:
+            Número aproximado de tokens
+        """
+        if not text:
+            return 0
+
+        return (len(text) + 3) // 4
+
     @staticmethod
     def sanitize_filename(text: str) -> str:
         """